@@ -0,0 +1,197 @@
+# =============================================================================
+# Install operation detection latency benchmark
+#
+# Copyright (c)  2016, Cisco Systems
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+# =============================================================================
+
+"""Measure how quickly the install engine detects the state changes for every OS profile.
+
+The device is simulated with the virtual clock, so the benchmark runs in a fraction of second.
+For every trial the install operation completes and the nodes come up at a random time.
+The detection latency is the virtual time between the state change and the engine returning.
+
+Run from the repository root::
+
+    python -m benchmarks.install_detection --trials 200
+"""
+
+import argparse
+import random
+
+from condoor.exceptions import CommandTimeoutError
+
+from csmpe.core_plugins.csm_install_operations.engine import DEFAULT_POLICY, InstallEngine
+from csmpe.core_plugins.csm_install_operations.exr.install import EXR_PROFILE
+from csmpe.core_plugins.csm_install_operations.ios.install import IOS_PROFILE
+from csmpe.core_plugins.csm_install_operations.ios_xe.install import XE_PROFILE
+from csmpe.core_plugins.csm_install_operations.ios_xr.install import XR_PROFILE
+
+#: The node state outputs while booting and when all nodes are up.
+NODES = {
+    'eXR': (
+        "Node              Type                       State             Config state\n"
+        "0/RP0/CPU0        NC55-RP(Active)            IOS XR RUN        NSHUT\n"
+        "0/1/CPU0          NC55-24X100G-SE            BOOTING           NSHUT\n",
+        "Node              Type                       State             Config state\n"
+        "0/RP0/CPU0        NC55-RP(Active)            IOS XR RUN        NSHUT\n"
+        "0/1/CPU0          NC55-24X100G-SE            IOS XR RUN        NSHUT\n",
+    ),
+    'XR': (
+        "0/RSP0/CPU0     A9K-RSP440-SE(Active)     IOS XR RUN       PWR,NSHUT,MON\n"
+        "0/1/CPU0        A9K-40GE-E                BOOTING          PWR,NSHUT,MON\n",
+        "0/RSP0/CPU0     A9K-RSP440-SE(Active)     IOS XR RUN       PWR,NSHUT,MON\n"
+        "0/1/CPU0        A9K-40GE-E                IOS XR RUN       PWR,NSHUT,MON\n",
+    ),
+    'XE': (
+        "Slot      Type                State                 Insert time (ago)\n"
+        " 0/0      12xGE-2x10GE-FIXED  booting               00:01:10\n"
+        "R0        ASR-920-12CZ-A      ok, active            00:03:23\n",
+        "Slot      Type                State                 Insert time (ago)\n"
+        " 0/0      12xGE-2x10GE-FIXED  ok                    00:01:10\n"
+        "R0        ASR-920-12CZ-A      ok, active            00:03:23\n",
+    ),
+    'IOS': (
+        "",
+        'System image file is "bootflash:asr901-universalk9-mz.bin"\n',
+    ),
+}
+
+#: The install request outputs formatted with the operation id and percent complete.
+REQUESTS = {
+    'eXR': "The install add operation {op_id} is {percent}% complete\n",
+    'XR': "Install operation {op_id} 'install add' started by user 'cisco'\nThe operation is {percent}% complete\n",
+}
+
+
+class _Host(object):
+    family = 'ASR9K'
+
+
+class SimulatedContext(object):
+    """The plugin context of the simulated device driven by the virtual clock.
+
+    :param profile: the install profile of the device
+    :param change_at: the virtual time of the state change
+    :param command_time: the number of seconds every command takes
+    :param banner: the completion banner is printed to the terminal
+    """
+    CommandTimeoutError = CommandTimeoutError
+    get_host = _Host()
+
+    def __init__(self, profile, change_at, command_time=2.0, banner=True):
+        self.profile = profile
+        self.change_at = change_at
+        self.command_time = command_time
+        self.banner = banner
+        self.now = 0.0
+        self.commands = 0
+        self.op_id = "3"
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+    def send(self, cmd="", timeout=300, wait_for_string=None):
+        if not cmd:
+            # waiting for the completion banner
+            if self.banner and self.change_at <= self.now + timeout:
+                self.now = max(self.now, self.change_at)
+                return self.profile.success.format(self.op_id)
+            self.now += timeout
+            raise CommandTimeoutError()
+
+        self.commands += 1
+        self.now += self.command_time
+        done = self.now >= self.change_at
+        if cmd == self.profile.show_platform:
+            return NODES[self.profile.name][done]
+        if done:
+            return self.profile.no_install
+        percent = int(100 * self.now / self.change_at)
+        return REQUESTS[self.profile.name].format(op_id=self.op_id, percent=percent)
+
+    def info(self, message):
+        pass
+
+    def warning(self, message):
+        pass
+
+    def error(self, message):
+        raise RuntimeError(message)
+
+    def post_status(self, message):
+        pass
+
+    def save_to_file(self, name, data):
+        pass
+
+
+def measure(profile, scenario, trials, policy=DEFAULT_POLICY, seed=0, banner=True):
+    """Return the list of (latency, commands) tuples of the trials."""
+    rand = random.Random(seed)
+    # the nodes must come up before the profile gives up
+    latest = min(1800, 0.9 * (profile.ready_timeout or policy.ready_timeout))
+    results = []
+    for _ in range(trials):
+        change_at = rand.uniform(30, latest)
+        ctx = SimulatedContext(profile, change_at, banner=banner)
+        engine = InstallEngine(ctx, profile, policy, clock=ctx.clock)
+        if scenario == 'watch':
+            engine.watch_operation(ctx.op_id)
+        else:
+            engine.wait_for_nodes()
+        results.append((ctx.now - change_at, ctx.commands))
+    return results
+
+
+def _percentile(values, percent):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percent / 100.0))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--trials", type=int, default=100, help="The number of trials per OS and scenario")
+    parser.add_argument("--seed", type=int, default=0, help="The random seed")
+    args = parser.parse_args()
+
+    row = "{:<5} {:<14} {:>10} {:>10} {:>10} {:>10}"
+    print(row.format("OS", "Scenario", "Mean [s]", "P95 [s]", "Max [s]", "Commands"))
+    scenarios = [('watch', True, "watch"), ('watch', False, "watch (polls)"), ('nodes', True, "nodes up")]
+    for profile in [EXR_PROFILE, XR_PROFILE, XE_PROFILE, IOS_PROFILE]:
+        for scenario, banner, label in scenarios:
+            if scenario == 'watch' and profile.name not in REQUESTS:
+                continue
+            results = measure(profile, scenario, args.trials, seed=args.seed, banner=banner)
+            latencies = [latency for latency, _ in results]
+            commands = sum(count for _, count in results) / float(len(results))
+            print(row.format(profile.name, label, "{:.1f}".format(sum(latencies) / len(latencies)),
+                             "{:.1f}".format(_percentile(latencies, 95)), "{:.1f}".format(max(latencies)),
+                             "{:.1f}".format(commands)))
+
+
+if __name__ == '__main__':
+    main()
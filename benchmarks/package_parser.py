@@ -0,0 +1,106 @@
+# =============================================================================
+# Package name parser benchmark
+#
+# Copyright (c)  2016, Cisco Systems
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+# =============================================================================
+
+"""Measure the eXR package name parser on the show install outputs of the large devices.
+
+Every node prints its active packages, so the same names repeat in the output. The cold parse
+starts with the empty cache of the parsed names, the warm parse is the next plugin parsing the same output.
+
+Run from the repository root::
+
+    python -m benchmarks.package_parser --nodes 16 --packages 200
+"""
+
+import argparse
+import timeit
+
+from csmpe.core_plugins.csm_install_operations.exr import package_lib
+
+PLATFORM = "ncs5500"
+VERSION = "6.1.1"
+PACKAGE_TYPES = ["mgbl", "mpls", "mpls-te-rsvp", "k9sec", "isis", "ospf", "eigrp", "m2m", "parser", "mcast"]
+
+
+def package_names(packages, platform=PLATFORM, version=VERSION):
+    """Return the internal names of the packages and SMUs, one third of them are SMUs."""
+    release = "r" + version.replace(".", "")
+    names = []
+    for index in range(packages):
+        if index % 3 == 2:
+            names.append("{}-{}.CSCvb{:05d}-1.0.0".format(platform, version, index))
+        else:
+            package_type = PACKAGE_TYPES[index % len(PACKAGE_TYPES)]
+            names.append("{}-{}{}-{}.0.0.0-{}".format(platform, package_type, index, index % 4 + 1, release))
+    return names
+
+
+def show_install_active(nodes, packages):
+    """Return the show install active output of the nodes running the same packages."""
+    names = package_names(packages)
+    lines = []
+    for node in range(nodes):
+        lines.append("Node 0/{}/CPU0 [LC]".format(node))
+        lines.append("    Boot Partition: xr_lv0")
+        lines.append("    Active Packages: {}".format(len(names) + 1))
+        lines.append("        {}-xr-{} version={} [Boot image]".format(PLATFORM, VERSION, VERSION))
+        lines.extend("        " + name for name in names)
+        lines.append("")
+    return "\n".join(lines)
+
+
+def measure(output, iterations, cold):
+    """Return the number of seconds per parse."""
+    def parse():
+        if cold:
+            package_lib.cache.clear()
+        package_lib.SoftwarePackage.from_show_cmd(output)
+
+    return min(timeit.repeat(parse, number=iterations, repeat=3)) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=16, help="The number of nodes in the output")
+    parser.add_argument("--packages", type=int, default=200, help="The number of packages and SMUs per node")
+    parser.add_argument("--iterations", type=int, default=20, help="The number of parses per measurement")
+    args = parser.parse_args()
+
+    row = "{:<8} {:>8} {:>8} {:>10} {:>10} {:>14}"
+    print(row.format("Cache", "Tokens", "Unique", "Packages", "Time [ms]", "Tokens/s"))
+    for packages in [args.packages, args.packages * 5]:
+        output = show_install_active(args.nodes, packages)
+        tokens = output.split()
+        parsed = package_lib.SoftwarePackage.from_show_cmd(output)
+        assert len(parsed) == packages
+        for cold in [True, False]:
+            seconds = measure(output, args.iterations, cold)
+            print(row.format("cold" if cold else "warm", len(tokens), len(set(tokens)), len(parsed),
+                             "{:.2f}".format(seconds * 1000), "{:.0f}".format(len(tokens) / seconds)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+# =============================================================================
+# Show platform parser benchmark
+#
+# Copyright (c)  2016, Cisco Systems
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+# =============================================================================
+
+"""Measure the show platform parsing time on the chassis sized outputs.
+
+The shared :mod:`csmpe.parsers` table parser is compared with the per line parsing it replaced,
+kept here as the reference. The parser runs on every node state poll while the device reloads.
+
+The shared parser consolidates the per OS copies; it is not faster. Both walk the lines in Python
+and the parsing time is within the noise of the poll interval and the command round trip.
+
+Run from the repository root::
+
+    python -m benchmarks.platform_parser --slots 16 --iterations 2000
+"""
+
+import argparse
+import re
+import timeit
+
+from csmpe.parsers import parse_show_platform, CPU_NODE, EXR_PLATFORM, XR_PLATFORM
+
+
+def exr_output(slots):
+    """Return the eXR show platform output of the chassis with the slots line cards with 6 NPUs each."""
+    lines = ["Node              Type                       State             Config state",
+             "-" * 80]
+    for slot in range(slots):
+        lines.append("0/{:<16}NC55-36X100G               IOS XR RUN        NSHUT".format("{}/CPU0".format(slot)))
+        lines += ["0/{:<16}Slice                      UP".format("{}/NPU{}".format(slot, npu)) for npu in range(6)]
+    lines += ["0/RP{0}/CPU0        NC55-RP(Standby)           IOS XR RUN        NSHUT".format(rp) for rp in range(2)]
+    lines += ["0/FC{}             NC55-5516-FC               OPERATIONAL       NSHUT".format(fc) for fc in range(6)]
+    lines += ["0/FT{}             NC55-5516-FAN              OPERATIONAL       NSHUT".format(ft) for ft in range(3)]
+    lines += ["0/PM{}             NC55-PWR-3KW-AC            OPERATIONAL       NSHUT".format(pm) for pm in range(8)]
+    return "\n".join(lines) + "\n"
+
+
+def xr_output(slots):
+    """Return the XR admin show platform output of the ASR9K chassis with the slots line cards."""
+    lines = ["Node            Type                      State            Config State",
+             "-" * 77]
+    lines += ["0/RSP{0}/CPU0     A9K-RSP880-SE(Active)     IOS XR RUN       PWR,NSHUT,MON".format(rsp)
+              for rsp in range(2)]
+    for slot in range(slots):
+        lines.append("0/{:<14}A9K-8X100GE-SE            IOS XR RUN       PWR,NSHUT,MON".format("{}/CPU0".format(slot)))
+    lines += ["0/FT{}/SP        ASR-9922-FAN-V2           READY".format(ft) for ft in range(4)]
+    lines += ["0/PS0/M{}/SP     PWR-6KW-AC-V3             READY            PWR,NSHUT,MON".format(m) for m in range(8)]
+    return "\n".join(lines) + "\n"
+
+
+def legacy_exr(output):
+    """The header offsets derived and the node matched per line."""
+    inventory = {}
+    sl = ['node', 'type', 'state', 'config state']
+    dl = {}
+    for line in [x for x in output.split('\n') if x]:
+        line = line.strip()
+        if line[0:4] == 'Node':
+            line = line.lower()
+            for s in sl:
+                dl[s] = line.find(s)
+        if line[0].isdigit():
+            node = line[:dl["type"]]
+            if not re.search(r'CPU\d+\s*$', node):
+                continue
+            inventory[node] = {'type': line[dl['type']:dl['state']].strip(),
+                               'state': line[dl['state']:dl['config state']].strip(),
+                               'config_state': line[dl['config state']:].strip()}
+    return inventory
+
+
+def legacy_xr(output):
+    """The rows split with the regular expression per line."""
+    inventory = {}
+    for line in output.split('\n'):
+        line = line.strip()
+        if len(line) > 0 and line[0].isdigit():
+            states = re.split(r'\s\s+', line)
+            if not re.search(r'CPU\d+$', states[0]):
+                continue
+            node, node_type, state, config_state = states
+            inventory[node] = {'type': node_type, 'state': state, 'config_state': config_state}
+    return inventory
+
+
+def measure(function, output, iterations):
+    """Return the number of microseconds per parse."""
+    return min(timeit.repeat(lambda: function(output), number=iterations, repeat=3)) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--slots", type=int, default=16, help="The number of line card slots")
+    parser.add_argument("--iterations", type=int, default=2000, help="The number of parses per measurement")
+    args = parser.parse_args()
+
+    cases = [
+        ("eXR", exr_output(args.slots), legacy_exr, lambda output: parse_show_platform(output, EXR_PLATFORM,
+                                                                                       node=CPU_NODE)),
+        ("XR", xr_output(args.slots), legacy_xr, lambda output: parse_show_platform(output, XR_PLATFORM,
+                                                                                    node=CPU_NODE)),
+    ]
+    row = "{:<5} {:>6} {:>14} {:>14} {:>9} {:>14}"
+    print(row.format("OS", "Lines", "Legacy [us]", "Shared [us]", "Speedup", "Lines/s"))
+    for name, output, legacy, shared in cases:
+        # the legacy eXR parser kept the column padding in the node names
+        assert shared(output).to_dict() == dict((node.strip(), entry) for node, entry in legacy(output).items())
+        legacy_time = measure(legacy, output, args.iterations)
+        shared_time = measure(shared, output, args.iterations)
+        lines = output.count("\n")
+        print(row.format(name, lines, "{:.1f}".format(legacy_time), "{:.1f}".format(shared_time),
+                         "{:.2f}x".format(legacy_time / shared_time), "{:.0f}".format(lines / shared_time * 1e6)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+# =============================================================================
+# Snapshot comparison benchmark
+#
+# Copyright (c)  2016, Cisco Systems
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+# =============================================================================
+
+"""Measure the Post-Upgrade comparison of the plugin data of the fleet against the full walk it replaced.
+
+Every router saves the inventory, the active packages and the ISIS neighbors in the Pre-Upgrade phase.
+The Post-Upgrade data of the given share of routers differs in one node state. The full walk loads the
+Pre-Upgrade data of every section and compares every value, like the ISIS plugin did. The snapshot
+compares the section digests and loads only the changed sections.
+
+Run from the repository root::
+
+    python -m benchmarks.snapshot --routers 2000 --changed 0.01
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from csmpe.snapshot import Snapshot
+from csmpe.storage import SQLiteStorage
+
+
+class Context(object):
+    """The plugin context of the router keeping the data in the shared storage."""
+    def __init__(self, storage, host, phase):
+        self.storage = storage
+        self.host = host
+        self.phase = phase
+
+    def save_data(self, key, data):
+        self.storage.save(self.host, self.phase, key, [data, time.time()])
+
+    def load_data(self, key):
+        value = self.storage.load(self.host, key)
+        return (None, None) if value is None else tuple(value)
+
+    def info(self, message):
+        pass
+
+    def warning(self, message):
+        pass
+
+
+def router_data(index, changed=False):
+    """Return the sections of the router with 64 nodes, 60 packages and 8 ISIS instances."""
+    inventory = dict(("0/{}/CPU0".format(slot), {"type": "A9K-MOD80-SE", "state": "IOS XR RUN",
+                                                 "config_state": "PWR,NSHUT,MON"}) for slot in range(64))
+    if changed:
+        inventory["0/7/CPU0"]["state"] = "FAILED"
+    packages = ["asr9k-pkg{}-px-6.1.{}".format(n, index % 4) for n in range(60)]
+    isis = dict(("core{}".format(n), {"Up": ["0", "0", str(n)], "Init": ["0", "0", "0"], "Failed": ["0", "0", "0"]})
+                for n in range(8))
+    return {"inventory": inventory, "packages": packages, "isis_neighbors": isis}
+
+
+def full_walk(ctx, section, current):
+    """Return the number of values differing from the Pre-Upgrade data."""
+    previous, _ = ctx.load_data(section)
+    return _walk(previous, current)
+
+
+def _walk(previous, current):
+    if isinstance(previous, dict):
+        return sum(_walk(value, current.get(key)) for key, value in previous.items())
+    if isinstance(previous, list):
+        return sum(_walk(value, current[index] if index < len(current) else None)
+                   for index, value in enumerate(previous))
+    return int(previous != current)
+
+
+def snapshot(ctx, section, current):
+    return len(Snapshot(ctx).compare(section, current))
+
+
+def run(storage, routers, changed, compare):
+    """Return the CPU seconds and the number of changes of the Post-Upgrade comparison of the routers."""
+    start = time.clock()
+    changes = 0
+    for index in range(routers):
+        ctx = Context(storage, "rtr{}".format(index), "Post-Upgrade")
+        for section, data in router_data(index, index < changed).items():
+            changes += compare(ctx, section, data)
+    return time.clock() - start, changes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--routers", type=int, default=2000, help="The number of routers")
+    parser.add_argument("--changed", type=float, default=0.01, help="The share of the routers with the changes")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    try:
+        storage = SQLiteStorage(os.path.join(directory, "storage.db"), batch_size=1000)
+        for index in range(args.routers):
+            ctx = Context(storage, "rtr{}".format(index), "Pre-Upgrade")
+            for section, data in router_data(index).items():
+                Snapshot(ctx).save(section, data)
+        storage.flush()
+
+        changed = int(args.routers * args.changed)
+        data_time = run(storage, args.routers, changed, lambda ctx, section, data: 0)[0]
+        walk_time, walk_changes = run(storage, args.routers, changed, full_walk)
+        snapshot_time, snapshot_changes = run(storage, args.routers, changed, snapshot)
+        assert walk_changes == snapshot_changes == changed, (walk_changes, snapshot_changes)
+        storage.close()
+    finally:
+        shutil.rmtree(directory)
+
+    # the time of building the current data is not included
+    walk_time -= data_time
+    snapshot_time -= data_time
+    row = "{:<10} {:>8} {:>8} {:>14}"
+    print(row.format("Compare", "Routers", "Changed", "CPU [s]"))
+    print(row.format("Full walk", args.routers, changed, "{:.3f}".format(walk_time)))
+    print(row.format("Snapshot", args.routers, changed, "{:.3f}".format(snapshot_time)))
+    print("Speedup {:.2f}x".format(walk_time / snapshot_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+# =============================================================================
+# Template parsing benchmark
+#
+# Copyright (c)  2016, Cisco Systems
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+# =============================================================================
+
+"""Measure the template parsing of the show command outputs against the per line parsing it replaced.
+
+The corpus holds the outputs of the large devices for every converted parser: the ISIS neighbor summary
+and the FPD table. The legacy parsers are kept here as the reference and the results of both are compared
+before the measurement. The file systems and the install log keep their loops, one split per line is
+faster than any template there.
+
+Run from the repository root::
+
+    python -m benchmarks.templates --scale 16 --iterations 200
+"""
+
+import argparse
+import re
+import timeit
+
+from csmpe.core_plugins.csm_check_isis_neighbors.ios_xr.plugin import ISIS_NEIGHBOR_SUMMARY
+from csmpe.core_plugins.csm_install_operations.ios_xr.pre_migrate import FPD_NEED_UPGRADE
+
+
+def isis_output(scale):
+    """Return the ISIS neighbor summary of the scale * 4 instances."""
+    lines = ["RP/0/RP0/CPU0:#show isis neighbor summary", "Thu May 19 18:06:11.239 UTC", ""]
+    for instance in range(scale * 4):
+        lines += ["IS-IS core{} neighbor summary:".format(instance),
+                  "State         L1       L2     L1L2",
+                  "Up             0        {:<8} 1".format(instance),
+                  "Init           0        0        0",
+                  "Failed         0        0        0",
+                  ""]
+    return "\n".join(lines)
+
+
+def fpd_output(scale):
+    """Return the FPD table of the scale line cards with four FPD's each, one of eight needs the upgrade."""
+    lines = ["Location     Card Type               Version Type Subtype Inst   Version   Dng?",
+             "============ ======================== ======= ==== ======= ==== =========== ===="]
+    for slot in range(scale):
+        location = "0/{}/CPU0".format(slot)
+        for index, subtype in enumerate(["fpga2", "cbc", "rommon", "fpga3"]):
+            lines.append("{:<13}{:<25}{:<8}{:<5}{:<8}{:<5}{:>11} {}".format(
+                location if index == 0 else "", "A9K-8X100GE-SE" if index == 0 else "", "1.0" if index == 0 else "",
+                "lc", subtype, "0", "3.08", "Yes" if (slot * 4 + index) % 8 == 0 else "No"))
+    return "\n".join(lines)
+
+
+def legacy_isis(output):
+    """Three searches per line."""
+    isis_neighbor_info = {}
+    isis_instance = None
+    for line in output.split('\n'):
+        result = re.search('IS-IS (.*) neighbor summary:', line)
+        if result:
+            isis_instance = result.group(1)
+            isis_neighbor_info[isis_instance] = {}
+            continue
+        for state in ("Up", "Init", "Failed"):
+            result = re.search(state + r'\s+(\d+)\s+(\d+)\s+(\d+)', line)
+            if result and isis_instance:
+                isis_neighbor_info[isis_instance][state] = [result.group(n) for n in range(1, 4)]
+                break
+    return isis_neighbor_info
+
+
+def template_isis(output):
+    isis_neighbor_info = {}
+    for record in ISIS_NEIGHBOR_SUMMARY.parse(output):
+        state_dict = isis_neighbor_info.setdefault(record.INSTANCE, {})
+        if record.STATE:
+            state_dict[record.STATE] = [record.L1, record.L2, record.L1L2]
+    return isis_neighbor_info
+
+
+def legacy_fpd(output):
+    """The character offsets of the FPD table walked per line."""
+    node_pattern = re.compile(r"^\d+(/\w+)+$")
+    subtypes = {}
+    last_location = None
+    for line in output.split('\n'):
+        first_word = line.split(' ', 1)[0]
+        if node_pattern.match(first_word):
+            last_location = first_word
+        if last_location and len(line) >= 79 and line[76:79] == "Yes":
+            end = 51
+            while line[end] != ' ':
+                end += 1
+            subtypes.setdefault(line[51:end], set()).add(last_location)
+    return subtypes
+
+
+def template_fpd(output):
+    subtypes = {}
+    for record in FPD_NEED_UPGRADE.parse(output):
+        subtypes.setdefault(record.subtype, set()).add(record.location)
+    return subtypes
+
+
+def measure(function, output, iterations):
+    """Return the number of microseconds per parse."""
+    return min(timeit.repeat(lambda: function(output), number=iterations, repeat=3)) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, default=16, help="The number of line cards and the output size factor")
+    parser.add_argument("--iterations", type=int, default=200, help="The number of parses per measurement")
+    args = parser.parse_args()
+
+    cases = [
+        ("ISIS", isis_output(args.scale), legacy_isis, template_isis),
+        ("FPD", fpd_output(args.scale), legacy_fpd, template_fpd),
+    ]
+    row = "{:<12} {:>6} {:>14} {:>14} {:>9}"
+    print(row.format("Output", "Lines", "Legacy [us]", "Template [us]", "Speedup"))
+    for name, output, legacy, template in cases:
+        assert legacy(output) == template(output), name
+        legacy_time = measure(legacy, output, args.iterations)
+        template_time = measure(template, output, args.iterations)
+        print(row.format(name, output.count("\n") + 1, "{:.1f}".format(legacy_time),
+                         "{:.1f}".format(template_time), "{:.2f}x".format(legacy_time / template_time)))
+
+
+if __name__ == '__main__':
+    main()
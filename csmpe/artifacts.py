@@ -0,0 +1,239 @@
+# =============================================================================
+# ArtifactStore
+#
+# Copyright (c)  2016, Cisco Systems
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+# =============================================================================
+
+"""The compressed and deduplicated store of the captured command outputs.
+
+The outputs are stored as the blobs named by the SHA-256 digest of the content, so the capture identical
+to the previous one takes no additional space. Every capture is recorded in *index.jsonl* as the line::
+
+    {"host": "rtr1", "phase": "Pre-Upgrade", "command": "show running-config",
+     "name": "show-running-config.txt", "timestamp": 1476712800.0, "sha256": "...", "size": 12345,
+     "compression": "gzip", "blob": "blobs/ab/ab...gz"}
+
+The blobs are compressed with zstd if the *zstandard* package is installed or gzip otherwise.
+Use :meth:`ArtifactStore.entries`, :meth:`ArtifactStore.latest` and :meth:`ArtifactStore.read`
+to load the artifacts back.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+#: The environment variable enabling the artifact store in the given directory.
+ARTIFACTS_ENV = "CSMPE_ARTIFACTS"
+
+INDEX_FILE = "index.jsonl"
+BLOBS_DIR = "blobs"
+
+GZIP = "gzip"
+ZSTD = "zstd"
+_EXTENSIONS = {GZIP: ".gz", ZSTD: ".zst"}
+
+_CHUNK_SIZE = 64 * 1024
+
+
+def artifact_name(command):
+    """Return the file name of the command output. The same as the log directory file name."""
+    return re.sub(r"\W+", '-', command) + ".txt"
+
+
+def _to_bytes(data):
+    return data.encode("utf-8") if isinstance(data, unicode) else data
+
+
+class ArtifactStore(object):
+    """The content addressed artifact store.
+
+    :param root: the store directory
+    :param compression: 'zstd' or 'gzip'. If None zstd is used if available.
+    """
+    def __init__(self, root, compression=None):
+        if compression is None:
+            compression = ZSTD if zstandard is not None else GZIP
+        if compression not in _EXTENSIONS:
+            raise ValueError("Unknown compression: {}".format(compression))
+        if compression == ZSTD and zstandard is None:
+            raise ValueError("The zstd compression requires the zstandard package")
+        self.root = root
+        self.compression = compression
+        self.index_file = os.path.join(root, INDEX_FILE)
+        self._lock = threading.Lock()
+
+    def _blob(self, digest):
+        return os.path.join(BLOBS_DIR, digest[:2], digest + _EXTENSIONS[self.compression])
+
+    def _compressor(self, f):
+        if self.compression == ZSTD:
+            return zstandard.ZstdCompressor().stream_writer(f)
+        return gzip.GzipFile(fileobj=f, mode="wb", mtime=0)
+
+    def put(self, data, host, phase, command, timestamp=None):
+        """Store the command output and return the index entry."""
+        return self.put_chunks([data], host, phase, command, timestamp)
+
+    def put_chunks(self, chunks, host, phase, command, timestamp=None):
+        """Store the command output given as the iterable of chunks and return the index entry.
+
+        The output is compressed while read, so it is never kept in memory as a whole.
+        """
+        writer = self.writer(host, phase, command, timestamp)
+        try:
+            for chunk in chunks:
+                writer.write(chunk)
+        except BaseException:
+            writer.discard()
+            raise
+        return writer.commit()
+
+    def writer(self, host, phase, command, timestamp=None):
+        """Return the :class:`ArtifactWriter` storing the output written in chunks."""
+        return ArtifactWriter(self, host, phase, command, timestamp)
+
+    def _commit(self, tmp_file, digest, size, host, phase, command, timestamp):
+        blob = self._blob(digest)
+        blob_path = os.path.join(self.root, blob)
+        if os.path.exists(blob_path):
+            os.remove(tmp_file)
+        else:
+            if not os.path.exists(os.path.dirname(blob_path)):
+                try:
+                    os.makedirs(os.path.dirname(blob_path))
+                except OSError:
+                    pass  # created by the concurrent writer
+            os.rename(tmp_file, blob_path)
+
+        entry = {
+            'host': host,
+            'phase': phase,
+            'command': command,
+            'name': artifact_name(command),
+            'timestamp': time.time() if timestamp is None else timestamp,
+            'sha256': digest,
+            'size': size,
+            'compression': self.compression,
+            'blob': blob,
+        }
+        line = json.dumps(entry, sort_keys=True) + "\n"
+        with self._lock:
+            with open(self.index_file, "a") as f:
+                f.write(line)
+        return entry
+
+    def entries(self, host=None, phase=None, command=None, name=None):
+        """Return the list of index entries matching all given fields in the capture order."""
+        criteria = dict((key, value) for key, value in
+                        (('host', host), ('phase', phase), ('command', command), ('name', name))
+                        if value is not None)
+        result = []
+        try:
+            with open(self.index_file) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # the line truncated by the interrupted writer
+                    if all(entry.get(key) == value for key, value in criteria.items()):
+                        result.append(entry)
+        except (IOError, OSError):
+            pass
+        return result
+
+    def latest(self, host=None, phase=None, command=None, name=None):
+        """Return the most recent index entry matching all given fields or None."""
+        entries = self.entries(host, phase, command, name)
+        return max(entries, key=lambda entry: entry['timestamp']) if entries else None
+
+    def open(self, entry):
+        """Return the file object reading the decompressed artifact."""
+        path = os.path.join(self.root, entry['blob'])
+        if entry['compression'] == ZSTD:
+            if zstandard is None:
+                raise ValueError("The zstd compressed artifact requires the zstandard package")
+            return zstandard.ZstdDecompressor().stream_reader(open(path, "rb"))
+        return gzip.open(path, "rb")
+
+    def read(self, entry):
+        """Return the artifact content."""
+        f = self.open(entry)
+        try:
+            chunks = []
+            while True:
+                chunk = f.read(_CHUNK_SIZE)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+            return b"".join(chunks)
+        finally:
+            f.close()
+
+
+class ArtifactWriter(object):
+    """Compress and hash the artifact written in chunks. The artifact is stored by :meth:`commit`."""
+    def __init__(self, store, host, phase, command, timestamp=None):
+        self._store = store
+        self._fields = (host, phase, command, timestamp)
+        self._digest = hashlib.sha256()
+        self.size = 0
+
+        tmp_dir = os.path.join(store.root, BLOBS_DIR)
+        if not os.path.exists(tmp_dir):
+            try:
+                os.makedirs(tmp_dir)
+            except OSError:
+                pass  # created by the concurrent writer
+        self._tmp_file = os.path.join(tmp_dir, ".{}.{}.{}.tmp".format(os.getpid(), threading.current_thread().ident,
+                                                                      id(self)))
+        self._file = open(self._tmp_file, "wb")
+        self._compressor = store._compressor(self._file)
+
+    def write(self, chunk):
+        chunk = _to_bytes(chunk)
+        self._digest.update(chunk)
+        self.size += len(chunk)
+        self._compressor.write(chunk)
+
+    def _close(self):
+        self._compressor.close()
+        self._file.close()
+
+    def commit(self):
+        """Store the artifact and return the index entry."""
+        self._close()
+        return self._store._commit(self._tmp_file, self._digest.hexdigest(), self.size, *self._fields)
+
+    def discard(self):
+        self._close()
+        os.remove(self._tmp_file)
@@ -0,0 +1,144 @@
+# =============================================================================
+# Streaming command capture
+#
+# Copyright (c)  2016, Cisco Systems
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+# =============================================================================
+
+"""Read the command output from the device session as it arrives.
+
+The large outputs (i.e. ``show running-config`` or ``show tech``) are passed on in chunks ending
+with the complete lines instead of being collected as the single string. Only the tail of the
+output is kept to find the prompt ending the command.
+"""
+
+import re
+import time
+
+import pexpect
+from condoor.exceptions import ConnectionError, CommandSyntaxError, CommandTimeoutError
+
+#: The maximum number of bytes read from the session at once.
+CHUNK_SIZE = 65536
+
+#: The number of trailing bytes searched for the prompt. The same as the condoor search window.
+PROMPT_WINDOW = 4000
+
+
+def _compile(pattern):
+    return re.compile(pattern) if isinstance(pattern, basestring) else pattern
+
+
+class OutputStream(object):
+    """Iterate over the output chunks of the command already sent to the device.
+
+    :param ctrl: the condoor controller of the connected session
+    :param prompt_re: the regular expression of the device prompt ending the output
+    :param syntax_error_re: the regular expression of the device syntax error message or None
+    :param timeout: the maximum number of seconds to wait for the prompt
+    :param hostname: the hostname reported in the exceptions
+    :param command: the command reported in the exceptions
+    """
+    def __init__(self, ctrl, prompt_re, syntax_error_re=None, timeout=300, hostname=None, command=None):
+        self._ctrl = ctrl
+        self._prompt_re = _compile(prompt_re)
+        self._syntax_error_re = _compile(syntax_error_re) if syntax_error_re else None
+        self._timeout = timeout
+        self._hostname = hostname
+        self._command = command
+
+    def _read(self, deadline):
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            raise CommandTimeoutError(message="Command timeout", host=self._hostname, command=self._command)
+        try:
+            return self._ctrl.read_nonblocking(size=CHUNK_SIZE, timeout=remaining)
+        except pexpect.TIMEOUT:
+            raise CommandTimeoutError(message="Command timeout", host=self._hostname, command=self._command)
+        except pexpect.EOF:
+            raise ConnectionError("Unexpected session disconnect", host=self._hostname)
+
+    def __iter__(self):
+        deadline = time.time() + self._timeout
+        pending = ""
+        started = False
+        while True:
+            pending += self._read(deadline).replace('\r', '')
+            # the syntax error is reported by the device before any output
+            if not started and self._syntax_error_re and self._syntax_error_re.search(pending):
+                raise CommandSyntaxError("Command unknown", host=self._hostname, command=self._command)
+
+            match = self._prompt_re.search(pending, max(0, len(pending) - PROMPT_WINDOW - CHUNK_SIZE))
+            if match:
+                if match.start():
+                    yield pending[:match.start()]
+                return
+
+            # pass on the complete lines keeping the tail which may be the beginning of the prompt
+            end = pending.rfind('\n', 0, len(pending) - PROMPT_WINDOW)
+            if end >= 0:
+                started = True
+                yield pending[:end + 1]
+                pending = pending[end + 1:]
+
+
+class PatternMatcher(object):
+    """Match the output against the 'pass' and 'fail' regular expressions line by line.
+
+    The result is the same as of :func:`match_pattern` for the patterns not spanning multiple lines.
+
+    :param pattern: the dictionary with the optional 'pass' and 'fail' lists of regular expressions
+    """
+    def __init__(self, pattern):
+        self.pattern = pattern
+        self._pass_re = re.compile("|".join(pattern['pass'])) if pattern and 'pass' in pattern else None
+        self._fail_re = re.compile("|".join(pattern['fail'])) if pattern and 'fail' in pattern else None
+        self.passed = []
+        self.failed = []
+        self._partial = ""
+
+    def _match(self, line):
+        if self._pass_re and self._pass_re.search(line):
+            self.passed.append(line)
+        if self._fail_re and self._fail_re.search(line):
+            self.failed.append(line)
+
+    def feed(self, chunk):
+        lines = (self._partial + chunk).split('\n')
+        self._partial = lines.pop()
+        for line in lines:
+            self._match(line)
+
+    def close(self):
+        if self._partial:
+            self._match(self._partial)
+            self._partial = ""
+
+    def result(self):
+        """Return the (status, message) tuple."""
+        self.close()
+        if not self.pattern:
+            return True, "Pattern unspecified. Proceeding..."
+        if (self.passed or self._pass_re is None) and not self.failed:
+            return True, "Pattern {} matched in {}..!!!".format(self.pattern, "\n".join(self.passed))
+        return False, "Pattern {} not matched in {}!!!\n".format(self.pattern, "\n".join(self.failed))
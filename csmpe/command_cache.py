@@ -0,0 +1,123 @@
+# =============================================================================
+# CommandCache
+#
+# Copyright (c)  2016, Cisco Systems
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+# =============================================================================
+
+"""The session scoped cache of the idempotent show command outputs.
+
+Only the commands matching :data:`CACHEABLE_COMMANDS` are cached. Their output changes only when
+the software or configuration changes, so every command which is not known to be read-only
+(i.e. install, config, commit, reload, answers to the device prompts) clears the cache.
+The command output depends on the plane the command is sent in, so the admin plane
+(entered with the ``admin`` command on eXR) and XR plane entries are kept separately.
+"""
+
+import re
+import threading
+
+XR_PLANE = "xr"
+ADMIN_PLANE = "admin"
+
+#: The idempotent commands which output may be cached.
+#: The show platform and show install request are not cached as they are polled for the state changes.
+CACHEABLE_COMMANDS = [
+    r"(admin )?show install (active|inactive|committed|superseded|package|which)\b",
+    r"(admin )?show version( brief)?$",
+    r"(admin )?show inventory\b",
+    r"(admin )?show running-config\b",
+]
+
+#: The commands which do not change the device state and do not invalidate the cache.
+READ_ONLY_COMMANDS = [
+    r"$",
+    r"(admin )?(show|dir|ping|traceroute)\b",
+    r"term(inal)? ",
+]
+
+#: The output markers of the command not ready or failed. Such output is never cached.
+FAILED_OUTPUT = re.compile(r"Please try command later|^\s*% ?(Invalid|Incomplete|Ambiguous)|syntax error", re.M)
+
+
+def _compile(patterns):
+    return re.compile("|".join("(?:{})".format(pattern) for pattern in patterns))
+
+
+class CommandCache(object):
+    """The command output cache shared by the plugin contexts connected to the same device.
+
+    :param cacheable: the list of regular expressions matching the cacheable commands
+    """
+    def __init__(self, cacheable=None):
+        self._cacheable = _compile(cacheable or CACHEABLE_COMMANDS)
+        self._read_only = _compile(READ_ONLY_COMMANDS)
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+
+    @staticmethod
+    def _normalize(cmd):
+        return " ".join(cmd.split())
+
+    def is_cacheable(self, cmd):
+        return self._cacheable.match(self._normalize(cmd)) is not None
+
+    def is_read_only(self, cmd):
+        return self._read_only.match(self._normalize(cmd)) is not None
+
+    def get(self, plane, cmd):
+        """Return the cached output or None."""
+        with self._lock:
+            output = self._entries.get((plane, self._normalize(cmd)))
+            if output is not None:
+                self.hits += 1
+            return output
+
+    def put(self, plane, cmd, output):
+        """Store the command output unless it reports the command failure."""
+        if output is None or FAILED_OUTPUT.search(output):
+            return
+        with self._lock:
+            self._entries[(plane, self._normalize(cmd))] = output
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def observe(self, plane, cmd):
+        """Handle the not cacheable command and return the plane in which the next command is sent.
+
+        The mutating commands clear the cache. The ``admin`` and ``exit`` commands switch the plane.
+        """
+        cmd = self._normalize(cmd)
+        if cmd == "admin":
+            return ADMIN_PLANE
+        if cmd == "exit" and plane == ADMIN_PLANE:
+            return XR_PLANE
+        if not self.is_read_only(cmd):
+            self.invalidate()
+        return plane
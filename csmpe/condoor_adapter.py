@@ -0,0 +1,93 @@
+# =============================================================================
+# Condoor adapter
+#
+# Copyright (c)  2016, Cisco Systems
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+# =============================================================================
+
+"""Access the condoor connection internals not covered by its public interface.
+
+condoor can not pass on the command output as it arrives nor move the session logs of the open
+connection to another directory. The private attributes used for it are accessed only here and only
+with the condoor release they were verified with. The other releases fall back to the public
+:meth:`condoor.Connection.send` and the pooled sessions are not reused.
+"""
+
+import condoor
+from condoor.exceptions import ConnectionError
+
+from capture import OutputStream
+
+#: The (major, minor) condoor release the private attribute access is verified with.
+VERIFIED_VERSION = (1, 0)
+
+
+def condoor_version(version=None):
+    """Return the (major, minor) tuple of the version string or the installed condoor, None if not numeric."""
+    version = condoor.__version__ if version is None else version
+    try:
+        return tuple(int(part) for part in version.split(".")[:2])
+    except ValueError:
+        return None
+
+
+def is_verified(version=None):
+    """Return True if the private attributes are verified with the condoor version or the installed condoor."""
+    return condoor_version(version) == VERIFIED_VERSION
+
+
+def stream_command(connection, cmd, timeout=300, hostname=None):
+    """Send the command and return the :class:`csmpe.capture.OutputStream` of its output.
+
+    Return None without sending the command if the condoor release is not verified
+    or the connected session can not be read directly.
+    """
+    if not is_verified():
+        return None
+    try:
+        chain = connection._chain
+    except (AttributeError, ConnectionError):
+        return None
+    device = chain.target_device
+    if device is None or device.prompt_re is None or not chain.is_connected:
+        return None
+    connection.log("Sending command: '{}'".format(cmd))
+    chain.ctrl.send_command(cmd)
+    return OutputStream(chain.ctrl, device.prompt_re, device.driver.syntax_error_re, timeout=timeout,
+                        hostname=hostname, command=cmd)
+
+
+def redirect_logs(connection, log_dir):
+    """Reopen the session.log and condoor.log files of the connection in the log directory.
+
+    condoor opens the files once per connection. Return False if the condoor release is not verified.
+    """
+    if not is_verified():
+        return False
+    if connection._log_dir != log_dir:
+        connection.pause_session_logging()
+        connection._disable_logging()
+        connection._log_dir = log_dir
+        connection._enable_logging(None, None)
+        connection.resume_session_logging()
+    return True
@@ -29,34 +29,79 @@
 
 import logging
 import os
-import re
-from time import time
+import time
+import urlparse
+import uuid
 
 import condoor
+import log
 from decorators import delegate
+from discovery_cache import DiscoveryCache, DEFAULT_DISCOVERY_TTL
+from metrics import Metrics
+from command_cache import CommandCache, XR_PLANE
+from artifacts import ArtifactStore, ARTIFACTS_ENV, artifact_name
+from condoor_adapter import stream_command
+from output_filter import OutputFilter
+from storage import default_storage
+from status import StatusEvent, default_bus, classify, WARNING
 
 
 class PluginError(Exception):
     pass
 
 
+def _device_name(urls):
+    """Return the target urls of the host url chains without the credentials or None if there are no urls.
+
+    :param urls: the list of urls or list of url lists as passed to :class:`condoor.Connection`
+    """
+    if all(isinstance(url, basestring) for url in urls):
+        chains = [urls]
+    else:
+        chains = [url if isinstance(url, (list, tuple)) else [url] for url in urls]
+    targets = []
+    for chain in chains:
+        if chain:
+            parts = urlparse.urlsplit(chain[-1])
+            targets.append("{}://{}".format(parts.scheme, parts.netloc.rpartition('@')[2]))
+    return ",".join(targets) or None
+
+
 class InstallContext(object):
-    _storage = {}
+    """The CSM context used by the local runners.
+
+    The device is identified by the hostname or if not set by the target urls of the host url chains.
+    Every context gets the unique job id, so the runs sharing the storage do not overwrite their data.
 
-    def __init__(self):
-        self.hostname = "Hostname"
+    :param storage: the :class:`csmpe.storage.Storage` keeping the plugin data.
+                    If None the :func:`csmpe.storage.default_storage` is used.
+    """
+    def __init__(self, storage=None):
+        self._hostname = None
+        self.host_urls = []
+        self.job_id = uuid.uuid4().hex
         self._custom_commands = []
+        self._storage = storage if storage is not None else default_storage()
+
+    @property
+    def hostname(self):
+        return self._hostname or _device_name(self.host_urls)
+
+    @hostname.setter
+    def hostname(self, value):
+        self._hostname = value
 
     def post_status(self, message):
         print("[CSM Status] {}".format(message))
 
     def save_data(self, key, value):
-        #  print("Saving [{}]={}".format(key, str(value[0])))
-        self._storage[key] = value
+        if self.hostname is None:
+            raise ValueError("The hostname or host urls are required to save the data")
+        self._storage.save(self.hostname, self.job_id, key, value)
 
     def load_data(self, key):
-        #  print("Loading [{}]".format(key))
-        return self._storage.get(key, (None, None))
+        value = self._storage.load(self.hostname, key)
+        return (None, None) if value is None else value
 
     @property
     def custom_commands(self):
@@ -73,55 +118,176 @@ class Host(object):
     pass
 
 
-@delegate("_csm", ("post_status",), ("custom_commands", "success", "operation_id", "server_repository_url",
-                                     "software_packages", "hostname", "log_directory", "migration_directory",
-                                     "get_server", "get_host","nextlevel", "shell", "pattern", "tc_name", "tc_id",
-                                     "admin_mode", "issu_mode","op_id", "pkg_id", "version", "output", "on_box_pkg_names"))
-@delegate("_connection", ("connect", "disconnect", "reconnect", "discovery", "send", "run_fsm", "reload"),
+class _Serialized(object):
+    """Serialize the calls to the CSM context made from the concurrently dispatched plugins."""
+    def __init__(self, target, lock):
+        object.__setattr__(self, "_target", target)
+        object.__setattr__(self, "_lock", lock)
+
+    def __getattr__(self, name):
+        attribute = getattr(self._target, name)
+        if not callable(attribute):
+            return attribute
+
+        def call(*args, **kwargs):
+            with self._lock:
+                return attribute(*args, **kwargs)
+        return call
+
+    def __setattr__(self, name, value):
+        with self._lock:
+            setattr(self._target, name, value)
+
+
+class _EventBuffer(logging.Handler):
+    """Keep the log records until merged into the main plugin context."""
+    def __init__(self, events):
+        logging.Handler.__init__(self)
+        self.events = events
+
+    def emit(self, record):
+        self.events.append(("log", record))
+
+
+@delegate("_csm", (), ("custom_commands", "success", "operation_id", "server_repository_url",
+                       "software_packages", "hostname", "log_directory", "migration_directory",
+                       "get_server", "get_host","nextlevel", "shell", "pattern", "tc_name", "tc_id",
+                       "admin_mode", "issu_mode","op_id", "pkg_id", "version", "output", "on_box_pkg_names"))
+@delegate("_connection", ("connect", "disconnect", "discovery"),
           ("family", "prompt", "os_type", "os_version", "is_console"))
 class PluginContext(object):
     """ This is a class passed to the constructor during plugin instantiation.
     Thi class provides the API for the plugins to allow the communication with the CMS Server and device.
     """
-    def __init__(self, csm=None):
+    #: The list of buffered log records and status messages if the context is spawned for concurrent dispatch.
+    _events = None
+
+    #: The :class:`csmpe.session_pool.SessionPool` keeping the device session after the dispatch.
+    _pool = None
+
+    #: The :class:`csmpe.discovery_cache.DiscoveryCache` deciding if the device discovery is needed.
+    _discovery = DiscoveryCache(ttl=0)
+
+    #: The :class:`csmpe.metrics.Metrics` recording the plugin and device command timing.
+    _metrics = Metrics(enabled=False)
+
+    #: The plane (XR or admin) the next command is sent in. Used as the command cache key.
+    _plane = XR_PLANE
+
+    #: The :class:`csmpe.artifacts.ArtifactStore` keeping the captured outputs or None if not enabled.
+    _artifacts = None
+
+    #: The :class:`csmpe.status.StatusBus` delivering the status messages.
+    _status = None
+
+    def __init__(self, csm=None, pool=None):
         self._csm = csm
+        self._pool = pool
+        self._status = default_bus()
         self.current_plugin = ""
         if csm is not None:
-            self._connection = condoor.Connection(
-                self._csm.hostname,
-                self._csm.host_urls,
-                log_dir=self._csm.log_directory
-            )
+            self._discovery = DiscoveryCache(ttl=getattr(csm, "discovery_ttl", DEFAULT_DISCOVERY_TTL))
+            self._metrics = Metrics(self._csm.hostname, enabled=getattr(csm, "metrics", True))
+            self._commands = CommandCache()
+            artifact_dir = getattr(csm, "artifact_dir", None) or os.environ.get(ARTIFACTS_ENV)
+            if artifact_dir:
+                self._artifacts = ArtifactStore(artifact_dir)
             self._set_logging(hostname=self._csm.hostname, log_dir=self._csm.log_directory, log_level=logging.DEBUG)
-            self._connection.msg_callback = self._post_and_log
-            self._device_detect()
+            if pool is not None:
+                self._connection = pool.acquire(self._csm.host_urls, log_dir=self._csm.log_directory)
+            else:
+                self._connection = None
+
+            if self._connection is not None:
+                self._connection.msg_callback = self._post_and_log
+                self.info("Phase: Reusing the device session")
+                self._log_device_info()
+            else:
+                self._connection = condoor.Connection(
+                    self._csm.hostname,
+                    self._csm.host_urls,
+                    log_dir=self._csm.log_directory
+                )
+                self._connection.msg_callback = self._post_and_log
+                self._device_detect()
         else:
             self._connection = None
             self._set_logging()
 
+    def spawn(self, session_id, lock):
+        """Create the plugin context for the concurrently dispatched read-only plugins.
+
+        The new context opens its own device session logged to the *sessions/<session_id>* subdirectory
+        of the log directory. The log records and status messages are buffered until merged back with
+        :meth:`merge`. The calls to the CSM context are serialized using the lock.
+        """
+        ctx = PluginContext.__new__(PluginContext)
+        ctx._csm = _Serialized(self._csm, lock)
+        ctx._discovery = self._discovery
+        ctx._metrics = self._metrics
+        ctx._commands = self._commands
+        ctx._artifacts = self._artifacts
+        ctx.current_plugin = None
+        ctx._events = []
+        ctx._logger = logging.Logger("{}.plugin_manager.session{}".format(self._csm.hostname, session_id))
+        ctx._logger.setLevel(self._logger.level)
+        ctx._logger.addHandler(_EventBuffer(ctx._events))
+
+        log_dir = os.path.join(self._csm.log_directory, "sessions", str(session_id))
+        if not os.path.exists(log_dir):
+            os.makedirs(log_dir)
+        ctx._connection = condoor.Connection(self._csm.hostname, self._csm.host_urls, log_dir=log_dir)
+        ctx._connection.msg_callback = ctx._post_and_log
+        ctx.connect(force_discovery=False)
+        return ctx
+
+    def flush_events(self):
+        """Return and clear the buffered log records and status messages."""
+        events = list(self._events)
+        del self._events[:]
+        return events
+
+    def merge(self, events):
+        """Replay the log records and status messages buffered by the spawned context."""
+        for kind, event in events:
+            if kind == "log":
+                self._logger.handle(event)
+            else:
+                self.post_status(event)
+
+    def post_status(self, message):
+        """Post the status message to CSM on the calling thread and to the status bus sinks.
+
+        CSM updates the job with the database session of the calling thread, so every message is posted
+        to CSM directly. Only the local sinks of the status bus receive the rate limited progress messages.
+        """
+        if self._events is not None:
+            self._events.append(("status", message))
+        else:
+            self._csm.post_status(message)
+            kind, percent = classify(message)
+            self.post_event(kind, message, percent=percent)
+
+    def post_event(self, kind, message, percent=None):
+        """Post the typed status event to the status bus sinks. See :mod:`csmpe.status`."""
+        self._status.post(StatusEvent(kind, self._csm.hostname, message, percent=percent))
+
+    def flush_status(self):
+        """Wait until the posted status messages are delivered."""
+        self._status.flush()
+
     def _post_and_log(self, message):
         self.info(message)
         self.post_status(message)
         return
 
     def _set_logging(self, hostname="host", log_dir=None, log_level=logging.NOTSET):
-        self._logger = logging.getLogger("{}.plugin_manager".format(hostname))
-        formatter = logging.Formatter('%(asctime)-15s %(levelname)8s: %(message)s')
-        if log_dir:
-            if not os.path.exists(log_dir):
-                try:
-                    os.makedirs(log_dir)
-                except IOError:
-                    log_dir = "./"
-            log_filename = os.path.join(log_dir, 'plugins.log')
-            handler = logging.FileHandler(log_filename)
-
-        else:
-            handler = logging.StreamHandler()
-
-        handler.setFormatter(formatter)
-        self._logger.addHandler(handler)
-        self._logger.setLevel(log_level)
+        if log_dir and not os.path.exists(log_dir):
+            try:
+                os.makedirs(log_dir)
+            except (IOError, OSError):
+                log_dir = "./"
+        self._logger = log.get_logger("{}.plugin_manager".format(hostname), log_dir=log_dir, level=log_level)
 
     @property
     def TIMEOUT(self):
@@ -147,11 +313,181 @@ class PluginContext(object):
         self.info("Phase: Connecting")
         self.post_status("Connecting to device")
 
+        # the inventory and post upgrade checks always need the current device information
         if self.phase in ["Get-Inventory", "Post-Upgrade"]:
-            self.connect(force_discovery=True)
+            force_discovery = True
         else:
-            self.connect(force_discovery=True)
+            force_discovery = not self._discovery.is_valid(self._csm.host_urls)
+
+        if not force_discovery:
+            self.info("Using the cached device discovery")
+        self.connect(force_discovery=force_discovery)
+        if force_discovery:
+            self._discovery.update(self._csm.host_urls, self._connection)
+
+        self._log_device_info()
+
+    def reconnect(self, max_timeout=360, force_discovery=None):
+        """Reconnect to the device. If force_discovery is None the device discovery is done only
+        if the cached discovery expired or was invalidated."""
+        if force_discovery is None:
+            force_discovery = not self._discovery.is_valid(self._csm.host_urls)
+        self.invalidate_commands()
+        with self._metrics.reconnect(self.current_plugin):
+            self._connection.reconnect(max_timeout=max_timeout, force_discovery=force_discovery)
+        if force_discovery:
+            self._discovery.update(self._csm.host_urls, self._connection)
+
+    def send(self, cmd="", timeout=300, wait_for_string=None, password=False, use_cache=True,
+             include=None, exclude=None, begin=None):
+        """Send the command to the device and return the output. See :meth:`condoor.Connection.send`.
+
+        The output of the idempotent show commands is cached until any mutating command is sent.
+        The use_cache=False forces sending the command i.e. when polling for the state change.
+
+        The include, exclude and begin regular expressions filter the output lines. The filters are sent
+        to the device as the output pipes if the OS supports them, otherwise the output is filtered locally.
+        See :class:`csmpe.output_filter.OutputFilter`.
+        """
+        output_filter = OutputFilter(include, exclude, begin)
+        if output_filter:
+            output = self._commands.get(self._plane, cmd) if use_cache and self._commands.is_cacheable(cmd) else None
+            if output is not None:
+                self.info("Command output taken from cache: '{}'".format(cmd))
+                return output_filter.apply(output)
+            cmd, output_filter = output_filter.push(cmd, self._os_type())
+
+        cacheable = use_cache and wait_for_string is None and not password and self._commands.is_cacheable(cmd)
+        if cacheable:
+            output = self._commands.get(self._plane, cmd)
+            if output is not None:
+                self.info("Command output taken from cache: '{}'".format(cmd))
+                return output_filter.apply(output)
+        elif not password:
+            self._plane = self._commands.observe(self._plane, cmd)
+
+        with self._metrics.command("***" if password else cmd, self.current_plugin) as event:
+            output = self._connection.send(cmd, timeout=timeout, wait_for_string=wait_for_string, password=password)
+            event['bytes'] = len(output) if output else 0
+            if output_filter and output:
+                filtered = output_filter.apply(output)
+                # the bytes received only to be discarded, the size of the pushed filters output is unknown
+                event['locally_filtered_bytes'] = len(output) - len(filtered)
+
+        if cacheable:
+            self._commands.put(self._plane, cmd, output)
+        return output_filter.apply(output)
+
+    def _os_type(self):
+        try:
+            return self._connection.os_type
+        except AttributeError:
+            return None
+
+    def stream(self, cmd, timeout=300):
+        """Send the command to the device and yield the output chunks as they arrive.
 
+        Every chunk ends with the complete line. The command is sent when the iteration starts.
+        If the session can not be read directly the whole output is yielded as the single chunk.
+        """
+        if self._commands.is_cacheable(cmd):
+            output = self._commands.get(self._plane, cmd)
+            if output is not None:
+                self.info("Command output taken from cache: '{}'".format(cmd))
+                yield output
+                return
+        else:
+            self._plane = self._commands.observe(self._plane, cmd)
+
+        with self._metrics.command(cmd, self.current_plugin) as event:
+            chunks = stream_command(self._connection, cmd, timeout=timeout, hostname=self._csm.hostname)
+            if chunks is None:
+                chunks = [self._connection.send(cmd, timeout=timeout)]
+            size = 0
+            for chunk in chunks:
+                size += len(chunk)
+                event['bytes'] = size
+                yield chunk
+
+    def capture(self, cmd, sink, timeout=300, matcher=None):
+        """Send the command and pass the output chunks to the sink callable as they arrive.
+
+        :param matcher: the optional :class:`csmpe.capture.PatternMatcher` fed with the output
+        :return: the output size in bytes
+        """
+        size = 0
+        for chunk in self.stream(cmd, timeout=timeout):
+            if matcher is not None:
+                matcher.feed(chunk)
+            sink(chunk)
+            size += len(chunk)
+        return size
+
+    def capture_to_file(self, cmd, timeout=300, matcher=None):
+        """Stream the command output to the file the same as :meth:`save_to_file` without keeping it in memory.
+
+        :return: the file name
+        """
+        file_name = self.normalize_filename(cmd)
+        if self._artifacts is not None:
+            writer = self._artifacts.writer(self._csm.hostname, self.phase, cmd)
+            try:
+                self.capture(cmd, writer.write, timeout=timeout, matcher=matcher)
+            except BaseException:
+                writer.discard()
+                raise
+            entry = writer.commit()
+            self.info("File '{}' saved in artifact store as {}".format(file_name, entry['sha256'][:12]))
+            return file_name
+
+        full_path = os.path.join(self._csm.log_directory, file_name)
+        with open(full_path, "w") as f:
+            self.capture(cmd, f.write, timeout=timeout, matcher=matcher)
+        self.info("File '{}' saved in CSM log directory".format(file_name))
+        return file_name
+
+    def run_fsm(self, name, command, events, transitions, timeout, max_transitions=20):
+        """Run the Finite State Machine. See :meth:`condoor.Connection.run_fsm`."""
+        # the FSMs drive the install and configuration operations
+        self.invalidate_commands()
+        with self._metrics.fsm(name, command, self.current_plugin):
+            return self._connection.run_fsm(name, command, events, transitions, timeout,
+                                            max_transitions=max_transitions)
+
+    def invalidate_commands(self):
+        """Clear the command output cache."""
+        self._commands.invalidate()
+
+    def sleep(self, seconds):
+        """Sleep for the number of seconds. The time spent sleeping is recorded in metrics."""
+        with self._metrics.sleep(seconds, self.current_plugin):
+            time.sleep(seconds)
+
+    @property
+    def metrics(self):
+        """The :class:`csmpe.metrics.Metrics` of the context."""
+        return self._metrics
+
+    def write_metrics(self):
+        """Write the metrics timeline and Prometheus textfile to the log directory."""
+        try:
+            log_dir = self._csm.log_directory
+        except AttributeError:
+            return []
+        return self._metrics.write(log_dir)
+
+    def reload(self, *args, **kwargs):
+        """Reload the device and invalidate the cached discovery and command outputs."""
+        self.invalidate_discovery()
+        self.invalidate_commands()
+        self._plane = XR_PLANE
+        return self._connection.reload(*args, **kwargs)
+
+    def invalidate_discovery(self):
+        """Forget the cached device discovery. Must be called when the device reloads or the software changes."""
+        self._discovery.invalidate(self._csm.host_urls)
+
+    def _log_device_info(self):
         self.info("Hostname: {}".format(self._connection.hostname))
         self.info("Hardware family: {}".format(self._connection.family))
         self.info("Hardware platform: {}".format(self._connection.platform))
@@ -162,18 +498,45 @@ class PluginContext(object):
         self._csm.save_data("device_info", self._connection.device_info)
         self._csm.save_data("udi", self._connection.udi)
 
+    def release(self):
+        """Return the device session to the session pool or disconnect if the pool is not used."""
+        if self._pool is not None and self._connection is not None:
+            try:
+                connected = self._connection.is_connected
+            except Exception:
+                connected = False
+            if connected:
+                self._connection.msg_callback = None
+                self._pool.release(self._csm.host_urls, self._connection)
+                return
+        self.disconnect()
+
+    def invalidate_session(self):
+        """Do not return the device session to the pool. Called when the device state changes completely,
+        i.e. after the device reimage."""
+        if self._pool is not None:
+            self._pool.invalidate(self._csm.host_urls)
+            self._pool = None
+
     def _format_log(self, message):
         return "[{}] {}".format(self.current_plugin, message) if self.current_plugin else "{}".format(message)
 
+    def _log(self, level, message):
+        # the message is formatted by the log writer only if the level is enabled
+        if self.current_plugin:
+            self._logger.log(level, "[%s] %s", self.current_plugin, message)
+        else:
+            self._logger.log(level, "%s", message)
+
     def info(self, message):
         """Log INFO message"""
-        self._logger.info(self._format_log(message))
+        self._log(logging.INFO, message)
 
     def error(self, message):
         self.save_job_info('ERROR:' + self._format_log(message))
 
         """Log ERROR message"""
-        self._logger.error(self._format_log(message))
+        self._log(logging.ERROR, message)
         if self.shell == "Admin":
             self.info("Switching to admin mode")
             self.send("exit", timeout=30)
@@ -187,7 +550,9 @@ class PluginContext(object):
         self.save_job_info('WARNING: ' + self._format_log(message))
 
         """Log WARNING message"""
-        self._logger.warning(self._format_log(message))
+        self._log(logging.WARNING, message)
+        if self._csm is not None and self._events is None:
+            self.post_event(WARNING, self._format_log(message))
 
     def save_job_info(self, message):
         try:
@@ -201,7 +566,7 @@ class PluginContext(object):
         Stores (data, timestamp) tuple for key adding timestamp
         This tuple is saved to host context data
         """
-        self._csm.save_data(key, [data, time()])
+        self._csm.save_data(key, [data, time.time()])
         self.info("Key '{}' saved in CSM storage".format(key))
 
     def load_data(self, key):
@@ -209,13 +574,13 @@ class PluginContext(object):
         Loads (data, timestamp) tuple for the key from host context data
         """
         result = self._csm.load_data(key)
-        if result:
+        if isinstance(result, (list, tuple)):
+            result = tuple(result)
+        else:
+            result = result, None
+        if result[0] is not None:
             self.info("Key '{}' loaded from CSM storage".format(key))
-            if isinstance(result, list):
-                return tuple(result)
-            else:
-                return result, None
-        return None, None
+        return result
 
     # Storage API
     def save_job_data(self, key, data):
@@ -223,7 +588,7 @@ class PluginContext(object):
         Stores (data, timestamp) tuple for key adding timestamp
         This tuple is saved to install job data
         """
-        self._csm.save_job_data(key, [data, time()])
+        self._csm.save_job_data(key, [data, time.time()])
         self.info("Key '{}' saved in CSM storage".format(key))
 
     def load_job_data(self, key):
@@ -240,17 +605,25 @@ class PluginContext(object):
         return None, None
 
     def normalize_filename(self, name):
-        filename = re.sub(r"\W+", '-', name)
-        filename += ".txt"
-        return filename
+        return artifact_name(name)
+
+    @property
+    def artifacts(self):
+        """The :class:`csmpe.artifacts.ArtifactStore` or None if the store is not enabled."""
+        return self._artifacts
 
     def save_to_file(self, name, data):
         """
-        Save data to filename in the log_directory provided by CSM
+        Save data to filename in the log_directory provided by CSM.
+        If the artifact store is enabled the data is saved in the store instead.
         """
+        file_name = self.normalize_filename(name)
+        if self._artifacts is not None:
+            entry = self._artifacts.put(data, self._csm.hostname, self.phase, name)
+            self.info("File '{}' saved in artifact store as {}".format(file_name, entry['sha256'][:12]))
+            return file_name
 
         store_dir = self._csm.log_directory
-        file_name = self.normalize_filename(name)
         full_path = os.path.join(store_dir, file_name)
         with open(full_path, "w") as f:
             f.write(data)
@@ -263,6 +636,11 @@ class PluginContext(object):
         Load data from file where full path is provided as file_name
         """
         full_path = file_name
+        if self._artifacts is not None and not os.path.exists(full_path):
+            entry = self._artifacts.latest(host=self._csm.hostname, name=os.path.basename(file_name))
+            if entry is not None:
+                self.info("File '{}' loaded from artifact store".format(entry['name']))
+                return self._artifacts.read(entry)
         with open(full_path, "r") as f:
             data = f.read()
             self.info("File '{}' loaded from CSM directory".format(os.path.basename(file_name)))
@@ -23,18 +23,30 @@
 # ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
 # THE POSSIBILITY OF SUCH DAMAGE.
 # =============================================================================
-import re
-from time import time
-from datetime import datetime
 from csmpe.plugins import CSMPlugin
+from csmpe.parsers import Template
+from csmpe.snapshot import Snapshot
 from condoor.exceptions import CommandSyntaxError
 
+ISIS_NEIGHBOR_SUMMARY = Template(r"""
+Value Filldown,Required INSTANCE (.*)
+Value STATE (Up|Init|Failed)
+Value L1 (\d+)
+Value L2 (\d+)
+Value L1L2 (\d+)
+
+Start
+  ^.*?IS-IS ${INSTANCE} neighbor summary: -> Record
+  ^.*?${STATE}\s+${L1}\s+${L2}\s+${L1L2} -> Record
+""")
+
 
 class Plugin(CSMPlugin):
     """This plugin checks the ISIS neighbor."""
     name = "ISIS Neighbor Check Plugin"
     platforms = {'ASR9K', 'CRS', 'NCS1K', 'NCS4K', 'NCS5K', 'NCS5500', 'NCS6K', 'IOS-XRv'}
     phases = {'Pre-Upgrade', 'Post-Upgrade'}
+    read_only = True
 
     def run(self):
         """
@@ -67,27 +79,12 @@ class Plugin(CSMPlugin):
             return
 
         if output:
-            isis_instance = None
-            for line in output.split('\n'):
-                result = re.search('IS-IS (.*) neighbor summary:', line)
-                if result:
-                    isis_instance = result.group(1)
-                    isis_neighbor_info[isis_instance] = {}
-                    continue
-                result = re.search('Up\s+(\d+)\s+(\d+)\s+(\d+)', line)
-                if result and isis_instance:
-                    isis_neighbor_info[isis_instance]["Up"] = [result.group(n) for n in range(1, 4)]
-                    continue
-                result = re.search('Init\s+(\d+)\s+(\d+)\s+(\d+)', line)
-                if result and isis_instance:
-                    isis_neighbor_info[isis_instance]["Init"] = [result.group(n) for n in range(1, 4)]
-                    continue
-                result = re.search('Failed\s+(\d+)\s+(\d+)\s+(\d+)', line)
-                if result and isis_instance:
-                    isis_neighbor_info[isis_instance]["Failed"] = [result.group(n) for n in range(1, 4)]
-                    continue
+            for record in ISIS_NEIGHBOR_SUMMARY.parse(output):
+                state_dict = isis_neighbor_info.setdefault(record.INSTANCE, {})
+                if record.STATE:
+                    state_dict[record.STATE] = [record.L1, record.L2, record.L1L2]
 
-            if isis_instance:
+            if isis_neighbor_info:
                 self.ctx.info("There is {} ISIS protocol instance(s) active".format(len(isis_neighbor_info)))
                 for instance, state_dict in isis_neighbor_info.items():
                     for state, neighbors in state_dict.items():
@@ -97,54 +94,11 @@ class Plugin(CSMPlugin):
                 if filename:
                     self.ctx.info("The '{}' command output saved to {}".format(cmd, filename))
 
-                if self.ctx.phase == "Pre-Upgrade":
-                    self.ctx.save_data("isis_neighbors", isis_neighbor_info)
-                    if filename:
-                        # store the full_path to command output under the cmd key
-                        self.ctx.save_data(cmd, filename)
+                if self.ctx.phase == "Pre-Upgrade" and filename:
+                    # store the full_path to command output under the cmd key
+                    self.ctx.save_data(cmd, filename)
 
             else:
                 self.ctx.info("No ISIS protocol instance active")
 
-            if self.ctx.phase == "Post-Upgrade":
-                self.compare_data("isis_neighbors", isis_neighbor_info)
-
-    def compare_data(self, storage_key, current_data):
-        levels = ["L1", "L2", "L1L2"]
-        previous_data, timestamp = self.ctx.load_data(storage_key)
-        if previous_data is None:
-            self.ctx.warning("No data stored from Pre-Upgrade phase. Can't compare.")
-            return
-
-        if previous_data:
-            self.ctx.info("Pre-Upgrade phase data available for comparison")
-            self.ctx.info("Pre-Upgrade data collected on {}".format(
-                datetime.fromtimestamp(int(timestamp)).strftime('%Y-%m-%d %H:%M:%S')))
-            if timestamp < time() - (60 * 60 * 2):  # two hours
-                self.ctx.warning("Pre-Upgrade phase data older than 2 hours")
-
-            for previous_instance, previous_state_dict in previous_data.items():
-                try:
-                    current_state_dict = current_data[previous_instance]
-                except KeyError:
-                    self.ctx.warning("No ISIS instance '{}' detected after upgrade".format(previous_instance))
-                    continue
-
-                for state, previous_neighbors in previous_state_dict.items():
-                    current_neighbors = current_state_dict[state]
-                    if previous_neighbors != current_neighbors:
-                        for level in range(3):
-                            if previous_neighbors[level] != current_neighbors[level]:
-                                self.ctx.warning(
-                                    "Number of ISIS neighbors for instance '{}' in state {} at {} is different"
-                                    "Pre-Install={} Post-Install={}".format(
-                                        previous_instance, state, levels[level], previous_neighbors[level],
-                                        current_neighbors[level]
-                                    )
-                                )
-                else:
-                    self.ctx.info("Number of ISIS neighbors for instance '{}' is the "
-                                  "same as during pre-install check".format(previous_instance))
-        else:
-            self.ctx.warning("No data stored from Pre-Upgrade phase")
-            return
+            Snapshot(self.ctx).record("isis_neighbors", isis_neighbor_info)
@@ -35,11 +35,12 @@ class Plugin(CSMPlugin):
     name = "Config Capture Plugin"
     platforms = {'ASR9K', 'CRS', 'NCS1K', 'NCS4K', 'NCS5K', 'NCS5500', 'NCS6K', 'ASR900', 'N6K', 'IOS-XRv'}
     phases = {'Pre-Upgrade', 'Post-Upgrade'}
+    read_only = True
 
     def run(self):
         cmd = "show running-config"
-        output = self.ctx.send(cmd, timeout=2200)
-        file_name = self.ctx.save_to_file(cmd, output)
+        # the configuration may be tens of MB so it is written to the file as it arrives
+        file_name = self.ctx.capture_to_file(cmd, timeout=2200)
         if file_name is None:
             self.ctx.error("Unable to save device configuration to file: {}".format(file_name))
             return False
@@ -28,6 +28,7 @@
 
 from csmpe.plugins import CSMPlugin
 from condoor.exceptions import CommandSyntaxError
+from csmpe.capture import PatternMatcher
 from csmpe.core_plugins.csm_install_operations.exr.install import send_admin_cmd, match_pattern
 from csmpe.core_plugins.csm_install_operations.exr.install import report_log
 
@@ -47,15 +48,16 @@ class Plugin(CSMPlugin):
                     if shell == "AdminBash" or shell == "Admin":
                         self.ctx.info("Sending admin command")
                         output = send_admin_cmd(self.ctx, cmd)
+                        self.ctx.info("command sent {}".format(cmd))
+                        status, message = match_pattern(self.ctx.pattern, output)
+                        file_name = self.ctx.save_to_file(cmd, output)
                     else:
-                        output = self.ctx.send(cmd, timeout=2200)
-                    self.ctx.info("command sent {}".format(cmd))
-                    if self.ctx.pattern:
-                        status, message = match_pattern(self.ctx.pattern, output) 
-                        report_log(self.ctx, status, message)
-                    else:
-                        report_log(self.ctx, True, "Pattern unspecified. Proceeding...")
-                    file_name = self.ctx.save_to_file(cmd, output)
+                        # the output is matched and written to the file as it arrives
+                        matcher = PatternMatcher(self.ctx.pattern)
+                        file_name = self.ctx.capture_to_file(cmd, timeout=2200, matcher=matcher)
+                        self.ctx.info("command sent {}".format(cmd))
+                        status, message = matcher.result()
+                    report_log(self.ctx, status, message)
 
                     if file_name is None:
                         self.ctx.error("Unable to save '{}' output to file: {}".format(cmd, file_name))
@@ -24,8 +24,8 @@
 # THE POSSIBILITY OF SUCH DAMAGE.
 # =============================================================================
 
-import re
 from csmpe.plugins import CSMPlugin
+from csmpe.log_scanner import DEFAULT_PATTERNS, LogScanner
 
 
 class Plugin(CSMPlugin):
@@ -33,28 +33,29 @@ class Plugin(CSMPlugin):
     name = "Core Error Check Plugin"
     platforms = {'ASR9K', 'CRS', 'NCS1K', 'NCS4K', 'NCS5K', 'NCS5500', 'NCS6K', 'IOS-XRv'}
     phases = {'Post-Upgrade'}
+    read_only = True
 
     # matching any errors, core and traceback
-    _string_to_check_re = re.compile(
-        "^(.*(?:[Ee][Rr][Rr][Oo][Rr]|Core for pid|Traceback).*)$", re.MULTILINE
-    )
+    patterns = DEFAULT_PATTERNS
 
-    # TODO: Check log against
-    # "Version of existing saved configuration detected to be incompatible with the installed software"
-    # cfgmgr-rp[165]: %MGBL-CONFIG-4-VERSION : Version of existing saved configuration detected to be incompatible
-    # with the installed software. Configuration will be restored from an alternate source and may take
-    # longer than usual on this boot.
+    # the timestamp of the last log entry checked
+    cursor_key = "error_core_check_cursor"
 
     def run(self):
-        # FIXME: Consider optimization
-        # The log may be large
-        # Maybe better run sh logging | i "Error|error|ERROR|Traceback|Core for pid" directly on the device
-        cmd = "show logging last 500"
-        output = self.ctx.send(cmd, timeout=300)
-
-        file_name = self.ctx.save_to_file(cmd, output)
+        cursor, _ = self.ctx.load_data(self.cursor_key)
+        if cursor:
+            self.ctx.info("Checking device log entries after {}".format(cursor))
+        scanner = LogScanner(self.patterns, cursor=cursor)
+
+        # the log is scanned while it is saved, it is never kept in memory as a whole
+        cmd = "show logging"
+        file_name = self.ctx.capture_to_file(cmd, timeout=300, matcher=scanner)
+        scanner.close()
         if file_name:
             self.ctx.info("Device log saved to {}".format(file_name))
 
-        for match in re.finditer(self._string_to_check_re, output):
-            self.ctx.warning(match.group())
+        for finding in scanner.findings:
+            self.ctx.warning(str(finding))
+
+        if scanner.cursor:
+            self.ctx.save_data(self.cursor_key, scanner.cursor)
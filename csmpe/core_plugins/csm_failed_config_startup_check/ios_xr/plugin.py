@@ -36,6 +36,7 @@ class Plugin(CSMPlugin):
     name = "Check Failed Startup Config Plugin"
     platforms = {'ASR9K', 'CRS', 'NCS1K', 'NCS4K', 'NCS5K', 'NCS5500', 'NCS6K', 'IOS-XRv'}
     phases = {'Post-Activate', 'Post-Upgrade'}
+    read_only = True
 
     def run(self):
         output = self.ctx.send("show configuration failed startup")
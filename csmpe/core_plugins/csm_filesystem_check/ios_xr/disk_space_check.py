@@ -39,6 +39,7 @@ class Plugin(CSMPlugin):
     platforms = {'ASR9K', 'CRS'}
     phases = {'Pre-Add'}
     os = {'XR'}
+    read_only = True
 
     def _get_pie_size(self, package_url):
         """
@@ -24,7 +24,6 @@
 # THE POSSIBILITY OF SUCH DAMAGE.
 # =============================================================================
 
-import time
 from csmpe.plugins import CSMPlugin
 
 
@@ -98,7 +97,7 @@ def get_output_in_admin_mode(ctx, cmd, admin=True):
     while x < 60:
         if 'Please try command later' in output:
             x += 1
-            time.sleep(10)
+            ctx.sleep(10)
             output = ctx.send(cmd)
         else:
             break
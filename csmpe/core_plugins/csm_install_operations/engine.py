@@ -0,0 +1,348 @@
+# coding=utf-8
+# =============================================================================
+#
+# Copyright (c) 2016, Cisco Systems
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+# =============================================================================
+
+"""The install operation engine shared by the operating systems.
+
+The engine watches the install operations, waits for the device reload and checks the node states.
+The OS specific commands, output patterns and parsers are described by the :class:`InstallProfile`.
+All the timeouts, poll intervals and reconnect attempts are taken from the single :class:`InstallPolicy`.
+"""
+
+import itertools
+import json
+import re
+import time
+
+from condoor import ConnectionError, ConnectionTimeoutError
+
+from csmpe.core_plugins.csm_install_operations.progress import Backoff, ProgressEstimator, format_eta
+from csmpe.core_plugins.csm_install_operations.reachability import wait_for_reachable, poll_until
+from csmpe.core_plugins.csm_install_operations.timeline import NodeTimeline
+
+INSTALL_ERROR_PATTERN = re.compile("Error:    (.*)$", re.MULTILINE)
+
+PROPELLER = ["|", "/", "-", "\\"]
+
+
+class InstallPolicy(object):
+    """The polling, reconnect and timeout policy of the install operations.
+
+    :param watch_min_interval: the first install operation poll interval in seconds
+    :param watch_max_interval: the maximum install operation poll interval in seconds
+    :param command_timeout: the timeout of the install request command in seconds
+    :param reconnect_attempts: the number of reconnects while watching the operation
+    :param reconnect_delay: the number of seconds waited before reconnecting
+    :param reload_timeout: the maximum number of seconds for the device to boot
+    :param ready_timeout: the maximum number of seconds for the nodes to come up after the boot
+    :param platform_timeout: the timeout of the node state command in seconds
+    :param node_quorum: the fraction of the nodes other than the required ones which must come up
+    :param stuck_timeout: the number of seconds the node not changing the state is reported as stuck
+    """
+    def __init__(self, watch_min_interval=5, watch_max_interval=60, command_timeout=300, reconnect_attempts=3,
+                 reconnect_delay=60, reload_timeout=1500, ready_timeout=3600, platform_timeout=600,
+                 node_quorum=1.0, stuck_timeout=900):
+        self.watch_min_interval = watch_min_interval
+        self.watch_max_interval = watch_max_interval
+        self.command_timeout = command_timeout
+        self.reconnect_attempts = reconnect_attempts
+        self.reconnect_delay = reconnect_delay
+        self.reload_timeout = reload_timeout
+        self.ready_timeout = ready_timeout
+        self.platform_timeout = platform_timeout
+        self.node_quorum = node_quorum
+        self.stuck_timeout = stuck_timeout
+
+
+DEFAULT_POLICY = InstallPolicy()
+
+
+class InstallProfile(object):
+    """The OS specific commands and parsers used by the :class:`InstallEngine`.
+
+    :param name: the profile name
+    :param show_platform: the command showing the node states
+    :param parse_platform: the function(ctx, output) returning the {node: {'state': state}} inventory
+    :param valid_states: the node states accepted as up
+    :param node_filter: the substring of the node names checked or None to check all nodes
+    :param required_node: the pattern of the nodes which must always come up i.e. the route processors
+    :param required_state: the string which must be present in the node state output
+    :param ready_check: the function(ctx, output) replacing the node state check
+    :param ready_prompt: the prompt pattern the node state command waits for
+    :param before_check: the function(ctx) called before every node state command
+    :param show_request: the command showing the install operation in progress
+    :param no_install: the string reported when no install operation is in progress
+    :param op_progress: the progress pattern formatted with the operation id
+    :param op_download: the download progress pattern
+    :param success: the completion banner pattern formatted with the operation id
+    :param error_pattern: the compiled pattern of the install errors
+    :param console_boot: the boot messages are followed on the console instead of reconnecting
+    :param report: the function(ctx, status, message) recording the result of the reload
+    :param reload_timeout: the policy reload_timeout override
+    :param ready_timeout: the policy ready_timeout override
+    """
+    def __init__(self, name, show_platform="show platform", parse_platform=None, valid_states=(), node_filter=None,
+                 required_node=None, required_state=None, ready_check=None, ready_prompt=None, before_check=None,
+                 show_request="show install request", no_install=None, op_progress=None, op_download=None,
+                 success=None, error_pattern=INSTALL_ERROR_PATTERN, console_boot=False, report=None,
+                 reload_timeout=None, ready_timeout=None):
+        self.name = name
+        self.show_platform = show_platform
+        self.parse_platform = parse_platform
+        self.valid_states = frozenset(valid_states)
+        self.node_filter = node_filter
+        self.required_node = re.compile(required_node) if required_node else None
+        self.required_state = required_state
+        self.ready_check = ready_check
+        self.ready_prompt = ready_prompt
+        self.before_check = before_check
+        self.show_request = show_request
+        self.no_install = no_install
+        self.op_progress = op_progress
+        self.op_download = op_download
+        self.success = success
+        self.error_pattern = error_pattern
+        self.console_boot = console_boot
+        self.report = report
+        self.reload_timeout = reload_timeout
+        self.ready_timeout = ready_timeout
+
+    def node_states(self, inventory):
+        """Return the dictionary of the checked node -> state."""
+        return dict((key, value['state']) for key, value in (inventory or {}).items()
+                    if self.node_filter is None or self.node_filter in key)
+
+    def is_required(self, node):
+        return self.required_node is None or self.required_node.search(node) is not None
+
+    def validate_node_state(self, inventory):
+        """Return True if all the checked nodes are in the valid state."""
+        return all(state in self.valid_states for state in self.node_states(inventory).values())
+
+    def nodes_ready(self, ctx, output):
+        """Return True if the node state command output reports all nodes up."""
+        if self.ready_check is not None:
+            return self.ready_check(ctx, output)
+        if self.required_state is not None and self.required_state not in output:
+            return False
+        return self.validate_node_state(self.parse_platform(ctx, output))
+
+
+class InstallEngine(object):
+    """Watch the install operations and the reloads with the profile commands and the policy timing.
+
+    :param ctx: the plugin context
+    :param profile: the :class:`InstallProfile` of the device OS
+    :param policy: the :class:`InstallPolicy`
+    :param clock: the callable returning the current time
+    """
+    def __init__(self, ctx, profile, policy=DEFAULT_POLICY, clock=time.time):
+        self.ctx = ctx
+        self.profile = profile
+        self.policy = policy
+        self.clock = clock
+
+    def log_install_errors(self, output):
+        for line in self.profile.error_pattern.findall(output):
+            self.ctx.warning(line)
+
+    def watch_operation(self, op_id=0):
+        """Wait for the install operation running in the background to complete and report the progress.
+
+        The completion banner printed to the terminal is awaited between the install request polls,
+        so the completion is detected as soon as it is printed. The polls are frequent at the beginning
+        and back off for the long operations, but never go far beyond the estimated completion time.
+
+        :return: the last install request command output
+        """
+        ctx, profile, policy = self.ctx, self.profile, self.policy
+        op_id = str(op_id)
+        success = profile.success.format(op_id)
+        op_progress = profile.op_progress.format(op_id)
+
+        ctx.info("Watching the operation {} to complete".format(op_id))
+
+        propeller = itertools.cycle(PROPELLER)
+        backoff = Backoff(policy.watch_min_interval, policy.watch_max_interval)
+        estimator = ProgressEstimator()
+        last_status = None
+        attempts = 0
+        output = ""
+        while True:
+            interval = next(backoff)
+            eta = estimator.eta(self.clock())
+            if eta is not None:
+                # do not wait much longer than the operation is expected to complete
+                interval = max(policy.watch_min_interval, min(interval, eta / 2))
+            try:
+                try:
+                    ctx.send("", wait_for_string=success, timeout=int(interval))
+                    ctx.info("Install operation {} completed".format(op_id))
+                    return output
+                except ctx.CommandTimeoutError:
+                    pass
+
+                output = ctx.send(profile.show_request, timeout=policy.command_timeout)
+                if op_id in output:
+                    message = self._progress_message(output, op_progress, propeller, estimator)
+                    if message != last_status:
+                        ctx.post_status(message)
+                        last_status = message
+            except (ConnectionError, ctx.CommandTimeoutError):
+                if attempts >= policy.reconnect_attempts:
+                    raise
+                attempts += 1
+                ctx.disconnect()
+                ctx.sleep(policy.reconnect_delay)
+                # the operation is still in progress so the cached discovery is valid
+                ctx.reconnect()
+                backoff.reset()
+
+            if profile.no_install in output or re.search(success, output):
+                return output
+
+    def _progress_message(self, output, op_progress, propeller, estimator):
+        message = ""
+        result = re.search(op_progress, output)
+        if result:
+            estimator.add(int(result.group(1)), self.clock())
+            message = "{} {}".format(next(propeller), result.group(0))
+            eta = estimator.eta(self.clock())
+            if eta is not None:
+                message += ", ETA {}".format(format_eta(eta))
+
+        if self.profile.op_download:
+            result = re.search(self.profile.op_download, output)
+            if result:
+                message += "\r\n<br>{}".format(result.group(0))
+        return message
+
+    def wait_for_reload(self):
+        """Wait for the reloading device to boot, reconnect and wait for all nodes to come up.
+
+        :return: True if all nodes came up
+        """
+        ctx, profile = self.ctx, self.profile
+        reload_timeout = profile.reload_timeout or self.policy.reload_timeout
+        ctx.invalidate_discovery()
+        begin = self.clock()
+
+        if profile.console_boot and ctx.is_console:
+            ctx.info("Keeping console connected")
+            ctx.post_status("Boot process started")
+            try:
+                ctx.reload(reload_timeout=reload_timeout, no_reload_cmd=True)
+            except (ConnectionTimeoutError, ConnectionError) as e:
+                ctx.post_status("Connection error: {}".format(e))
+                ctx.disconnect()
+                ctx.reconnect(max_timeout=reload_timeout, force_discovery=True)
+            ctx.info("Boot process finished")
+        else:
+            ctx.disconnect()
+            ctx.post_status("Waiting for device boot to reconnect")
+            ctx.info("Waiting for device boot to reconnect")
+            wait_for_reachable(ctx, timeout=reload_timeout)
+        ctx.info("Device connected successfully")
+
+        return self.wait_for_nodes(begin)
+
+    def wait_for_nodes(self, begin=None):
+        """Poll the node states until all nodes are up.
+
+        Every node state transition is recorded in the :attr:`timeline`. The wait ends as soon as
+        the required nodes and the policy quorum of the other nodes are up. The nodes not changing
+        the state for the policy stuck_timeout are reported.
+
+        :param begin: the time the outage started or None
+        :return: True if all nodes came up. The context error is raised otherwise.
+        """
+        ctx, profile, policy = self.ctx, self.profile, self.policy
+        ctx.info("Waiting for all nodes to come up")
+        ctx.post_status("Waiting for all nodes to come up")
+
+        output = [None]
+        timeline = None
+        if profile.ready_check is None:
+            timeline = NodeTimeline(profile.valid_states, profile.is_required, policy.node_quorum)
+        self.timeline = timeline
+        reported = set()
+
+        def all_nodes_up():
+            if profile.before_check is not None:
+                profile.before_check(ctx)
+            # show platform can take more than 1 minute after router reload. Issue No. 47
+            output[0] = ctx.send(profile.show_platform, wait_for_string=profile.ready_prompt,
+                                 timeout=policy.platform_timeout)
+            if timeline is None:
+                return profile.nodes_ready(ctx, output[0])
+
+            now = self.clock()
+            states = profile.node_states(profile.parse_platform(ctx, output[0]))
+            for node, previous, state in timeline.update(states, now):
+                ctx.info("Node {}: {} -> {}".format(node, previous, state))
+            for node, state, seconds in timeline.stuck(now, policy.stuck_timeout):
+                if node not in reported:
+                    reported.add(node)
+                    ctx.warning("Node {} stuck in state '{}' for {:.0f} second(s)".format(node, state, seconds))
+            if profile.required_state is not None and profile.required_state not in output[0]:
+                return False
+            return timeline.ready()
+
+        success = poll_until(ctx, all_nodes_up, timeout=profile.ready_timeout or policy.ready_timeout,
+                             clock=self.clock)
+        if timeline is not None:
+            self._report_timeline(timeline)
+
+        if success:
+            ctx.info("All nodes in desired state")
+            if begin is not None:
+                elapsed = self.clock() - begin
+                ctx.info("Overall outage time: {} minute(s) {:.0f} second(s)".format(elapsed // 60, elapsed % 60))
+            return True
+
+        message = "Not all nodes have came up: {}".format(output[0])
+        if profile.report is not None:
+            profile.report(ctx, False, message)
+        ctx.error(message)
+        # this will never be executed
+        return False
+
+    def _report_timeline(self, timeline):
+        ctx = self.ctx
+        up_times = timeline.up_times()
+        for node in sorted(up_times, key=up_times.get, reverse=True):
+            ctx.info("Node {} up after {:.0f} second(s)".format(node, up_times[node]))
+        pending = timeline.pending()
+        if pending:
+            ctx.warning("Nodes not up: {}".format(", ".join(pending)))
+        ctx.save_to_file("node timeline", json.dumps(timeline.export(), indent=2))
+
+
+def send_newline(fsm_ctx):
+    fsm_ctx.ctrl.sendline('\r\n')
+    fsm_ctx.ctrl.sendline('\r\n')
+    fsm_ctx.ctrl.sendline('\r\n')
+    return True
@@ -27,6 +27,7 @@
 
 from package_lib import SoftwarePackage
 from csmpe.plugins import CSMPlugin
+from csmpe.core_plugins.csm_install_operations.package_index import PackageIndex
 from install import install_activate_deactivate
 from install import wait_for_prompt
 from install import send_admin_cmd
@@ -68,17 +69,13 @@ class Plugin(CSMPlugin):
         installed_act.update(admin_installed_act)
 
         # Packages to activate but not already active
-        pkgs = pkgs - installed_act
+        pkgs = PackageIndex(installed_act).difference(pkgs)
         if pkgs:
-            packages_to_activate = set()
             # After the packages are considered equal according to SoftwarePackage.__eq__(),
             # Use the package name in the inactive area.  It is possible that the package
             # name given for Activation may be an external filename like below.
             # ncs6k-5.2.5.CSCuz65240.smu to ncs6k-5.2.5.CSCuz65240-1.0.0
-            for inactive_pkg in installed_inact:
-                for pkg in pkgs:
-                    if pkg == inactive_pkg:
-                        packages_to_activate.add(inactive_pkg)
+            packages_to_activate, not_inactive = PackageIndex(installed_inact).match(pkgs)
 
             if not packages_to_activate:
                 to_deactivate = " ".join(map(str, pkgs))
@@ -90,6 +87,9 @@ class Plugin(CSMPlugin):
                 self.ctx.error('To be activated packages not in inactive packages list.')
                 return None
             else:
+                if not_inactive:
+                    self.ctx.warning("Packages not in inactive packages list: {}".format(
+                        " ".join(map(str, not_inactive))))
                 if len(packages_to_activate) != len(packages):
                     self.ctx.info('Packages selected for activation: {}\n'.format(" ".join(map(str, packages))) +
                                   'Packages that are to be activated: {}'.format(" ".join(map(str,
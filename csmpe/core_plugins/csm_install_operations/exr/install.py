@@ -26,23 +26,22 @@
 # =============================================================================
 from functools import partial
 import os
-import itertools
 import re
 import time
 import json
-from condoor import ConnectionError, CommandError, ConnectionTimeoutError
+from condoor import CommandError
 from csmpe.core_plugins.csm_node_status_check.exr.plugin_lib import parse_show_platform
 from csmpe.core_plugins.csm_install_operations.actions import a_error
+from csmpe.core_plugins.csm_install_operations.engine import InstallEngine, InstallPolicy, InstallProfile
 
-install_error_pattern = re.compile("Error:    (.*)$", re.MULTILINE)
+# the prompts of the XR and admin planes, rommon and XML agent after the reload
+pattern_to_match = r"RP\/0\/RP0\/CPU0\:ios(\([^()]*\))?#|RP\/[0-3]\/RS?P[0-1](?:\/CPU[0-3])?:ios#|rommon \d+ >|XML>"
 
 plugin_ctx = None
 
 
 def log_install_errors(ctx, output):
-        errors = re.findall(install_error_pattern, output)
-        for line in errors:
-            ctx.warning(line)
+    InstallEngine(ctx, EXR_PROFILE).log_install_errors(output)
 
 
 def check_ncs6k_release(ctx):
@@ -115,79 +114,11 @@ def watch_operation(ctx, op_id=0):
 
     RP/0/RP0/CPU0:Deploy#May 24 22:25:43 Install operation 17 finished successfully
     """
-    no_install = r"No install operation in progress"
-    # In ASR9K eXR, the output to show install request may be "The install prepare operation 9 is 40% complete"
-    # or "The install service operation 9 is 40% complete" or "The install add operation 9 is 40% complete" and etc.
-    op_progress = r"The install \w*?\s?operation {} is (\d+)% complete".format(op_id)
-    success = "Install operation {} completed|finished successfully".format(op_id)
-
-    cmd_show_install_request = "show install request"
-    ctx.info("Watching the operation {} to complete".format(op_id))
-
-    propeller = itertools.cycle(["|", "/", "-", "\\", "|", "/", "-", "\\"])
-
-    last_status = None
-    finish = False
-    time_tried = 0
-    output = ""
-    while not finish:
-        try:
-            try:
-                # this is to catch the successful operation as soon as possible
-                ctx.send("", wait_for_string=success, timeout=20)
-                finish = True
-            except ctx.CommandTimeoutError:
-                pass
-            message = ""
-            output = ctx.send(cmd_show_install_request, timeout=300)
-            if op_id in output:
-                result = re.search(op_progress, output)
-                if result:
-                    status = result.group(0)
-                    message = "{} {}".format(propeller.next(), status)
-
-                if message != last_status:
-                    ctx.post_status(message)
-                    last_status = message
-        except (ConnectionError, ctx.CommandTimeoutError) as e:
-            if time_tried > 2:
-                raise e
-
-            time_tried += 1
-            ctx.disconnect()
-            time.sleep(60)
-            ctx.reconnect(force_discovery=True)
-
-        if no_install in output:
-            break
-
-    #report_install_status(ctx, op_id)
+    return InstallEngine(ctx, EXR_PROFILE).watch_operation(op_id)
 
 
 def validate_node_state(inventory):
-    valid_state = [
-        'IOS XR RUN',
-        'PRESENT',
-        'READY',
-        #'FAILED',
-        'OK',
-        'DISABLED',
-        'UNPOWERED',
-        'POWERED_OFF',
-        #'SW_INACTIVE',
-        #'ADMIN DOWN',
-        'OPERATIONAL',
-        'NOT ALLOW ONLIN',  # This is not spelling error
-    ]
-
-    for key, value in inventory.items():
-        if 'CPU' in key:
-            if value['state'] not in valid_state:
-                break
-    else:
-        return True
-
-    return False
+    return EXR_PROFILE.validate_node_state(inventory)
 
 
 def wait_for_reload(ctx):
@@ -195,92 +126,8 @@ def wait_for_reload(ctx):
      Wait for system to come up with max timeout as 25 Minutes
 
     """
-    begin = time.time()
-    pattern_to_match = r"RP\/0\/RP0\/CPU0\:ios(\([^()]*\))?#|RP\/[0-3]\/RS?P[0-1](?:\/CPU[0-3])?:ios#|rommon \d+ >|XML>"
-    if not ctx.is_console:
-        ctx.disconnect()
-        ctx.post_status("Waiting for device boot to reconnect")
-        ctx.info("Waiting for device boot to reconnect")
-        time.sleep(60)
-        ctx.reconnect(max_timeout=1500, force_discovery=True)  # 25 * 60 = 1500
-
-    else:
-        ctx.info("Keeping console connected")
-        ctx.post_status("Boot process started")
-        ctx.info("Boot process started")
-        #time.sleep(200)
-        #ctx.disconnect()
-        try:
-            ctx.reload(reload_timeout=1500, no_reload_cmd=True)  # 25 * 60 = 1500
-        except (ConnectionTimeoutError, ConnectionError) as e:
-            ctx.post_status("Connection error: {}".format(e))
-            try:
-                ctx.post_status("{}".format(ctx._connection.is_connected()))
-            except:
-                pass
-            try:
-                ctx.post_status("Trying to disconnect")
-                ctx.disconnect()
-                ctx.post_status("Disconnected")
-            except:
-                pass
-            try:
-                ctx.post_status("{}".format(ctx._connection.is_connected()))
-            except:
-                pass
-            try: 
-                ctx.post_status("Trying to reconnect")
-                ctx.connect(force_discovery=True)
-                ctx.post_status("Reconnected")
-            except:
-                pass
-    try:
-        ctx.post_status("{}".format(ctx._connection.is_connected()))
-    except:
-        pass
-    ctx.info("Boot process finished")
-    ctx.info("Device connected successfully")
-
-    timeout = 3600
-    poll_time = 30
-    time_waited = 0
-    xr_run = "IOS XR RUN"
-
-    cmd = "show platform"
-    ctx.info("Waiting for all nodes to come up")
-    ctx.post_status("Waiting for all nodes to come up")
+    return InstallEngine(ctx, EXR_PROFILE).wait_for_reload()
 
-    time.sleep(100)
-
-    while 1:
-        # Wait till all nodes are in XR run state
-        time_waited += poll_time
-        if time_waited >= timeout:
-            break
-
-        time.sleep(poll_time)
-
-        # show platform can take more than 1 minute after router reload. Issue No. 47
-        try:
-            if ctx.shell == "Admin":
-                ctx.info("Switching to admin mode")
-                ctx.send("admin", timeout=30)   
-        except:
-            pass    
-        output = ctx.send(cmd, wait_for_string=pattern_to_match , timeout=600)
-        if xr_run in output:
-            inventory = parse_show_platform(ctx, output)
-            if validate_node_state(inventory):
-                ctx.info("All nodes in desired state")
-                elapsed = time.time() - begin
-                ctx.info("Overall outage time: {} minute(s) {:.0f} second(s)".format(elapsed // 60, elapsed % 60))
-                return True
-
-    # Some nodes did not come to run state
-    report_log(ctx, False, "Not all nodes have came up: {}".format(output))
-    ctx.error("Not all nodes have came up: {}".format(output))
-    # this will never be executed
-    return False
 
 def observe_install_add_remove(ctx, output, has_tar=False):
     """
@@ -379,6 +226,51 @@ def report_log(ctx, status, message="No output to match pattern"):
         fd_log.write(json.dumps(data, indent=4))
     ctx.post_status("tc_id: {}, TC: {} :: {}".format(ctx.tc_id, ctx.tc_name, message))
 
+
+def switch_to_admin(ctx):
+    try:
+        if ctx.shell == "Admin":
+            ctx.info("Switching to admin mode")
+            ctx.send("admin", timeout=30)
+    except:
+        pass
+
+
+EXR_PROFILE = InstallProfile(
+    "eXR",
+    show_platform="show platform",
+    parse_platform=parse_show_platform,
+    valid_states=[
+        'IOS XR RUN',
+        'PRESENT',
+        'READY',
+        'OK',
+        'DISABLED',
+        'UNPOWERED',
+        'POWERED_OFF',
+        'OPERATIONAL',
+        'NOT ALLOW ONLIN',  # This is not spelling error
+    ],
+    node_filter='CPU',
+    required_node=r"RS?P\d",
+    required_state="IOS XR RUN",
+    ready_prompt=pattern_to_match,
+    before_check=switch_to_admin,
+    show_request="show install request",
+    no_install=r"No install operation in progress",
+    # In ASR9K eXR, the output to show install request may be "The install prepare operation 9 is 40% complete"
+    # or "The install service operation 9 is 40% complete" or "The install add operation 9 is 40% complete" and etc.
+    op_progress=r"The install \w*?\s?operation {} is (\d+)% complete",
+    success="Install operation {} completed|finished successfully",
+    console_boot=True,
+    report=report_log,
+)
+
+#: The remove all inactive operation may keep the busy device unresponsive for a long time,
+#: so up to 120 connection errors 30 seconds apart (about an hour) are tolerated.
+REMOVE_ALL_POLICY = InstallPolicy(reconnect_attempts=120, reconnect_delay=30)
+
+
 def report_install_status(ctx, op_id=-1, output=None):
     """
     :param ctx: CSM Context object
@@ -516,7 +408,7 @@ def handle_admin_reload(fsm_ctx):
     op_id = 0
     while op_id <= 0:
         output = plugin_ctx.send(cmd_show_install_request, timeout=30)
-        time.sleep(30)
+        plugin_ctx.sleep(30)
         op_id = get_sysadmin_op_id(output)
     try:
         if ctx.shell == "Admin":
@@ -529,7 +421,7 @@ def handle_admin_reload(fsm_ctx):
     except plugin_ctx.CommandTimeoutError:
         plugin_ctx.info("The device already started the reload")
         pass
-    time.sleep(150)
+    plugin_ctx.sleep(150)
     status = report_install_status(plugin_ctx, op_id)
     #success = wait_for_reload(plugin_ctx)
     #if not success:
@@ -565,7 +457,7 @@ def no_impact_warning(fsm_ctx):
     if plugin_ctx.nextlevel:
         nextlevel_processing(plugin_ctx)
     #sleep because sometimes console is not given instantly
-    time.sleep(5)
+    plugin_ctx.sleep(5)
     report_install_status(plugin_ctx, op_id, fsm_ctx.ctrl.after)
     return True
 
@@ -675,6 +567,8 @@ def install_activate_deactivate(ctx, cmd):
     RP/0/RSP0/CPU0:ios#Jun 09 15:53:51 Install operation 27 finished successfully
 
     """
+    # the software changes, the device must be discovered on next connection
+    ctx.invalidate_discovery()
     global plugin_ctx
     plugin_ctx = ctx
 
@@ -809,45 +703,7 @@ def observe_install_remove_all(ctx, cmd, prompt):
     ctx.info(message)
     ctx.post_status(message)
 
-    last_status = None
-    no_install = r"No install operation in progress"
-    op_progress = r"The install operation {} is (\d+)% complete".format(op_id)
-    cmd_show_install_request = "show install request"
-    propeller = itertools.cycle(["|", "/", "-", "\\", "|", "/", "-", "\\"])
-
-    finish = False
-    time_tried = 0
-    op_id = str(op_id)
-    while not finish:
-        try:
-            try:
-                # this is to catch the successful operation as soon as possible
-                ctx.send("", wait_for_string=oper_success, timeout=20)
-                finish = True
-            except ctx.CommandTimeoutError:
-                pass
-
-
-            message = ""
-            output = ctx.send(cmd_show_install_request, timeout=300)
-            if op_id in output:
-                result = re.search(op_progress, output)
-                if result:
-                    status = result.group(0)
-                    message = "{} {}".format(propeller.next(), status)
-
-                if message != last_status:
-                    ctx.post_status(message)
-                    last_status = message
-        except (ConnectionError, ctx.CommandTimeoutError) as e:
-            if time_tried > 120:
-                raise e
-
-            time_tried += 1
-            time.sleep(30)
-
-        if no_install in output:
-            break
+    InstallEngine(ctx, EXR_PROFILE, REMOVE_ALL_POLICY).watch_operation(op_id)
 
     cmd_show_install_log = "show install log {} detail".format(op_id)
     output = ctx.send(cmd_show_install_log, timeout=600)
@@ -871,7 +727,7 @@ def wait_for_prompt(ctx):
         if "No install operation in progress" in output:
             proceed = True
         if not proceed:
-            time.sleep(30)
+            ctx.sleep(30)
     return
 
 def process_save_data(ctx):
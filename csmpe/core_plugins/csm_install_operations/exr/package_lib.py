@@ -118,6 +118,8 @@ ncs5500-ospf-1.0.0.0-r601.x86_64.rpm-6.0.1                    ncs5500-ospf-1.0.0
 ncs5500-parser-1.0.0.0-r601.x86_64.rpm-6.0.1                  ncs5500-parser-1.0.0.0-r601
 """
 import re
+import threading
+from collections import OrderedDict
 
 platforms = ['asr9k', 'ncs1k', 'ncs4k', 'ncs5k', 'ncs5500', 'ncs6k', 'xrv9k']
 
@@ -136,100 +138,156 @@ subversion_dict = {"asr9k ncs1k ncs5k ncs5500 xrv9k":
                    re.compile("CSC.*(?P<SUBVERSION>\d+\.\d+\.\d+?)"),   # 0.0.4
                    }
 
+# Special handling for mini, full, and sysadmin ISO on ASR9K-X64, NCS1K, NCS5K, NCS5500
+# Example: ncs5500-mini-x.iso-6.0.1, asr9k-full-x64.iso-6.1.1
+# Package type string is before the 3 part version string
+# External Name: ncs5k-goldenk9-x.iso-6.3.1.11I.0, Internal Name: ncs5k-goldenk9-x-6.3.1.11I
+iso_types = ['full', 'mini', 'sysadmin', 'goldenk9']
+
+_platform_re = re.compile("({})-".format("|".join(platforms)))
+_iso_re = re.compile("|".join(iso_types))
+_three_part_re = re.compile("-\d+\.\d+\.\d+")
 
-class SoftwarePackage(object):
-    def __init__(self, package_name):
-        self.package_name = package_name
 
-        self._platform = None
-        self._package_type = None
-        self._version = None
-        self._smu = None
-        self._subversion = None
-
-    @property
-    def platform(self):
-        if not self._platform:
-            for platform in platforms:
-                if platform + "-" in self.package_name:
-                    self._platform = platform
-                    break
-
-        return self._platform
-
-    @property
-    def package_type(self):
-        if not self._package_type:
+class _Family(object):
+    """The patterns of the platforms sharing the package naming."""
+    __slots__ = ('version', 'subversion', 'package_type', 'smu_subversion')
+
+    def __init__(self, version, subversion, package_type, smu_subversion):
+        self.version = version
+        self.subversion = subversion
+        self.package_type = package_type
+        # For NCS6K, only need to consider subversion if it is a SMU.
+        self.smu_subversion = smu_subversion
+
+
+def _families():
+    families = {}
+    for keys, version in version_dict.items():
+        subversion = [value for names, value in subversion_dict.items() if keys.split()[0] in names.split()][0]
+        for platform in keys.split():
             # For ASR9K-X64, NCS1K, NCS5K, NCS5500:
             #     Extract the package type string before X.X.X.X
             # For NCS6K
             #     Extract the package type string before X.X.X
-            pattern = '-\d+\.\d+\.\d+' if self.platform == 'ncs6k' or \
-                self.platform == 'ncs4k' else '-\d\.\d\.\d.\d'
-
-            if self.platform and self.platform in self.package_name:
-                match = re.search(pattern, self.package_name)
-
-                # Special handling for mini, full, and sysadmin ISO on ASR9K-X64, NCS1K, NCS5K, NCS5500
-                # Example: ncs5500-mini-x.iso-6.0.1, asr9k-full-x64.iso-6.1.1
-                # Package type string is before the 3 part version string
-
-                # External Name: ncs5k-goldenk9-x.iso-6.3.1.11I.0, Internal Name: ncs5k-goldenk9-x-6.3.1.11I
-                if not match and sum([x in self.package_name for x in ['full', 'mini', 'sysadmin', 'goldenk9']]) > 0:
-                    # Use the three part match for these ISO packages
-                    match = re.search('-\d+\.\d+\.\d+', self.package_name)
-
-                if match:
-                    # Extract the package type
-                    self._package_type = self.package_name[0:match.start()].replace(self.platform + '-', '')
-
-                if self._package_type:
-                    # Takes care the external to internal name matching
-                    # Example, ncs6k-mgbl.pkg-5.2.5 -> mgbl, ncs5500-mini-x.iso-6.0.1 -> mini-x
-                    self._package_type = self._package_type.replace('.pkg', '').replace('.iso', '')
-
-        return self._package_type
-
-    @property
-    def version(self):
-        if not self._version:
-            dict_values = self.get_values(version_dict, self.platform)
-            if self.platform and dict_values:
-                to_match = self.package_name.replace(self.platform, '')
-                result = re.search(dict_values, to_match)
-                if result:
-                    self._version = result.group("VERSION")
-
-        return self._version
-
-    @property
-    def smu(self):
-        if not self._smu:
-            result = re.search(smu_re, self.package_name)
-            if result:
-                self._smu = result.group("SMU")
-
-        return self._smu
-
-    @property
-    def subversion(self):
-        if not self._subversion:
-            dict_values = self.get_values(subversion_dict, self.platform)
-            if self.platform and dict_values:
-                # For NCS6K, only need to consider subversion if it is a SMU.
-                if self.platform in ["asr9k", "ncs1k", "ncs5k", "ncs5500", "xrv9k"] or self.smu:
-                    to_match = self.package_name.replace(self.platform, '')
-                    result = re.search(dict_values, to_match)
-                    if result:
-                        self._subversion = result.group("SUBVERSION")
-
-        return self._subversion
-
-    def get_values(self, dictionary, key):
-        for keys in dictionary.keys():
-            if key in keys.split():
-                return dictionary.get(keys)
-        return None
+            three_part = platform in ('ncs4k', 'ncs6k')
+            families[platform] = _Family(version, subversion,
+                                         _three_part_re if three_part else re.compile('-\d\.\d\.\d.\d'),
+                                         three_part)
+    return families
+
+
+_family = _families()
+
+# the platforms, package types and versions repeat in every show install output
+_strings = {None: None}
+
+
+class _LRUCache(object):
+    """The least recently used cache of the parsed package names safe for the concurrent plugins.
+
+    :param size: the maximum number of the cached names
+    """
+    def __init__(self, size):
+        self.size = size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.pop(key, None)
+            if value is not None:
+                self._entries[key] = value
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            if len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+#: The parsed package names. The same packages are parsed by every install operation plugin.
+cache = _LRUCache(8192)
+
+
+def _platform(package_name):
+    found = _platform_re.findall(package_name)
+    if len(found) > 1:
+        # the platforms are tried in the list order
+        return min(found, key=platforms.index)
+    return found[0] if found else None
+
+
+def parse_package(package_name):
+    """Return the (platform, package_type, version, smu, subversion) tuple of the package name."""
+    fields = cache.get(package_name)
+    if fields is not None:
+        return fields
+
+    platform = _platform(package_name)
+    package_type = version = subversion = None
+    match = smu_re.search(package_name)
+    smu = match.group("SMU") if match else None
+
+    if platform:
+        family = _family[platform]
+        match = family.package_type.search(package_name)
+        if not match and _iso_re.search(package_name):
+            # Use the three part match for these ISO packages
+            match = _three_part_re.search(package_name)
+        if match:
+            # Extract the package type
+            package_type = package_name[0:match.start()].replace(platform + '-', '')
+        if package_type:
+            # Takes care the external to internal name matching
+            # Example, ncs6k-mgbl.pkg-5.2.5 -> mgbl, ncs5500-mini-x.iso-6.0.1 -> mini-x
+            package_type = package_type.replace('.pkg', '').replace('.iso', '')
+
+        to_match = package_name.replace(platform, '')
+        match = family.version.search(to_match)
+        version = match.group("VERSION") if match else None
+        if smu or not family.smu_subversion:
+            match = family.subversion.search(to_match)
+            subversion = match.group("SUBVERSION") if match else None
+
+    strings = _strings
+    fields = tuple(strings.setdefault(value, value)
+                   for value in (platform, package_type, version, smu, subversion))
+    cache.put(package_name, fields)
+    return fields
+
+
+def parse_packages(package_names):
+    """Return the set of the valid :class:`SoftwarePackage` of the package names.
+
+    The repeated names are parsed once. Of the equal packages the first one in the list is kept.
+    """
+    software_packages = set()
+    seen = set()
+    for package_name in package_names:
+        if package_name in seen:
+            continue
+        seen.add(package_name)
+        software_package = SoftwarePackage(package_name)
+        if software_package.is_valid():
+            software_packages.add(software_package)
+    return software_packages
+
+
+class SoftwarePackage(object):
+    __slots__ = ('package_name', 'platform', 'package_type', 'version', 'smu', 'subversion')
+
+    def __init__(self, package_name):
+        self.package_name = package_name
+        self.platform, self.package_type, self.version, self.smu, self.subversion = parse_package(package_name)
 
     def is_valid(self):
         return self.platform and self.version and (self.package_type or self.smu)
@@ -243,35 +301,19 @@ class SoftwarePackage(object):
 
         return result
 
+    def __ne__(self, other):
+        return not self == other
+
     def __hash__(self):
-        return hash("{}{}{}{}{}".format(
-            self.platform, self.package_type, self.version, self.smu, self.subversion))
+        return hash((self.platform, self.package_type, self.version, self.smu, self.subversion))
 
     @staticmethod
     def from_show_cmd(cmd):
-        software_packages = set()
-        data = cmd.split()
-
-        for line in data:
-            software_package = SoftwarePackage(line)
-            if software_package.is_valid():
-                software_packages.add(software_package)
-        return software_packages
+        return parse_packages(cmd.split())
 
     @staticmethod
     def from_package_list(pkg_list):
-        software_packages = set()
-        for pkg in pkg_list:
-            software_package = SoftwarePackage(pkg)
-            if software_package.is_valid():
-                """ for debugging
-                print('package_name', software_package.package_name,
-                      'platform', software_package.platform, 'package_type', software_package.package_type,
-                      'version', software_package.version, 'smu', software_package.smu,
-                      'subversion', software_package.subversion)
-                """
-                software_packages.add(software_package)
-        return software_packages
+        return parse_packages(pkg_list)
 
     def __repr__(self):
         return self.package_name
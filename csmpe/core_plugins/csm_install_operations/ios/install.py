@@ -24,12 +24,22 @@
 # THE POSSIBILITY OF SUCH DAMAGE.
 # =============================================================================
 import re
-import time
 
-plugin_ctx = None
+from csmpe.core_plugins.csm_install_operations.engine import InstallEngine, InstallProfile, send_newline
+
+
+def system_image_loaded(ctx, output):
+    return re.search(r'asr.*\.bin', output) is not None
 
 
-install_error_pattern = re.compile("Error:    (.*)$", re.MULTILINE)
+IOS_PROFILE = InstallProfile(
+    "IOS",
+    show_platform="show version | include ^System image",
+    ready_check=system_image_loaded,
+    ready_timeout=600,
+)
+
+plugin_ctx = None
 
 
 def log_install_errors(ctx, output):
@@ -40,9 +50,7 @@ def log_install_errors(ctx, output):
     :param output:
     :return: nothing
     """
-    errors = re.findall(install_error_pattern, output)
-    for line in errors:
-        ctx.warning(line)
+    InstallEngine(ctx, IOS_PROFILE).log_install_errors(output)
 
 
 def remove_exist_image(ctx, package):
@@ -72,13 +80,6 @@ def remove_exist_image(ctx, package):
         return False
 
 
-def send_newline(fsm_ctx):
-    fsm_ctx.ctrl.sendline('\r\n')
-    fsm_ctx.ctrl.sendline('\r\n')
-    fsm_ctx.ctrl.sendline('\r\n')
-    return True
-
-
 def issu_error_state(fsm_ctx):
     plugin_ctx.warning("Error in ISSU. Please see session.log for details")
     return False
@@ -89,47 +90,7 @@ def wait_for_reload(ctx):
      Wait for system to come up with max timeout as 25 Minutes
 
     """
-    ctx.disconnect()
-    time.sleep(180)
-
-    ctx.reconnect(max_timeout=1500, force_discovery=True)  # 25 * 60 = 1500
-    timeout = 3600
-    poll_time = 30
-    time_waited = 0
-
-    ctx.info("Waiting for the device to come up")
-    ctx.post_status("Waiting for the device to come up")
-    time.sleep(30)
-
-    output = None
-
-    ncnt = 0
-    while 1:
-
-        ncnt += 1
-        if ncnt > 20:
-            break
-
-        # Wait till all nodes are in XR run state
-        time_waited += poll_time
-        if time_waited >= timeout:
-            break
-
-        time.sleep(poll_time)
-
-        output = ctx.send('show version | include ^System image')
-
-        ctx.info("output = {}".format(output))
-
-        m = re.search('(asr.*\.bin)', output)
-        if m:
-            ctx.info("The device is in the desired state")
-            return True
-
-    # Some nodes did not come to run state
-    ctx.error("Not all nodes have came up: {}".format(output))
-    # this will never be executed
-    return False
+    return InstallEngine(ctx, IOS_PROFILE).wait_for_reload()
 
 
 def install_activate_write_memory(ctx, cmd, hostname):
@@ -24,19 +24,29 @@
 # THE POSSIBILITY OF SUCH DAMAGE.
 # =============================================================================
 import re
-import time
 
 from csmpe.core_plugins.csm_node_status_check.ios_xe.plugin_lib import parse_show_platform
+from csmpe.core_plugins.csm_install_operations.engine import InstallEngine, InstallProfile, send_newline
 from utils import install_add_remove
 
-plugin_ctx = None
-
+XE_PROFILE = InstallProfile(
+    "XE",
+    show_platform="show platform",
+    parse_platform=parse_show_platform,
+    valid_states=[
+        'ok',
+        'ok, active',
+        'ok, standby',
+        'ps, fail',
+        'out of service',
+        'N/A'
+    ],
+    required_node=r"^R\d",
+    reload_timeout=3600,
+    ready_timeout=600,
+)
 
-def send_newline(fsm_ctx):
-    fsm_ctx.ctrl.sendline('\r\n')
-    fsm_ctx.ctrl.sendline('\r\n')
-    fsm_ctx.ctrl.sendline('\r\n')
-    return True
+plugin_ctx = None
 
 
 def issu_error_state(fsm_ctx):
@@ -45,20 +55,7 @@ def issu_error_state(fsm_ctx):
 
 
 def validate_node_state(inventory):
-    valid_state = [
-        'ok',
-        'ok, active',
-        'ok, standby',
-        'ps, fail',
-        'out of service',
-        'N/A'
-    ]
-    for key, value in inventory.items():
-        if value['state'] not in valid_state:
-            break
-    else:
-        return True
-    return False
+    return XE_PROFILE.validate_node_state(inventory)
 
 
 def wait_for_reload(ctx):
@@ -66,48 +63,7 @@ def wait_for_reload(ctx):
      Wait for system to come up with max timeout as 25 Minutes
 
     """
-    ctx.disconnect()
-    time.sleep(180)
-
-    ctx.reconnect(max_timeout=3600, force_discovery=True)  # 60 * 60 = 3600
-    timeout = 3600
-    poll_time = 30
-    time_waited = 0
-
-    ctx.info("Waiting for all nodes to come up")
-    ctx.post_status("Waiting for all nodes to come up")
-    time.sleep(30)
-
-    output = None
-
-    ncnt = 0
-    while 1:
-
-        ncnt += 1
-        if ncnt > 20:
-            break
-
-        # Wait till all nodes are in XR run state
-        time_waited += poll_time
-        if time_waited >= timeout:
-            break
-
-        time.sleep(poll_time)
-
-        # show platform can take more than 1 minute after router reload. Issue No. 47
-        output = ctx.send('show platform', timeout=600)
-
-        ctx.info("show platform = {}".format(output))
-
-        inventory = parse_show_platform(ctx, output)
-        if validate_node_state(inventory):
-            ctx.info("All nodes in desired state")
-            return True
-
-    # Some nodes did not come to run state
-    ctx.error("Not all nodes have came up: {}".format(output))
-    # this will never be executed
-    return False
+    return InstallEngine(ctx, XE_PROFILE).wait_for_reload()
 
 
 def install_activate_write_memory(ctx, cmd, hostname):
@@ -267,8 +223,7 @@ def install_activate_issu(ctx, cmd):
     if not ctx.run_fsm("ISSU", cmd, events, transitions, timeout=3600):
         ctx.error("Failed: {}".format(cmd))
 
-    time.sleep(300)
-
+    # wait_for_reload waits for the device to go down
     success = wait_for_reload(ctx)
 
     if not success:
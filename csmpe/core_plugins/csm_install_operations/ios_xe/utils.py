@@ -27,8 +27,13 @@
 import re
 import string
 
+from csmpe.parsers import XE_PLATFORM, parse_show_platform
+
 install_error_pattern = re.compile("Error:    (.*)$", re.MULTILINE)
 
+#: The route processor and SPA interface processor slots reported by xe_show_platform.
+RP_OR_SIP = re.compile(r"^(0/\d+|R\d+)")
+
 
 def log_install_errors(ctx, output):
     """
@@ -584,33 +589,8 @@ def xe_show_platform(ctx):
      0/0      12xGE-2x10GE-FIXED  ok                    15:09:04
     R1        A900-RSP2A-128      ok, active            14:09:30
     """
-    platform_info = {}
     cmd = 'show platform'
     # show platform can take more than 1 minute after router reload. Issue No. 47
     output = ctx.send(cmd, timeout=600)
-    if output:
-        lines = string.split(output, '\n')
-        lines = [x for x in lines if x]
-        sip0 = False
-        for line in lines:
-            if not sip0:
-                m = re.search('--------- ------------------- '
-                              '--------------------- -----------------', line)
-                if m:
-                    sip0 = True
-                continue
-
-            m = re.search('Slot      CPLD Version        Firmware Version', line)
-            if m:
-                break
-
-            Slot = line[:8].strip()
-            Type = line[10:28].strip()
-            State = line[30:50].strip()
-
-            m1 = re.search('^0\/\d+', Slot)
-            m2 = re.search('^R\d+', Slot)
-            if m1 or m2:
-                platform_info[Slot] = [Type, State]
-
-    return platform_info
+    inventory = parse_show_platform(output, XE_PLATFORM, node=RP_OR_SIP) or {}
+    return dict((slot, [node.type, node.state]) for slot, node in inventory.items())
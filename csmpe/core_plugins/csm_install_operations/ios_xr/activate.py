@@ -29,6 +29,7 @@
 
 from package_lib import SoftwarePackage
 from csmpe.plugins import CSMPlugin
+from csmpe.core_plugins.csm_install_operations.package_index import PackageIndex
 from install import install_activate_deactivate
 from csmpe.core_plugins.csm_get_inventory.ios_xr.plugin import get_package, get_inventory
 from csmpe.core_plugins.csm_install_operations.utils import update_device_info_udi
@@ -52,18 +53,14 @@ class Plugin(CSMPlugin):
         installed_act = SoftwarePackage.from_show_cmd(self.ctx.send("admin show install active summary"))
 
         # Packages to activate but not already active
-        pkgs = pkgs - installed_act
+        pkgs = PackageIndex(installed_act).difference(pkgs)
         if pkgs:
-            packages_to_activate = set()
             # After the packages are considered equal according to SoftwarePackage.__eq__(),
             # Use the package name in the inactive area.  It is possible that the package
             # name given for Activation may be an external filename like below.
             # asr9k-px-5.3.3.CSCuy81837.pie to disk0:asr9k-px-5.3.3.CSCuy81837-1.0.0
             # asr9k-mcast-px.pie-5.3.3 to disk0:asr9k-mcast-px-5.3.3
-            for inactive_pkg in installed_inact:
-                for pkg in pkgs:
-                    if pkg == inactive_pkg:
-                        packages_to_activate.add(inactive_pkg)
+            packages_to_activate, not_inactive = PackageIndex(installed_inact).match(pkgs)
 
             if not packages_to_activate:
                 to_deactivate = " ".join(map(str, pkgs))
@@ -75,6 +72,9 @@ class Plugin(CSMPlugin):
                 self.ctx.error('To be activated packages not in inactive packages list.')
                 return None
             else:
+                if not_inactive:
+                    self.ctx.warning("Packages not in inactive packages list: {}".format(
+                        " ".join(map(str, not_inactive))))
                 if len(packages_to_activate) != len(packages):
                     self.ctx.info('Packages selected for activation: {}\n'.format(" ".join(map(str, packages))) +
                                   'Packages that are to be activated: {}'.format(" ".join(map(str,
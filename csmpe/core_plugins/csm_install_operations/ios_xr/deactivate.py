@@ -28,6 +28,7 @@
 
 from package_lib import SoftwarePackage
 from csmpe.plugins import CSMPlugin
+from csmpe.core_plugins.csm_install_operations.package_index import PackageIndex
 from install import install_activate_deactivate
 from csmpe.core_plugins.csm_get_inventory.ios_xr.plugin import get_package, get_inventory
 
@@ -50,7 +51,7 @@ class Plugin(CSMPlugin):
 
         if pkgs:
             # packages to be deactivated must be active packages
-            packages_to_deactivate = pkgs & installed_act
+            packages_to_deactivate, not_active = PackageIndex(installed_act).match(pkgs)
             if not packages_to_deactivate:
                 to_deactivate = " ".join(map(str, pkgs))
 
@@ -62,6 +63,8 @@ class Plugin(CSMPlugin):
                 self.ctx.error('To be deactivated packages not in inactive packages list.')
                 return None
             else:
+                if not_active:
+                    self.ctx.warning("Packages not in active packages list: {}".format(" ".join(map(str, not_active))))
                 if len(packages_to_deactivate) != len(packages):
                     self.ctx.info('Packages selected for deactivation: {}\n'.format(" ".join(map(str, packages))) +
                                   'Packages that are to be deactivated: {}'.format(" ".join(map(str,
@@ -26,12 +26,34 @@
 # THE POSSIBILITY OF SUCH DAMAGE.
 # =============================================================================
 import re
-import time
-import itertools
-from condoor import ConnectionError, CommandError
+from condoor import CommandError
 from csmpe.core_plugins.csm_node_status_check.ios_xr.plugin_lib import parse_show_platform
+from csmpe.core_plugins.csm_install_operations.engine import InstallEngine, InstallProfile
 
-install_error_pattern = re.compile("Error:    (.*)$", re.MULTILINE)
+XR_PROFILE = InstallProfile(
+    "XR",
+    show_platform="admin show platform",
+    parse_platform=parse_show_platform,
+    valid_states=[
+        'IOS XR RUN',
+        'PRESENT',
+        'UNPOWERED',
+        'READY',
+        'FAILED',
+        'OK',
+        'ADMIN DOWN',
+        'DISABLED'
+    ],
+    node_filter='CPU',
+    required_node=r"RS?P\d",
+    required_state="IOS XR RUN",
+    show_request="admin show install request",
+    no_install=r"There are no install requests in operation",
+    op_progress=r"The operation is (\d+)% complete",
+    op_download=r"(.*)KB downloaded: Download in progress",
+    success="Install operation {} completed successfully",
+    console_boot=True,
+)
 
 plugin_ctx = None
 
@@ -42,9 +64,7 @@ def send_yes(fsm_ctx):
 
 
 def log_install_errors(ctx, output):
-    errors = re.findall(install_error_pattern, output)
-    for line in errors:
-        ctx.warning(line)
+    InstallEngine(ctx, XR_PROFILE).log_install_errors(output)
 
 
 def watch_operation(ctx, op_id=0):
@@ -53,82 +73,11 @@ def watch_operation(ctx, op_id=0):
     and report KB downloaded.
 
     """
-    no_install = r"There are no install requests in operation"
-    op_progress = r"The operation is (\d+)% complete"
-    op_download = r"(.*)KB downloaded: Download in progress"
-    success = "Install operation {} completed successfully".format(op_id)
-
-    cmd_show_install_request = "admin show install request"
-
-    ctx.info("Watching the operation {} to complete".format(op_id))
-
-    propeller = itertools.cycle(["|", "/", "-", "\\", "|", "/", "-", "\\"])
-
-    output = None
-    last_status = None
-    finish = False
-    time_tried = 0
-    while not finish:
-        try:
-            try:
-                # this is to catch the successful operation as soon as possible
-                ctx.send("", wait_for_string=success, timeout=20)
-                finish = True
-            except ctx.CommandTimeoutError:
-                pass
-
-            message = ""
-            # on CRS, it is observed that during Add, any command typed hangs for a while
-            output = ctx.send(cmd_show_install_request, timeout=300)
-            if op_id in output:
-                # FIXME reconsider the logic here
-                result = re.search(op_progress, output)
-                if result:
-                    status = result.group(0)
-                    message = "{} {}".format(propeller.next(), status)
-
-                result = re.search(op_download, output)
-                if result:
-                    status = result.group(0)
-                    message += "\r\n<br>{}".format(status)
-
-                if message != last_status:
-                    ctx.post_status(message)
-                    last_status = message
-        except (ConnectionError, ctx.CommandTimeoutError) as e:
-            if time_tried > 2:
-                raise e
-
-            time_tried += 1
-            ctx.disconnect()
-            time.sleep(60)
-            ctx.reconnect()
-
-        if no_install in output:
-            break
-
-    return output
+    return InstallEngine(ctx, XR_PROFILE).watch_operation(op_id)
 
 
 def validate_node_state(inventory):
-    valid_state = [
-        'IOS XR RUN',
-        'PRESENT',
-        'UNPOWERED',
-        'READY',
-        'UNPOWERED',
-        'FAILED',
-        'OK',
-        'ADMIN DOWN',
-        'DISABLED'
-    ]
-    for key, value in inventory.items():
-        if 'CPU' in key:
-            if value['state'] not in valid_state:
-                break
-    else:
-        return True
-    return False
+    return XR_PROFILE.validate_node_state(inventory)
 
 
 def wait_for_reload(ctx):
@@ -136,57 +85,7 @@ def wait_for_reload(ctx):
      Wait for system to come up with max timeout as 25 Minutes
 
     """
-    begin = time.time()
-    if not ctx.is_console:
-        ctx.disconnect()
-        ctx.post_status("Waiting for device boot to reconnect")
-        ctx.info("Waiting for device boot to reconnect")
-        time.sleep(60)
-        ctx.reconnect(max_timeout=1500, force_discovery=True)  # 25 * 60 = 1500
-
-    else:
-        ctx.info("Keeping console connected")
-        ctx.post_status("Boot process started")
-        ctx.info("Boot process started")
-        ctx.reload(reload_timeout=1500, no_reload_cmd=True)
-        ctx.info("Boot process finished")
-
-    ctx.info("Device connected successfully")
-
-    timeout = 3600
-    poll_time = 30
-    time_waited = 0
-    xr_run = "IOS XR RUN"
-
-    cmd = "admin show platform"
-    ctx.info("Waiting for all nodes to come up")
-    ctx.post_status("Waiting for all nodes to come up")
-    time.sleep(100)
-
-    output = None
-
-    while 1:
-        # Wait till all nodes are in XR run state
-        time_waited += poll_time
-        if time_waited >= timeout:
-            break
-
-        time.sleep(poll_time)
-
-        # show platform can take more than 1 minute after router reload. Issue No. 47
-        output = ctx.send(cmd, timeout=600)
-        if xr_run in output:
-            inventory = parse_show_platform(ctx, output)
-            if validate_node_state(inventory):
-                ctx.info("All nodes in operational state")
-                elapsed = time.time() - begin
-                ctx.info("Overall outage time: {} minute(s) {:.0f} second(s)".format(elapsed // 60, elapsed % 60))
-                return True
-
-    # Some nodes did not come to run state
-    ctx.error("Not all nodes have came up: {}".format(output))
-    # this will never be executed
-    return False
+    return InstallEngine(ctx, XR_PROFILE).wait_for_reload()
 
 
 def watch_install(ctx, cmd, op_id=0):
@@ -273,6 +172,8 @@ def install_add_remove(ctx, cmd, has_tar=False):
 
 
 def install_activate_deactivate(ctx, cmd):
+    # the software changes, the device must be discovered on next connection
+    ctx.invalidate_discovery()
     message = "Waiting the operation to continue asynchronously"
     ctx.info(message)
     ctx.post_status(message)
@@ -391,46 +292,8 @@ def install_remove_all(ctx, cmd, hostname):
     ctx.info(message)
     ctx.post_status(message)
 
-    last_status = None
-    no_install = r"There are no install requests in operation"
-    op_progress = r"The operation is (\d+)% complete"
-    cmd_show_install_request = "admin show install request"
     op_success = "Install operation {} completed successfully".format(op_id)
-    propeller = itertools.cycle(["|", "/", "-", "\\", "|", "/", "-", "\\"])
-
-    finish = False
-    time_tried = 0
-    op_id = str(op_id)
-    while not finish:
-        try:
-            try:
-                # this is to catch the successful operation as soon as possible
-                ctx.send("", wait_for_string=op_success, timeout=20)
-                finish = True
-            except ctx.CommandTimeoutError:
-                pass
-
-            message = ""
-            # on CRS, it is observed that during Add, any command typed hangs for a while
-            output = ctx.send(cmd_show_install_request, timeout=300)
-            if op_id in output:
-                result = re.search(op_progress, output)
-                if result:
-                    status = result.group(0)
-                    message = "{} {}".format(propeller.next(), status)
-
-                if message != last_status:
-                    ctx.post_status(message)
-                    last_status = message
-        except (ConnectionError, ctx.CommandTimeoutError) as e:
-            if time_tried > 120:
-                raise e
-
-            time_tried += 1
-            time.sleep(30)
-
-        if no_install in output:
-            break
+    watch_operation(ctx, op_id)
 
     cmd_show_install_log = "admin show install log {} detail".format(op_id)
     output = ctx.send(cmd_show_install_log, timeout=300)
@@ -1,8 +1,8 @@
-import time
 import re
 import json
 
 from csmpe.context import PluginError
+from csmpe.parsers import EXR_ADMIN_PLATFORM, XR_PLATFORM, parse_show_platform
 from csmpe.core_plugins.csm_custom_commands_capture.plugin import Plugin as CmdCapturePlugin
 
 SUPPORTED_HW_JSON = "./asr9k_64bit/migration_supported_hw.json"
@@ -18,18 +18,8 @@ def log_and_post_status(ctx, msg):
 
 def parse_exr_admin_show_platform(output):
     """Get all RSP/RP/LC string node names matched with the card type."""
-    inventory = {}
-    lines = output.split('\n')
-
-    for line in lines:
-        line = line.strip()
-        if len(line) > 0 and line[0].isdigit():
-            node = line[:10].strip()
-            # print "node = *{}*".format(node)
-            node_type = line[10:34].strip(),
-            # print "node_type = *{}*".format(node_type)
-            inventory[node] = node_type
-    return inventory
+    inventory = parse_show_platform(output, EXR_ADMIN_PLATFORM) or {}
+    return dict((name, node.type) for name, node in inventory.items())
 
 
 def parse_admin_show_platform(output):
@@ -48,21 +38,7 @@ def parse_admin_show_platform(output):
     0/PS0/M0/SP     A9K-3KW-AC                READY            PWR,NSHUT,MON
     0/PS0/M1/SP     A9K-3KW-AC                READY            PWR,NSHUT,MON
     """
-    inventory = []
-    lines = output.split('\n')
-    for line in lines:
-        line = line.strip()
-        if len(line) > 0 and line[0].isdigit():
-            node = line[:16].strip()
-            entry = {
-                'type': line[16:42].strip(),
-                'state': line[42:59].strip(),
-                'config_state': line[59:].strip()
-            }
-            inventory.append((node, entry))
-            # print node
-
-    return inventory
+    return list((parse_show_platform(output, XR_PLATFORM) or {}).items())
 
 
 def get_all_supported_nodes(ctx, supported_cards):
@@ -128,7 +104,7 @@ def wait_for_final_band(ctx):
         time_waited += poll_time
         if time_waited >= timeout:
             break
-        time.sleep(poll_time)
+        ctx.sleep(poll_time)
         output = ctx.send(cmd)
         if check_show_plat_vm(output, supported_nodes):
             return True
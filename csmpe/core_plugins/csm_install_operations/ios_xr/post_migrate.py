@@ -26,7 +26,6 @@
 # =============================================================================
 
 import re
-import time
 
 from csmpe.plugins import CSMPlugin
 from migration_lib import wait_for_final_band, log_and_post_status, run_additional_custom_commands
@@ -85,13 +84,13 @@ class Plugin(CSMPlugin):
         poll_time = 30
         time_waited = 0
 
-        time.sleep(60)
+        self.ctx.sleep(60)
         while 1:
             # Wait till all FPDs finish upgrade
             time_waited += poll_time
             if time_waited >= timeout:
                 break
-            time.sleep(poll_time)
+            self.ctx.sleep(poll_time)
             output = self.ctx.send("show hw-module fpd")
             num_need_reload = len(re.findall("RLOAD REQ", output))
             if len(re.findall("CURRENT", output)) + num_need_reload >= num_fpds:
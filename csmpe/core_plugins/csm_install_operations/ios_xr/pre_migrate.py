@@ -28,11 +28,14 @@
 import csv
 import os
 import re
+import shutil
 import subprocess
 
 import pexpect
+from condoor.exceptions import CommandTimeoutError
 
 from csmpe.plugins import CSMPlugin
+from csmpe.parsers import Template
 from csmpe.core_plugins.csm_install_operations.utils import ServerType, is_empty, concatenate_dirs
 from simple_server_helper import TFTPServer, FTPServer, SFTPServer
 from hardware_audit import Plugin as HardwareAuditPlugin
@@ -53,6 +56,7 @@ CONFIG_LOCATION = "harddiskb:/"
 
 XR_CONFIG_IN_CSM = "xr.cfg"
 ADMIN_CONFIG_IN_CSM = "admin.cfg"
+BUILDING_CONFIGURATION = 'Building configuration...\n'
 
 CONVERTED_XR_CONFIG_IN_CSM = "xr.iox"
 CONVERTED_ADMIN_CAL_CONFIG_IN_CSM = "admin.cal"
@@ -61,6 +65,17 @@ CONVERTED_ADMIN_XR_CONFIG_IN_CSM = "admin.iox"
 FINAL_CAL_CONFIG = "cXR_admin_plane_converted_eXR.cfg"
 FINAL_XR_CONFIG = "cXR_xr_plane_converted_eXR.cfg"
 
+# the FPD's with the Upg/Dng? column Yes in the Subtype column under the node location
+FPD_NEED_UPGRADE = Template(r"""
+Value Filldown,Required location (\d+(?:/\w+)+)
+Value Required subtype ([^ ]*)
+
+Start
+  ^(?=.{76}Yes)(?=.{51}${subtype})${location}(?: |$$) -> Record
+  ^${location}(?: |$$)
+  ^(?=.{76}Yes).{51}${subtype} -> Record
+""")
+
 # XR_CONFIG_ON_DEVICE = "iosxr.cfg"
 # ADMIN_CAL_CONFIG_ON_DEVICE = "admin_calvados.cfg"
 # ADMIN_XR_CONFIG_ON_DEVICE = "admin_iosxr.cfg"
@@ -85,8 +100,6 @@ class Plugin(CSMPlugin):
     phases = {'Pre-Migrate'}
     os = {'XR'}
 
-    node_pattern = re.compile("^\d+(/\w+)+$")
-
     def _save_show_platform(self):
         """Save the output of 'show platform' to session log"""
 
@@ -510,42 +523,22 @@ class Plugin(CSMPlugin):
 
         subtype_to_locations_need_upgrade = {}
 
-        last_location = None
-        for line in fpdtable.split('\n'):
-
-            first_word = line.split(' ', 1)[0]
-
-            if self.node_pattern.match(first_word):
-                # since fpd_relevant_nodes is loaded from db, the keys are
-                # unicode instead of byte strings
-                indicator = fpd_relevant_nodes.get(unicode(first_word, encoding="latin1"))
-                # indicator is 1:
-                #       Detect a new node(RSP/RP/LC/FC) of which fpds we'll need to check
-                #       if upgrade goes successful
-                # indicator is None:
-                #       Detect node that is not found in output of "admin show platform"
-                #       we need to check if FPD upgrade goes successful in this case
-                if indicator == 1 or indicator is None:
-                    last_location = first_word
-                # indicator is 0:
-                #       Detect node to be PEM/FAN or some other unsupported hardware in eXR.
-                #       we don't care if the FPD upgrade for these is successful or not
-                #       so we update last_location to None
-                else:
-                    last_location = None
-
-            # Found some fpd that needs upgrade
-            if last_location and len(line) >= 79 and line[76:79] == "Yes":
-                fpdtype_end_idx = 51
-                while line[fpdtype_end_idx] != ' ':
-                    fpdtype_end_idx += 1
-
-                fpdtype = line[51:fpdtype_end_idx]
-
-                if fpdtype not in subtype_to_locations_need_upgrade:
-                    # it is possible to have duplicates, so using set here
-                    subtype_to_locations_need_upgrade[fpdtype] = set()
-                subtype_to_locations_need_upgrade[fpdtype].add(last_location)
+        for record in FPD_NEED_UPGRADE.parse(fpdtable):
+            # since fpd_relevant_nodes is loaded from db, the keys are
+            # unicode instead of byte strings
+            indicator = fpd_relevant_nodes.get(unicode(record.location, encoding="latin1"))
+            # indicator is 1:
+            #       Detect a node(RSP/RP/LC/FC) of which fpds we'll need to check
+            #       if upgrade goes successful
+            # indicator is None:
+            #       Detect node that is not found in output of "admin show platform"
+            #       we need to check if FPD upgrade goes successful in this case
+            # indicator is 0:
+            #       Detect node to be PEM/FAN or some other unsupported hardware in eXR.
+            #       we don't care if the FPD upgrade for these is successful or not
+            if indicator == 1 or indicator is None:
+                # it is possible to have duplicates, so using set here
+                subtype_to_locations_need_upgrade.setdefault(record.subtype, set()).add(record.location)
 
         return subtype_to_locations_need_upgrade
 
@@ -556,7 +549,7 @@ class Plugin(CSMPlugin):
 
         :return: None if FPD package is active, error out if not.
         """
-        active_packages = self.ctx.send("show install active summary")
+        active_packages = self.ctx.send("show install active summary", include="fpd")
 
         match = re.search("fpd", active_packages)
 
@@ -729,19 +722,32 @@ class Plugin(CSMPlugin):
         :return: None
         """
 
-        try:
-            cmd = "admin show run" if admin else "show run"
-            output = self.ctx.send(cmd, timeout=TIMEOUT_FOR_COPY_CONFIG)
-            ind = output.rfind('Building configuration...\n')
+        cmd = "admin show run" if admin else "show run"
+        # the configuration is written to the first file as it arrives and then copied to the others
+        header = ['']
+        with open(files[0], 'w+') as file_to_write:
+            def write(chunk):
+                # skip the output up to the 'Building configuration...' line at the beginning
+                if header:
+                    text = header[0] + chunk
+                    ind = text.find(BUILDING_CONFIGURATION)
+                    if ind < 0 and len(text) < 4096:
+                        header[0] = text
+                        return
+                    del header[:]
+                    chunk = text[ind + len(BUILDING_CONFIGURATION):] if ind >= 0 else text
+                file_to_write.write(chunk)
 
-        except pexpect.TIMEOUT:
-            self.ctx.error("CLI '{}' timed out after 1 hour.".format(cmd))
+            try:
+                self.ctx.capture(cmd, write, timeout=TIMEOUT_FOR_COPY_CONFIG)
+            except (pexpect.TIMEOUT, CommandTimeoutError):
+                self.ctx.error("CLI '{}' timed out after 1 hour.".format(cmd))
+            if header:
+                file_to_write.write(header[0])
 
-        for file_path in files:
+        for file_path in files[1:]:
             # file = '../../csm_data/migration/<hostname>' + filename
-            file_to_write = open(file_path, 'w+')
-            file_to_write.write(output[(ind + 1):])
-            file_to_write.close()
+            shutil.copyfile(files[0], file_path)
 
     def _handle_configs(self, hostname, server, repo_url, fileloc, nox_to_use, config_filename):
         """
@@ -28,6 +28,7 @@
 
 from package_lib import SoftwarePackage
 from csmpe.plugins import CSMPlugin
+from csmpe.core_plugins.csm_install_operations.package_index import PackageIndex
 from install import install_add_remove
 from csmpe.core_plugins.csm_get_inventory.ios_xr.plugin import get_package, get_inventory
 
@@ -48,7 +49,9 @@ class Plugin(CSMPlugin):
         pkgs = SoftwarePackage.from_package_list(packages)
 
         installed_inact = SoftwarePackage.from_show_cmd(self.ctx.send("admin show install inactive summary"))
-        packages_to_remove = pkgs & installed_inact
+        packages_to_remove, not_inactive = PackageIndex(installed_inact).match(pkgs)
+        if not_inactive:
+            self.ctx.info("Packages not in inactive packages list: {}".format(" ".join(map(str, not_inactive))))
 
         if not packages_to_remove:
             self.ctx.warning("Packages already removed. Nothing to be removed")
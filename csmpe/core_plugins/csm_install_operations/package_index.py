@@ -0,0 +1,95 @@
+# =============================================================================
+#
+# Copyright (c) 2016, Cisco Systems
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+# =============================================================================
+
+"""The index of the installed packages used to plan the activate, deactivate and remove operations.
+
+The packages are bucketed by the fields compared exactly by ``SoftwarePackage.__eq__`` (the platform,
+package type, version and SMU plus the architecture and service pack on XR). The requested package
+is compared with the packages of its bucket only, so the subversion is matched as before: the packages
+without the subversion (i.e. the external SMU names) match any subversion.
+"""
+
+_KEY_FIELDS = ('platform', 'package_type', 'architecture', 'version', 'smu', 'sp')
+
+
+def package_key(package):
+    """Return the tuple of the fields every package equal to the package has the same."""
+    return tuple(getattr(package, field, None) for field in _KEY_FIELDS)
+
+
+class PackageIndex(object):
+    """The packages indexed by :func:`package_key` in the order added.
+
+    :param packages: the iterable of the SoftwarePackage objects
+    """
+    def __init__(self, packages=()):
+        self._buckets = {}
+        self._packages = []
+        self.update(packages)
+
+    def add(self, package):
+        self._buckets.setdefault(package_key(package), []).append(package)
+        self._packages.append(package)
+
+    def update(self, packages):
+        for package in packages:
+            self.add(package)
+
+    def find_all(self, package):
+        """Return the list of the indexed packages equal to the package."""
+        return [indexed for indexed in self._buckets.get(package_key(package), ()) if package == indexed]
+
+    def __contains__(self, package):
+        return any(package == indexed for indexed in self._buckets.get(package_key(package), ()))
+
+    def __iter__(self):
+        return iter(self._packages)
+
+    def __len__(self):
+        return len(self._packages)
+
+    def match(self, packages):
+        """Return the indexed packages equal to the packages and the list of the packages not indexed.
+
+        The names of the indexed packages are used for the install command, as the requested names
+        may be the external file names, i.e. ncs6k-5.2.5.CSCuz65240.smu for ncs6k-5.2.5.CSCuz65240-1.0.0.
+        """
+        matched = []
+        seen = set()
+        unmatched = []
+        for package in packages:
+            found = self.find_all(package)
+            if not found:
+                unmatched.append(package)
+            for indexed in found:
+                if id(indexed) not in seen:
+                    seen.add(id(indexed))
+                    matched.append(indexed)
+        return matched, unmatched
+
+    def difference(self, packages):
+        """Return the list of the packages not indexed."""
+        return [package for package in packages if package not in self]
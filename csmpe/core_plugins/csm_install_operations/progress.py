@@ -0,0 +1,108 @@
+# coding=utf-8
+# =============================================================================
+#
+# Copyright (c) 2016, Cisco Systems
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+# =============================================================================
+
+"""The polling helpers for the long running install operations."""
+
+import random
+
+
+class Backoff(object):
+    """The growing poll intervals.
+
+    :param initial: the first interval in seconds
+    :param maximum: the maximum interval in seconds
+    :param factor: the interval multiplier
+    :param jitter: the fraction of the interval randomly added or subtracted to avoid
+                   the synchronized polls of many devices
+    """
+    def __init__(self, initial, maximum, factor=1.5, jitter=0.0):
+        self.initial = initial
+        self.maximum = maximum
+        self.factor = factor
+        self.jitter = jitter
+        self._interval = initial
+
+    def __iter__(self):
+        return self
+
+    def next(self):
+        interval = self._interval
+        self._interval = min(self.maximum, self._interval * self.factor)
+        if self.jitter:
+            interval *= 1 + random.uniform(-self.jitter, self.jitter)
+        return interval
+
+    __next__ = next
+
+    def reset(self):
+        self._interval = self.initial
+
+
+class ProgressEstimator(object):
+    """Estimate the remaining time from the percent complete samples.
+
+    The completion rate is the least squares slope of the recent samples, so the single late
+    or early progress update does not change the estimate much.
+
+    :param window: the number of the most recent samples used
+    """
+    def __init__(self, window=10):
+        self.window = window
+        self.samples = []
+
+    def add(self, percent, timestamp):
+        if self.samples and self.samples[-1][1] == percent:
+            return
+        self.samples.append((timestamp, percent))
+        del self.samples[:-self.window]
+
+    def rate(self):
+        """Return the percent per second or None if not known."""
+        if len(self.samples) < 2:
+            return None
+        count = float(len(self.samples))
+        mean_t = sum(t for t, _ in self.samples) / count
+        mean_p = sum(p for _, p in self.samples) / count
+        variance = sum((t - mean_t) ** 2 for t, _ in self.samples)
+        if not variance:
+            return None
+        slope = sum((t - mean_t) * (p - mean_p) for t, p in self.samples) / variance
+        return slope if slope > 0 else None
+
+    def eta(self, now):
+        """Return the estimated number of seconds to complete or None if not known."""
+        rate = self.rate()
+        if rate is None:
+            return None
+        timestamp, percent = self.samples[-1]
+        return max(0.0, (100 - percent) / rate - (now - timestamp))
+
+
+def format_eta(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return "{}:{:02d}:{:02d}".format(hours, minutes, seconds)
@@ -0,0 +1,150 @@
+# coding=utf-8
+# =============================================================================
+#
+# Copyright (c) 2016, Cisco Systems
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+# =============================================================================
+
+"""Wait for the reloading device.
+
+The device reachability is probed with the cheap TCP connect to the telnet or ssh port instead
+of sleeping for the fixed time. The probe is possible if the device is the first hop of the connection
+chain. The connection with the prompt detection is made only once the port is open. For the devices
+behind the jumphost the device can not be probed, so the connection is retried by condoor.
+
+The port of the console connection belongs to the terminal server and stays open while the device
+reloads, so the console connections are retried by condoor as well. The console is detected by condoor
+or from the telnet url with the port other than the telnet port, i.e. telnet://ts:2005.
+"""
+
+import socket
+import time
+
+from six.moves.urllib.parse import urlparse
+
+from csmpe.core_plugins.csm_install_operations.progress import Backoff
+
+DEFAULT_PORTS = {'telnet': 23, 'ssh': 22}
+
+#: The TCP connect timeout in seconds.
+PROBE_TIMEOUT = 3
+
+#: The probe interval bounds in seconds while the device is booting.
+PROBE_MIN_INTERVAL = 5
+PROBE_MAX_INTERVAL = 30
+
+#: The maximum number of seconds the device is expected to go down after the reload.
+DOWN_TIMEOUT = 300
+DOWN_INTERVAL = 2
+
+#: The number of seconds waited for the device behind the jumphost to go down.
+RELOAD_GRACE = 60
+
+#: The node state poll interval bounds in seconds.
+POLL_MIN_INTERVAL = 10
+POLL_MAX_INTERVAL = 60
+
+JITTER = 0.2
+
+
+def probe_targets(urls):
+    """Return the list of (host, port) tuples of the devices connected directly.
+
+    :param urls: the list of urls or list of url lists as passed to :class:`condoor.Connection`
+    """
+    chains = urls if urls and isinstance(urls[0], (list, tuple)) else [urls]
+    targets = []
+    for chain in chains:
+        if len(chain) != 1:
+            continue  # the first hop is the jumphost
+        url = urlparse(chain[0])
+        if url.scheme == 'telnet' and url.port not in (None, DEFAULT_PORTS['telnet']):
+            continue  # the terminal server line
+        port = url.port or DEFAULT_PORTS.get(url.scheme)
+        if url.hostname and port:
+            targets.append((url.hostname, port))
+    return targets
+
+
+def tcp_probe(address, timeout=PROBE_TIMEOUT):
+    """Return True if the TCP connection to the (host, port) address is accepted."""
+    try:
+        sock = socket.create_connection(address, timeout)
+    except (socket.error, socket.timeout):
+        return False
+    sock.close()
+    return True
+
+
+def _is_console(ctx):
+    try:
+        return bool(ctx.is_console)
+    except AttributeError:
+        return False
+
+
+def wait_for_reachable(ctx, timeout=1500, probe=tcp_probe):
+    """Wait until the reloading device is reachable and reconnect.
+
+    :param ctx: the plugin context
+    :param timeout: the maximum number of seconds to wait
+    :param probe: the callable probing the (host, port) address
+    """
+    begin = time.time()
+    targets = [] if _is_console(ctx) else probe_targets(ctx.host_urls)
+    if not targets:
+        ctx.sleep(RELOAD_GRACE)
+        ctx.reconnect(max_timeout=timeout, force_discovery=True)
+        return
+
+    # the device may accept the connections for a while after the reload command
+    while time.time() - begin < DOWN_TIMEOUT and any(probe(target) for target in targets):
+        ctx.sleep(DOWN_INTERVAL)
+    ctx.info("Device went down after {:.0f} second(s)".format(time.time() - begin))
+
+    backoff = Backoff(PROBE_MIN_INTERVAL, PROBE_MAX_INTERVAL, jitter=JITTER)
+    while not any(probe(target) for target in targets):
+        remaining = timeout - (time.time() - begin)
+        if remaining <= 0:
+            ctx.error("Device not reachable after {} second(s)".format(timeout))
+        ctx.sleep(min(next(backoff), remaining))
+
+    ctx.info("Device reachable after {:.0f} second(s)".format(time.time() - begin))
+    ctx.reconnect(max_timeout=max(timeout - (time.time() - begin), PROBE_MAX_INTERVAL), force_discovery=True)
+
+
+def poll_until(ctx, check, timeout=3600, clock=time.time):
+    """Call check with the growing intervals until it returns True.
+
+    :param clock: the callable returning the current time
+    :return: True if check returned True or False if timed out
+    """
+    deadline = clock() + timeout
+    backoff = Backoff(POLL_MIN_INTERVAL, POLL_MAX_INTERVAL, jitter=JITTER)
+    while True:
+        if check():
+            return True
+        remaining = deadline - clock()
+        if remaining <= 0:
+            return False
+        ctx.sleep(min(next(backoff), remaining))
@@ -0,0 +1,112 @@
+# coding=utf-8
+# =============================================================================
+#
+# Copyright (c) 2016, Cisco Systems
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+# =============================================================================
+
+"""Track the per node state transitions while the device boots."""
+
+import math
+
+
+class NodeTimeline(object):
+    """Record the node state transitions from the consecutive node state polls.
+
+    The nodes are up when in one of the valid states. The device is ready when all
+    the required nodes (i.e. route processors) and the quorum of the other nodes are up.
+
+    :param valid_states: the node states accepted as up
+    :param required: the function(node) returning True for the nodes which must be up
+    :param quorum: the fraction of the other nodes which must be up
+    """
+    def __init__(self, valid_states, required=None, quorum=1.0):
+        self.valid_states = frozenset(valid_states)
+        self.required = required or (lambda node: True)
+        self.quorum = quorum
+        self.begin = None
+        self.states = {}
+        self.transitions = []
+
+    def update(self, states, timestamp):
+        """Record the node states polled at timestamp.
+
+        :param states: the dictionary of node -> state
+        :return: the list of (node, old state, new state) tuples changed by the poll
+        """
+        if self.begin is None:
+            self.begin = timestamp
+        changed = []
+        for node, state in sorted(states.items()):
+            previous = self.states.get(node)
+            if previous is not None and previous[0] == state:
+                continue
+            self.states[node] = (state, timestamp)
+            self.transitions.append((timestamp, node, state))
+            changed.append((node, previous[0] if previous else None, state))
+        return changed
+
+    def is_up(self, node):
+        return node in self.states and self.states[node][0] in self.valid_states
+
+    def ready(self):
+        """Return True if the required nodes and the quorum of the other nodes are up."""
+        if not self.states:
+            return False
+        others = []
+        for node in self.states:
+            if self.required(node):
+                if not self.is_up(node):
+                    return False
+            else:
+                others.append(node)
+        up = sum(1 for node in others if self.is_up(node))
+        return up >= int(math.ceil(self.quorum * len(others) - 1e-9))
+
+    def pending(self):
+        """Return the sorted list of the nodes which are not up."""
+        return sorted(node for node in self.states if not self.is_up(node))
+
+    def stuck(self, timestamp, timeout):
+        """Return the list of (node, state, seconds) of the nodes not up and not changing the state for timeout."""
+        result = []
+        for node in self.pending():
+            state, since = self.states[node]
+            if timestamp - since >= timeout:
+                result.append((node, state, timestamp - since))
+        return result
+
+    def up_times(self):
+        """Return the dictionary of node -> seconds from the first poll to the node being up."""
+        times = {}
+        for timestamp, node, state in self.transitions:
+            if state in self.valid_states:
+                times.setdefault(node, timestamp - self.begin)
+            else:
+                times.pop(node, None)
+        return times
+
+    def export(self):
+        """Return the timeline as the list of dictionaries ordered by time."""
+        return [{'node': node, 'state': state, 'time': round(timestamp - self.begin, 3)}
+                for timestamp, node, state in self.transitions]
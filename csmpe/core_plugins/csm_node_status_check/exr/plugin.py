@@ -25,6 +25,7 @@
 # THE POSSIBILITY OF SUCH DAMAGE.
 # =============================================================================
 from csmpe.plugins import CSMPlugin
+from csmpe.snapshot import Snapshot
 from plugin_lib import parse_show_platform
 
 
@@ -34,12 +35,13 @@ class Plugin(CSMPlugin):
     platforms = {'ASR9K', 'NCS1K', 'NCS4K', 'NCS5K', 'NCS5500', 'NCS6K', 'IOS-XRv'}
     phases = {'Pre-Upgrade', 'Post-Upgrade'}
     os = {'eXR'}
+    read_only = True
 
     def run(self):
         # show platform can take more than 1 minute after router reload. Issue No. 47
         output = self.ctx.send("show platform", timeout=600)
 
-        inventory = parse_show_platform(output)
+        inventory = parse_show_platform(self.ctx, output)
         valid_state = [
             'IOS XR RUN',
             'PRESENT',
@@ -60,8 +62,10 @@ class Plugin(CSMPlugin):
                     self.ctx.warning("{}={}: {}".format(key, value, "Not in valid state for upgrade"))
                     break
         else:
-            self.ctx.save_data("node_status", inventory)
+            nodes = inventory.to_dict()
+            self.ctx.save_data("node_status", nodes)
             self.ctx.info("All nodes in valid state for upgrade")
+            Snapshot(self.ctx).record("inventory", nodes)
             return True
 
         self.ctx.error("Not all nodes in correct state. Upgrade can not proceed")
@@ -24,11 +24,13 @@
 # =============================================================================
 import re
 
+from csmpe.parsers import CPU_NODE, NodeInventory, EXR_PLATFORM, parse_show_platform as parse_platform
+
 
 def parse_show_platform(ctx, output):
     """
     :param output: output from 'show platform'
-    :return: dictionary of nodes
+    :return: the NodeInventory of the nodes
 
     Platform: ASR9K-X64
     Node              Type                       State             Config state
@@ -162,39 +164,10 @@ def parse_show_platform(ctx, output):
     --------------------------------------------------------------------------------
     0/RP0/CPU0        R-IOSXRV9000-RP(Active)    IOS XR RUN        NSHUT
     """
-    inventory = {}
-    sl = ['node', 'type', 'state', 'config state']
-    dl = {}
-
-    lines = output.split('\n')
-    lines = [x for x in lines if x]
-    for line in lines:
-        line = line.strip()
-
-        if line[0:4] == 'Node':
-            line = line.lower()
-            for s in sl:
-                n = line.find(s)
-                if n != -1:
-                    dl[str(s)] = n
-                else:
-                    ctx.warning("unrecognized show platform header {}".format(line))
-                    return None
-
-        if line[0].isdigit():
-            node = line[:dl["type"]]
-            if not re.search('CPU\d+\s*$', node):
-                continue
-
-            node_type = line[dl['type']:dl['state']].strip()
-            state = line[dl['state']:dl['config state']].strip()
-            config_state = line[dl['config state']:].strip()
-
-            entry = {
-                'type': node_type,
-                'state': state,
-                'config_state': config_state
-            }
-            inventory[node] = entry
-
+    inventory = parse_platform(output, EXR_PLATFORM, node=CPU_NODE)
+    if inventory is None:
+        if re.search(r"^\s*Node", output, re.MULTILINE):
+            ctx.warning("unrecognized show platform header")
+            return None
+        return NodeInventory()
     return inventory
@@ -25,6 +25,7 @@
 # THE POSSIBILITY OF SUCH DAMAGE.
 # =============================================================================
 from csmpe.plugins import CSMPlugin
+from csmpe.snapshot import Snapshot
 from plugin_lib import parse_show_platform
 
 
@@ -33,6 +34,7 @@ class Plugin(CSMPlugin):
     name = "Node Status Check Plugin"
     platforms = {'ASR900'}
     phases = {'Pre-Upgrade', 'Post-Upgrade'}
+    read_only = True
 
     def run(self):
         # show platform can take more than 1 minute after router reload. Issue No. 47
@@ -51,8 +53,10 @@ class Plugin(CSMPlugin):
                 self.ctx.warning("{}={}: {}".format(key, value, "Not in valid state for upgrade"))
                 break
         else:
-            self.ctx.save_data("node_status", inventory)
+            nodes = inventory.to_dict()
+            self.ctx.save_data("node_status", nodes)
             self.ctx.info("All nodes in valid state for upgrade")
+            Snapshot(self.ctx).record("inventory", nodes)
             return True
 
         self.ctx.error("Not all nodes in correct state. Upgrade can not proceed")
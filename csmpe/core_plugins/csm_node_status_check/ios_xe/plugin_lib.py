@@ -22,14 +22,14 @@
 # ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
 # THE POSSIBILITY OF SUCH DAMAGE.
 # =============================================================================
-import re
+from csmpe.parsers import NodeInventory, XE_PLATFORM, parse_show_platform as parse_platform
 
 
 def parse_show_platform(ctx, output):
     """
     :param ctx: PluginContext
     :param output: output from 'show platform'
-    :return: dictionary of nodes
+    :return: the NodeInventory of the nodes
 
     Load for five secs: 1%/0%; one minute: 2%; five minutes: 2%
     No time source, *22:40:38.097 UTC Wed Oct 12 2016
@@ -51,53 +51,4 @@ def parse_show_platform(ctx, output):
 
 
     """
-
-    ctx.info("IOS_XE in parse_show_platform")
-
-    inventory = {}
-    lines = output.split('\n')
-    lines = [x for x in lines if x]
-    slotcnt = 0
-    for line in lines:
-        line = line.strip()
-
-        # ctx.info("line = {}".format(line))
-        # ctx.info("len(line) = {}".format(len(line)))
-
-        if len(line) > 0:
-
-            states = re.split('\s+', line)
-            # ctx.info("states[0] = {}".format(states[0]))
-
-            if '--' in states[0]:
-                continue
-
-            if states[0] == 'Chassis':
-                continue
-
-            if states[0] == 'Slot':
-                slotcnt += 1
-                if slotcnt == 2:
-                    break
-                else:
-                    continue
-
-            if slotcnt == 1:
-                node = line[0:8]
-                node = node.strip()
-                node_type = line[9:28]
-                state = line[29:50]
-                state = state.strip()
-                config_state = line[51:60]
-                config_state = config_state.strip()
-
-                # ctx.info("node={}, type={}, state={}".format(node, node_type, state))
-
-                entry = {
-                    'type': node_type,
-                    'state': state,
-                    'config_state': config_state
-                }
-                inventory[node] = entry
-
-    return inventory
+    return parse_platform(output, XE_PLATFORM) or NodeInventory()
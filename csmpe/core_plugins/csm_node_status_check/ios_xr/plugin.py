@@ -25,6 +25,7 @@
 # THE POSSIBILITY OF SUCH DAMAGE.
 # =============================================================================
 from csmpe.plugins import CSMPlugin
+from csmpe.snapshot import Snapshot
 from plugin_lib import parse_show_platform
 
 
@@ -34,6 +35,7 @@ class Plugin(CSMPlugin):
     platforms = {'ASR9K', 'CRS'}
     phases = {'Pre-Upgrade', 'Post-Upgrade'}
     os = {'XR'}
+    read_only = True
 
     def run(self):
         # show platform can take more than 1 minute after router reload. Issue No. 47
@@ -56,8 +58,10 @@ class Plugin(CSMPlugin):
                     self.ctx.warning("{}={}: {}".format(key, value, "Not in valid state for upgrade"))
                     break
         else:
-            self.ctx.save_data("node_status", inventory)
+            nodes = inventory.to_dict()
+            self.ctx.save_data("node_status", nodes)
             self.ctx.info("All nodes in valid state for upgrade")
+            Snapshot(self.ctx).record("inventory", nodes)
             return True
 
         self.ctx.error("Not all nodes in correct state. Upgrade can not proceed")
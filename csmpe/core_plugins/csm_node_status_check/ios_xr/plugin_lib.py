@@ -22,14 +22,14 @@
 # ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
 # THE POSSIBILITY OF SUCH DAMAGE.
 # =============================================================================
-import re
+from csmpe.parsers import CPU_NODE, NodeInventory, XR_PLATFORM, parse_show_platform as parse_platform
 
 
 def parse_show_platform(ctx, output):
     """
     :param ctx: PluginContext
     :param output: output from 'show platform'
-    :return: dictionary of nodes
+    :return: the NodeInventory of the nodes
 
     ASR9K:
     Node            Type                      State            Config State
@@ -60,28 +60,4 @@ def parse_show_platform(ctx, output):
     0/RP1/CPU0    RP(Standby)       N/A                IOS XR RUN      PWR,NSHUT,MON
 
     """
-    host = ctx.get_host
-    inventory = {}
-    lines = output.split('\n')
-    for line in lines:
-        line = line.strip()
-        if len(line) > 0 and line[0].isdigit():
-            states = re.split('\s\s+', line)
-
-            if not re.search('CPU\d+$', states[0]):
-                continue
-            if host.family == 'ASR9K':
-                node, node_type, state, config_state = states
-            elif host.family == 'CRS':
-                node, node_type, plim, state, config_state = states
-            else:
-                ctx.warning("Unsupported platform {}".format(host.family))
-                return None
-            entry = {
-                'type': node_type,
-                'state': state,
-                'config_state': config_state
-            }
-            inventory[node] = entry
-
-    return inventory
+    return parse_platform(output, XR_PLATFORM, node=CPU_NODE) or NodeInventory()
@@ -28,6 +28,7 @@
 import re
 import string
 from csmpe.plugins import CSMPlugin
+from csmpe.snapshot import Snapshot
 from csmpe.core_plugins.csm_install_operations.ios_xe.utils import number_of_rsp
 
 
@@ -38,6 +39,7 @@ class Plugin(CSMPlugin):
     name = "Node Redundancy Check Plugin"
     platforms = {'ASR900'}
     phases = {'Pre-Upgrade', 'Post-Upgrade'}
+    read_only = True
 
     def run(self):
         """
@@ -81,6 +83,7 @@ class Plugin(CSMPlugin):
             return
 
         sso_ready = 0
+        states = {}
 
         lines = string.split(output, '\n')
         lines = [x for x in lines if x]
@@ -89,6 +92,7 @@ class Plugin(CSMPlugin):
             m = re.search('my state = .* -(.*)', line)
             if m:
                 state = m.group(1)
+                states['my state'] = state.strip()
                 if 'ACTIVE' in state:
                     sso_ready = sso_ready | 1
                     self.ctx.info('{}'.format(line.lstrip()))
@@ -97,6 +101,7 @@ class Plugin(CSMPlugin):
             m = re.search('peer state = .* -(.*)', line)
             if m:
                 state = m.group(1)
+                states['peer state'] = state.strip()
                 if 'STANDBY HOT' in state:
                     sso_ready = sso_ready | 2
                     self.ctx.info('{}'.format(line.lstrip()))
@@ -105,6 +110,7 @@ class Plugin(CSMPlugin):
             m = re.search('Redundancy Mode \(Operational\)\s+= (.*)', line)
             if m:
                 state = m.group(1)
+                states['Redundancy Mode (Operational)'] = state.strip()
                 if 'sso' in state:
                     sso_ready = sso_ready | 4
                     self.ctx.info('{}'.format(line.lstrip()))
@@ -113,6 +119,7 @@ class Plugin(CSMPlugin):
             m = re.search('Redundancy Mode \(Configured\)\s+= (.*)', line)
             if m:
                 state = m.group(1)
+                states['Redundancy Mode (Configured)'] = state.strip()
                 if 'sso' in state:
                     sso_ready = sso_ready | 8
                     self.ctx.info('{}'.format(line.lstrip()))
@@ -121,6 +128,7 @@ class Plugin(CSMPlugin):
             m = re.search('Redundancy State        \s+ = (.*)', line)
             if m:
                 state = m.group(1)
+                states['Redundancy State'] = state.strip()
                 if 'sso' in state:
                     sso_ready = sso_ready | 16
                     self.ctx.info('{}'.format(line.lstrip()))
@@ -131,3 +139,5 @@ class Plugin(CSMPlugin):
             self.ctx.info("Router redundancy has reached SSO state.")
         else:
             self.ctx.warning("Router redundancy has not reached SSO state.")
+
+        Snapshot(self.ctx).record("redundancy", states)
@@ -37,6 +37,7 @@ class Plugin(CSMPlugin):
     name = "Node Redundancy Check Plugin"
     platforms = {'ASR9K', 'CRS'}
     phases = {'Pre-Upgrade', 'Pre-Activate'}
+    read_only = True
 
     def run(self):
         """
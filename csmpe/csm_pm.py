@@ -27,11 +27,14 @@
 # THE POSSIBILITY OF SUCH DAMAGE.
 # =============================================================================
 
-import pkginfo
-from stevedore.dispatch import DispatchExtensionManager
+from stevedore.named import NamedExtensionManager
 from stevedore.exception import NoMatches
 
+import log
 from context import PluginContext
+from registry import PluginRegistry
+from scheduler import ConcurrentDispatcher, order_plugins
+from status import PHASE_START, PHASE_END
 
 install_phases = ['Pre-Upgrade', 'Pre-Add', 'Add', 'Pre-Activate', 'Activate', 'Pre-Deactivate',
                   'Deactivate', 'Pre-Remove', 'Remove', 'Remove All Inactive', 'Commit', 'Get-Inventory',
@@ -39,11 +42,14 @@ install_phases = ['Pre-Upgrade', 'Pre-Add', 'Add', 'Pre-Activate', 'Activate', '
 
 auto_pre_phases = ["Add", "Activate", "Deactivate"]
 
+#: The default maximum number of additional device sessions used to run the read-only plugins concurrently.
+DEFAULT_MAX_SESSIONS = 2
+
 
 class CSMPluginManager(object):
 
-    def __init__(self, ctx=None, invoke_on_load=True):
-        self._ctx = PluginContext(ctx)
+    def __init__(self, ctx=None, invoke_on_load=True, registry=None, pool=None):
+        self._ctx = PluginContext(ctx, pool=pool)
         # The context contains device information after discovery phase
         # There is no need to load plugins which does not match the family and os
         try:
@@ -57,84 +63,139 @@ class CSMPluginManager(object):
 
         self._phase = None
         self._name = None
+        self._invoke_on_load = invoke_on_load
+        self._extensions = {}
+        self._registry = registry or PluginRegistry("csm.plugin", warning=self._ctx.warning)
+        self._max_sessions = getattr(ctx, "max_sessions", DEFAULT_MAX_SESSIONS) or 0
 
         self.load(invoke_on_load=invoke_on_load)
 
     def load(self, invoke_on_load=True):
-        self._manager = DispatchExtensionManager(
+        """Read the plugin metadata from the registry index. No plugin module is imported here.
+        The plugins are imported and instantiated when dispatched."""
+        self._invoke_on_load = invoke_on_load
+        self._extensions = {}
+        self._registry.load()
+        self._build_plugin_list()
+
+    def _load_extensions(self, names, invoke_on_load=None):
+        return NamedExtensionManager(
             "csm.plugin",
-            self._check_plugin,
-            invoke_on_load=invoke_on_load,
+            names,
+            invoke_on_load=self._invoke_on_load if invoke_on_load is None else invoke_on_load,
             invoke_args=(self._ctx,),
+            name_order=True,
             propagate_map_exceptions=True,
             on_load_failure_callback=self._on_load_failure,
         )
-        self._build_plugin_list()
 
     def __getitem__(self, item):
-        return self._manager.__getitem__(item)
+        if item not in self._extensions:
+            self._extensions[item] = self._load_extensions([item]).__getitem__(item)
+        return self._extensions[item]
 
     def _build_plugin_list(self):
         self.plugins = {}
-        for ext in self._manager:
-            self.plugins[ext.name] = {
-                #  'package_name': ext.entry_point.dist.project_name,
-                'package_name': ext.entry_point.module_name.split(".")[0],
-                'name': ext.plugin.name,
-                'description': ext.plugin.__doc__,
-                'phases': ext.plugin.phases,
-                'platforms': ext.plugin.platforms,
-                'os': ext.plugin.os
-            }
-
-    def _filter_func(self, ext, *args, **kwargs):
-        if self._platform and bool(ext.plugin.platforms) and self._platform not in ext.plugin.platforms:
-            return False
-        if self._phase and self._phase not in ext.plugin.phases:
-            return False
-        if self._name and ext.plugin.name not in self._name:
-            return False
-        # if detected os is set and plugin os set is not empty and detected os is not in plugin os then
-        # plugin does not match
-        if self._os and bool(ext.plugin.os) and self._os not in ext.plugin.os:
-            return False
-        return True
-
-    def _dispatch(self, ext, *args, **kwargs):
-        if self._filter_func(ext):
-            self._ctx.current_plugin = None
-            self._ctx.info("Dispatching: '{}'".format(ext.plugin.name))
-            self._ctx.post_status(ext.plugin.name)
-            self._ctx.current_plugin = ext.plugin.name
-            return True
-        return False
+        for uuid in self._select(self._phase):
+            self.plugins[uuid] = self._registry.plugins[uuid]
+
+    def _select(self, phase):
+        return self._registry.select(phase=phase, platform=self._platform, os=self._os, names=self._name)
+
+    def _dispatch(self, ext, func):
+        self._ctx.current_plugin = None
+        self._ctx.info("Dispatching: '{}'".format(ext.plugin.name))
+        self._ctx.post_status(ext.plugin.name)
+        self._ctx.current_plugin = ext.plugin.name
+        with self._ctx.metrics.plugin(ext.plugin.name, self._phase):
+            return getattr(ext.plugin(self._ctx), func)()
+
+    def _concurrency(self):
+        """Return the number of additional sessions available for the read-only plugins."""
+        if self._max_sessions <= 0:
+            return 0
+        try:
+            # the console line accepts single session only
+            if self._ctx.is_console:
+                return 0
+        except AttributeError:
+            return 0
+        return self._max_sessions
+
+    def _groups(self, names):
+        """Split the ordered plugin names into the groups dispatched together.
+        The consecutive read-only plugins form the group if the concurrent execution is enabled."""
+        concurrent = self._concurrency() > 0
+        group = []
+        for uuid in names:
+            if concurrent and self._registry.plugins[uuid].get('read_only'):
+                group.append(uuid)
+                continue
+            if group:
+                yield group
+                group = []
+            yield [uuid]
+        if group:
+            yield group
+
+    def _requires(self, names):
+        """Return the dictionary of entry point name -> set of required entry point names.
+        The plugin names are not unique, so every entry point with the required name is included."""
+        details = self._registry.plugins
+        uuids = {}
+        for uuid in names:
+            uuids.setdefault(details[uuid]['name'], set()).add(uuid)
+
+        requires = {}
+        for uuid in names:
+            requires[uuid] = set()
+            for name in details[uuid].get('requires', ()):
+                requires[uuid] |= uuids.get(name, set()) - {uuid}
+        return requires
+
+    def _map_method(self, func):
+        """Import and run only the plugins matching the current filters."""
+        if not self._select(None):
+            raise NoMatches("No csm.plugin extensions found")
+        names = self._select(self._phase)
+        if not names:
+            return []
+
+        requires = self._requires(names)
+        names = order_plugins(names, requires)
+
+        # the plugins are instantiated when dispatched with the context of the session running them
+        extensions = dict((ext.name, ext) for ext in self._load_extensions(names, invoke_on_load=False))
+        results = []
+        for group in self._groups(names):
+            group = [extensions[uuid] for uuid in group if uuid in extensions]
+            if len(group) > 1:
+                self._ctx.info("Dispatching concurrently: {}".format(", ".join(ext.plugin.name for ext in group)))
+                results += ConcurrentDispatcher(self._ctx, group, func, requires, self._concurrency()).run()
+            else:
+                results += [self._dispatch(ext, func) for ext in group]
+        return results
 
     def _on_load_failure(self, manager, entry_point, exc):
         self._ctx.warning("Plugin load error: {}".format(entry_point))
         self._ctx.warning("Exception: {}".format(exc))
 
-    def _check_plugin(self, ext, *args, **kwargs):
-        attributes = ['name', 'phases', 'platforms', 'os']
-        plugin = ext.plugin
-        for attribute in attributes:
-            if not hasattr(plugin, attribute):
-                self._ctx.warning("Attribute '{}' missing in plugin class: {}".format(
-                    attribute, ext.entry_point.module_name))
-                return False
-        return self._filter_func(ext)
-
     def get_package_metadata(self, name):
-        try:
-            meta = pkginfo.Installed(name)
-        except ValueError as e:
-            print(e)
-            return None
+        meta = self._registry.get_package_metadata(name)
+        if meta is None:
+            print("No package metadata found for: {}".format(name))
         return meta
 
-    def _get_package_names(self):
-        return self.get_package_metadata().keys()
-
     def dispatch(self, func):
+        try:
+            return self._dispatch_phases(func)
+        finally:
+            self._ctx.write_metrics()
+            # the plugins.log and status messages are complete when the dispatch returns
+            log.flush()
+            self._ctx.flush_status()
+
+    def _dispatch_phases(self, func):
 
         results = []
         current_phase = self._ctx.phase
@@ -142,24 +203,28 @@ class CSMPluginManager(object):
             phase = "Pre-{}".format(self._ctx.phase)
             self.set_phase_filter(phase)
             self._ctx.info("Phase: {}".format(self._phase))
+            self._ctx.post_event(PHASE_START, self._phase)
             try:
-                results = self._manager.map_method(self._dispatch, func)
+                results = self._map_method(func)
             except NoMatches:
                 self._ctx.warning("No {} plugins found".format(phase))
             self._ctx.current_plugin = None
+            self._ctx.post_event(PHASE_END, self._phase)
 
         self.set_phase_filter(current_phase)
         self._ctx.info("Phase: {}".format(self._phase))
+        self._ctx.post_event(PHASE_START, self._phase)
         try:
-            results += self._manager.map_method(self._dispatch, func)
+            results += self._map_method(func)
         except NoMatches:
             self._ctx.post_status("No plugins found for phase {}".format(self._phase))
             self._ctx.error("No plugins found for phase {}".format(self._phase))
 
         self._ctx.current_plugin = None
+        self._ctx.post_event(PHASE_END, self._phase)
         self._ctx.success = True
         self._ctx.info("CSM Plugin Manager Finished")
-        self._ctx.disconnect()
+        self._ctx.release()
         return results
 
     def set_platform_filter(self, platform):
@@ -0,0 +1,113 @@
+# =============================================================================
+# DiscoveryCache
+#
+# Copyright (c)  2016, Cisco Systems
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+# =============================================================================
+
+"""The time limited record of the device discovery.
+
+condoor keeps the device description of every connection chain and skips the discovery commands
+when connected without ``force_discovery``. The cache decides when the description is fresh enough
+to be trusted. The entry is written after every full discovery into the separate file per host
+url chain and is invalidated when the device reloads or the software is activated or deactivated.
+"""
+
+import hashlib
+import json
+import os
+import time
+
+from session_pool import session_key
+
+#: The environment variable overriding the default cache directory.
+DISCOVERY_CACHE_ENV = "CSMPE_DISCOVERY_CACHE"
+
+#: The default number of seconds the discovery result is valid.
+DEFAULT_DISCOVERY_TTL = 3600
+
+
+def default_cache_dir():
+    """Return the cache directory taken from environment or located in user's home directory."""
+    return os.environ.get(DISCOVERY_CACHE_ENV) or os.path.join(os.path.expanduser("~"), ".csmpe", "discovery")
+
+
+class DiscoveryCache(object):
+    """The per host url chain discovery cache.
+
+    :param ttl: The number of seconds the discovery is valid. The value 0 disables the cache.
+    :param cache_dir: The cache directory. If None the :func:`default_cache_dir` is used.
+    """
+    def __init__(self, ttl=DEFAULT_DISCOVERY_TTL, cache_dir=None):
+        self.ttl = ttl
+        self.cache_dir = cache_dir or default_cache_dir()
+
+    def _filename(self, urls):
+        key = hashlib.sha1(json.dumps(session_key(urls))).hexdigest()
+        return os.path.join(self.cache_dir, "{}.json".format(key))
+
+    def get(self, urls):
+        """Return the cached discovery entry if not expired or None."""
+        if not self.ttl:
+            return None
+        try:
+            with open(self._filename(urls)) as f:
+                entry = json.load(f)
+        except (IOError, OSError, ValueError):
+            return None
+        if time.time() - entry.get('timestamp', 0) > self.ttl:
+            return None
+        return entry
+
+    def is_valid(self, urls):
+        return self.get(urls) is not None
+
+    def update(self, urls, connection):
+        """Store the discovery result of the connected device."""
+        if not self.ttl:
+            return
+        entry = {
+            'timestamp': time.time(),
+            'hostname': connection.hostname,
+            'family': connection.family,
+            'platform': connection.platform,
+            'os_type': connection.os_type,
+            'os_version': connection.os_version,
+        }
+        filename = self._filename(urls)
+        tmp_file = "{}.{}".format(filename, os.getpid())
+        try:
+            if not os.path.exists(self.cache_dir):
+                os.makedirs(self.cache_dir)
+            with open(tmp_file, "w") as f:
+                json.dump(entry, f)
+            os.rename(tmp_file, filename)
+        except (IOError, OSError):
+            pass
+
+    def invalidate(self, urls):
+        """Forget the discovery result. The next connection does the full discovery."""
+        try:
+            os.remove(self._filename(urls))
+        except OSError:
+            pass
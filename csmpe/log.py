@@ -0,0 +1,156 @@
+# =============================================================================
+# Plugin logging
+#
+# Copyright (c)  2016, Cisco Systems
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+# =============================================================================
+
+"""The non-blocking plugin logging.
+
+The plugin loggers only put the log records into the queue. The records are formatted and written
+by the single background writer thread per log file, so the disk I/O never blocks the device
+communication. Every logger has at most one queue handler, so the logger shared by the plugin contexts
+of the same host does not write the same line multiple times.
+"""
+
+import atexit
+import logging
+import os
+import sys
+import threading
+
+from six.moves import queue
+
+LOG_FORMAT = '%(asctime)-15s %(levelname)8s: %(message)s'
+
+_lock = threading.Lock()
+_writers = {}
+
+
+class _Writer(threading.Thread):
+    """The background thread writing the queued records with the handler."""
+    def __init__(self, target):
+        super(_Writer, self).__init__(name="csmpe-log-writer")
+        self.daemon = True
+        self.target = target
+        self.queue = queue.Queue()
+        self.users = 0
+        if target is None:
+            self.handler = logging.StreamHandler(sys.stderr)
+        else:
+            self.handler = logging.FileHandler(target)
+        self.handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    def run(self):
+        while True:
+            record = self.queue.get()
+            try:
+                if record is None:
+                    break
+                self.handler.handle(record)
+            except Exception:
+                self.handler.handleError(record)
+            finally:
+                self.queue.task_done()
+        self.handler.close()
+
+    def stop(self):
+        self.queue.put(None)
+        self.join()
+
+
+class QueueHandler(logging.Handler):
+    """Put the log records into the writer queue. The record is formatted by the writer."""
+    def __init__(self, writer):
+        logging.Handler.__init__(self)
+        self.writer = writer
+
+    @property
+    def target(self):
+        return self.writer.target
+
+    def emit(self, record):
+        # the traceback is rendered now as the frames may be gone when written
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        self.writer.queue.put(record)
+
+
+def _acquire_writer(target):
+    writer = _writers.get(target)
+    if writer is None:
+        writer = _Writer(target)
+        writer.start()
+        _writers[target] = writer
+    writer.users += 1
+    return writer
+
+
+def _release_writer(writer):
+    writer.users -= 1
+    if writer.users <= 0 and _writers.get(writer.target) is writer:
+        del _writers[writer.target]
+        writer.stop()
+
+
+def get_logger(name, log_dir=None, level=logging.NOTSET, filename="plugins.log"):
+    """Return the logger writing to the file in log_dir or to stderr if log_dir is None.
+
+    The call is idempotent. The logger previously set up for the other log directory is switched
+    to the new one.
+    """
+    logger = logging.getLogger(name)
+    target = os.path.abspath(os.path.join(log_dir, filename)) if log_dir else None
+    with _lock:
+        handlers = [handler for handler in logger.handlers if isinstance(handler, QueueHandler)]
+        for handler in handlers:
+            # the writer is stopped after shutdown
+            if handler.target != target or not handler.writer.is_alive():
+                logger.removeHandler(handler)
+                _release_writer(handler.writer)
+        if not any(isinstance(handler, QueueHandler) for handler in logger.handlers):
+            logger.addHandler(QueueHandler(_acquire_writer(target)))
+    logger.setLevel(level)
+    return logger
+
+
+def flush():
+    """Wait until all queued log records are written."""
+    with _lock:
+        writers = list(_writers.values())
+    for writer in writers:
+        writer.queue.join()
+        writer.handler.flush()
+
+
+def shutdown():
+    """Write the queued records and stop all writer threads."""
+    with _lock:
+        writers = list(_writers.values())
+        _writers.clear()
+    for writer in writers:
+        writer.stop()
+
+
+atexit.register(shutdown)
@@ -0,0 +1,195 @@
+# =============================================================================
+# Device log scanner
+#
+# Copyright (c)  2016, Cisco Systems
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+# =============================================================================
+
+"""Scan the device log for the errors, cores and tracebacks in one pass while it is streamed.
+
+The patterns are combined into the single regular expression searched over the whole chunk,
+so the lines not matching any pattern are never split out of the chunk. The patterns are joined
+without the groups, which would disable the fast scan for the first characters of the alternatives,
+and only the lines found are matched against every pattern to name the finding. The same messages
+logged repeatedly (i.e. on every retry of the failing process) are reported once with the count.
+
+The scanner remembers the timestamp of the last log entry as the cursor. Scanning the log with
+the cursor of the previous run skips the entries not newer than the cursor. The log entries have
+no year, so the log buffer is expected to cover less than half a year.
+"""
+
+import re
+
+#: The (name, regular expression) pairs of the log entries reported.
+DEFAULT_PATTERNS = [
+    ('error', r"[Ee][Rr][Rr][Oo][Rr]"),
+    ('core', r"Core for pid"),
+    ('traceback', r"Traceback"),
+    # cfgmgr-rp[165]: %MGBL-CONFIG-4-VERSION : Version of existing saved configuration detected to be incompatible
+    # with the installed software. Configuration will be restored from an alternate source and may take
+    # longer than usual on this boot.
+    ('config', r"%MGBL-CONFIG-4-VERSION\b"),
+]
+
+MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+# RP/0/RSP0/CPU0:Jun 23 18:19:05.426 UTC: ...
+# 0/RP0/ADMIN0:Jun 23 18:19:05.426 UTC: ...
+TIMESTAMP = re.compile(
+    r"(?P<node>\S*?:)?(?P<timestamp>(?P<month>{})\s+(?P<day>\d+)\s+(?P<time>\d\d:\d\d:\d\d(?:\.\d+)?))"
+    .format("|".join(MONTHS)))
+
+
+def _sort_key(match):
+    return MONTHS.index(match.group('month')), int(match.group('day')), match.group('time')
+
+
+def _newer(key, cursor):
+    """Return True if the timestamp key is after the cursor key."""
+    months = (key[0] - cursor[0]) % 12
+    if months:
+        # Dec 31 -> Jan 1
+        return months < 6
+    return key[1:] > cursor[1:]
+
+
+class Finding(object):
+    """The log message found.
+
+    :param name: the name of the pattern matching the message
+    :param message: the first log line with the message
+    :param timestamp: the timestamp of the first log line or None
+    """
+    __slots__ = ('name', 'message', 'count', 'first', 'last')
+
+    def __init__(self, name, message, timestamp):
+        self.name = name
+        self.message = message
+        self.count = 1
+        self.first = timestamp
+        self.last = timestamp
+
+    def __str__(self):
+        if self.count == 1:
+            return self.message
+        return "{} (logged {} times, last at {})".format(self.message, self.count, self.last)
+
+
+class LogScanner(object):
+    """Match the streamed log against the patterns.
+
+    The scanner has the same :meth:`feed` and :meth:`close` methods as :class:`csmpe.capture.PatternMatcher`,
+    so it can be passed as the matcher of the command capture.
+
+    :param patterns: the list of the (name, regular expression) pairs
+    :param cursor: the cursor of the previous run, only the newer entries are scanned
+    """
+    def __init__(self, patterns=None, cursor=None):
+        self.patterns = patterns or DEFAULT_PATTERNS
+        self._search = re.compile("|".join(pattern for _, pattern in self.patterns)).search
+        self._named = [(name, re.compile(pattern).search) for name, pattern in self.patterns]
+        match = TIMESTAMP.match(cursor) if cursor else None
+        self._cursor = _sort_key(match) if match else None
+        self._started = self._cursor is None
+        self._partial = ""
+        self._last = None
+        self._findings = {}
+        self.findings = []
+        self.cursor = cursor
+        self.lines = 0
+
+    def feed(self, chunk):
+        chunk = self._partial + chunk
+        end = chunk.rfind('\n') + 1
+        self._partial = chunk[end:]
+        if end:
+            self._scan(chunk[:end])
+
+    def close(self):
+        if self._partial:
+            self._scan(self._partial + '\n')
+            self._partial = ""
+        # the cursor is the last timestamp logged
+        if self._last is not None and (self._cursor is None or _newer(_sort_key(self._last), self._cursor)):
+            self.cursor = self._last.group('timestamp')
+
+    def _skip(self, text):
+        """Return the offset of the first entry newer than the cursor or None."""
+        start = 0
+        while start < len(text):
+            end = text.index('\n', start) + 1
+            match = TIMESTAMP.match(text, start, end)
+            if match and _newer(_sort_key(match), self._cursor):
+                self._started = True
+                return start
+            start = end
+        return None
+
+    def _last_timestamp(self, text):
+        """Remember the timestamp of the last entry of the text ending with the new line."""
+        end = len(text)
+        while end > 0:
+            start = text.rfind('\n', 0, end - 1) + 1
+            match = TIMESTAMP.match(text, start, end)
+            if match:
+                self._last = match
+                return
+            end = start
+
+    def _scan(self, text):
+        self._last_timestamp(text)
+        self.lines += text.count('\n')
+        position = 0
+        if not self._started:
+            position = self._skip(text)
+            if position is None:
+                return
+
+        search = self._search
+        while True:
+            match = search(text, position)
+            if match is None:
+                return
+            start = text.rfind('\n', 0, match.start()) + 1
+            end = text.index('\n', match.end())
+            self._found(text[start:end])
+            position = end + 1
+
+    def _found(self, line):
+        name = next((name for name, search in self._named if search(line)), self.patterns[0][0])
+        match = TIMESTAMP.match(line)
+        if match:
+            timestamp = match.group('timestamp')
+            # the same message on the same node
+            key = (match.group('node'), line[match.end():])
+        else:
+            timestamp = None
+            key = (None, line.strip())
+
+        finding = self._findings.get(key)
+        if finding is None:
+            self._findings[key] = finding = Finding(name, line.strip(), timestamp)
+            self.findings.append(finding)
+        else:
+            finding.count += 1
+            finding.last = timestamp or finding.last
@@ -0,0 +1,230 @@
+# =============================================================================
+# Metrics
+#
+# Copyright (c)  2016, Cisco Systems
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+# =============================================================================
+
+"""The timing instrumentation of the plugin execution.
+
+Every plugin dispatch, device command, FSM run, sleep and reconnect is recorded as the timeline event.
+The timeline is written to *metrics.json* and the aggregated values to the Prometheus textfile
+*metrics.prom* in the log directory. The events of the previous dispatches to the same log directory
+are kept, so the files cover the whole run.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+METRICS_JSON = "metrics.json"
+METRICS_PROM = "metrics.prom"
+
+#: The maximum length of the command label in the Prometheus textfile.
+MAX_LABEL_LENGTH = 80
+
+
+class _Event(object):
+    """Time the block and record the event when it finishes."""
+    __slots__ = ('_metrics', 'event', '_start')
+
+    def __init__(self, metrics, event):
+        self._metrics = metrics
+        self.event = event
+        self._start = None
+
+    def __setitem__(self, key, value):
+        self.event[key] = value
+
+    def __enter__(self):
+        self._start = time.time()
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.event['start'] = round(self._start, 3)
+        self.event['duration'] = round(time.time() - self._start, 6)
+        if exc_type is not None:
+            self.event['error'] = exc_type.__name__
+        self._metrics.add(self.event)
+        return False
+
+
+class Metrics(object):
+    """The timeline of the recorded events.
+
+    :param hostname: the host label of the metrics
+    :param enabled: if False nothing is recorded or written
+    """
+    def __init__(self, hostname="host", enabled=True):
+        self.hostname = hostname
+        self.enabled = enabled
+        self.events = []
+        self._lock = threading.Lock()
+
+    def add(self, event):
+        if self.enabled:
+            with self._lock:
+                self.events.append(event)
+
+    def _event(self, kind, name, plugin, **fields):
+        event = {'type': kind, 'name': name, 'plugin': plugin}
+        event.update(fields)
+        return _Event(self, event)
+
+    def plugin(self, name, phase=None):
+        """Return the context manager timing the plugin dispatch."""
+        return self._event('plugin', name, name, phase=phase)
+
+    def command(self, cmd, plugin=None):
+        """Return the context manager timing the device command. Set the 'bytes' item to the output size."""
+        return self._event('command', cmd, plugin, bytes=0)
+
+    def fsm(self, name, command, plugin=None):
+        """Return the context manager timing the FSM run."""
+        return self._event('fsm', name, plugin, command=command)
+
+    def sleep(self, seconds, plugin=None):
+        """Return the context manager timing the sleep."""
+        return self._event('sleep', "sleep", plugin, requested=seconds)
+
+    def reconnect(self, plugin=None):
+        """Return the context manager timing the device reconnect."""
+        return self._event('reconnect', "reconnect", plugin)
+
+    def summary(self, events=None):
+        """Return the aggregated metrics of the events."""
+        events = self.events if events is None else events
+        plugins = OrderedDict()
+        commands = OrderedDict()
+        totals = {'sleep_seconds': 0.0, 'reconnects': 0, 'reconnect_seconds': 0.0,
+                  'command_seconds': 0.0, 'commands': 0, 'command_bytes': 0, 'command_errors': 0,
+                  'locally_filtered_bytes': 0}
+        for event in events:
+            kind = event['type']
+            if kind == 'plugin':
+                plugin = plugins.setdefault(event['name'], {'count': 0, 'seconds': 0.0, 'errors': 0})
+                plugin['count'] += 1
+                plugin['seconds'] += event['duration']
+                plugin['errors'] += 'error' in event
+            elif kind in ('command', 'fsm'):
+                name = event['name'] if kind == 'command' else "fsm:{}".format(event['name'])
+                command = commands.setdefault(name, {'count': 0, 'seconds': 0.0, 'bytes': 0, 'errors': 0,
+                                                     'locally_filtered_bytes': 0})
+                command['count'] += 1
+                command['seconds'] += event['duration']
+                command['bytes'] += event.get('bytes', 0)
+                command['locally_filtered_bytes'] += event.get('locally_filtered_bytes', 0)
+                command['errors'] += 'error' in event
+                totals['commands'] += 1
+                totals['command_seconds'] += event['duration']
+                totals['command_bytes'] += event.get('bytes', 0)
+                totals['locally_filtered_bytes'] += event.get('locally_filtered_bytes', 0)
+                totals['command_errors'] += 'error' in event
+            elif kind == 'sleep':
+                totals['sleep_seconds'] += event['duration']
+            elif kind == 'reconnect':
+                totals['reconnects'] += 1
+                totals['reconnect_seconds'] += event['duration']
+        return {'plugins': plugins, 'commands': commands, 'totals': totals}
+
+    def _read(self, filename):
+        try:
+            with open(filename) as f:
+                data = json.load(f)
+            return data['events'] if data.get('host') == self.hostname else []
+        except (IOError, OSError, ValueError, KeyError, TypeError):
+            return []
+
+    def write(self, log_dir):
+        """Write the timeline and Prometheus textfile into log_dir. Return the list of files written."""
+        if not self.enabled or not log_dir:
+            return []
+
+        with self._lock:
+            events, self.events = self.events, []
+
+        json_file = os.path.join(log_dir, METRICS_JSON)
+        events = self._read(json_file) + events
+        summary = self.summary(events)
+        try:
+            with open(json_file, "w") as f:
+                json.dump(OrderedDict([('host', self.hostname), ('summary', summary), ('events', events)]), f)
+
+            prom_file = os.path.join(log_dir, METRICS_PROM)
+            with open(prom_file + ".tmp", "w") as f:
+                f.write(self.prometheus(summary))
+            os.rename(prom_file + ".tmp", prom_file)
+        except (IOError, OSError):
+            return []
+        return [json_file, prom_file]
+
+    def prometheus(self, summary):
+        """Return the summary in the Prometheus text exposition format."""
+        lines = []
+
+        def metric(name, kind, description, samples):
+            lines.append("# HELP {} {}".format(name, description))
+            lines.append("# TYPE {} {}".format(name, kind))
+            # the truncated command labels may collide so the values are summed
+            series = OrderedDict()
+            for labels, value in samples:
+                labels = dict(labels, host=self.hostname)
+                text = ",".join('{}="{}"'.format(key, _escape(labels[key])) for key in sorted(labels))
+                series[text] = series.get(text, 0) + value
+            for text, value in series.items():
+                lines.append("{}{{{}}} {}".format(name, text, value))
+
+        plugins = summary['plugins']
+        commands = summary['commands']
+        totals = summary['totals']
+        metric("csmpe_plugin_duration_seconds", "counter", "Plugin wall time.",
+               [({'plugin': name}, round(value['seconds'], 6)) for name, value in plugins.items()])
+        metric("csmpe_plugin_runs_total", "counter", "Plugin dispatch count.",
+               [({'plugin': name}, value['count']) for name, value in plugins.items()])
+        metric("csmpe_plugin_errors_total", "counter", "Failed plugin dispatch count.",
+               [({'plugin': name}, value['errors']) for name, value in plugins.items()])
+        metric("csmpe_command_duration_seconds", "counter", "Device command latency.",
+               [({'command': name}, round(value['seconds'], 6)) for name, value in commands.items()])
+        metric("csmpe_commands_total", "counter", "Device command count.",
+               [({'command': name}, value['count']) for name, value in commands.items()])
+        metric("csmpe_command_output_bytes", "counter", "Device command output size.",
+               [({'command': name}, value['bytes']) for name, value in commands.items()])
+        metric("csmpe_command_locally_filtered_bytes", "counter",
+               "Device command output size discarded by the local filters the device could not apply.",
+               [({'command': name}, value['locally_filtered_bytes']) for name, value in commands.items()])
+        metric("csmpe_command_errors_total", "counter", "Failed device command count.",
+               [({'command': name}, value['errors']) for name, value in commands.items()])
+        metric("csmpe_sleep_seconds", "counter", "Time spent sleeping.", [({}, round(totals['sleep_seconds'], 6))])
+        metric("csmpe_reconnects_total", "counter", "Device reconnect count.", [({}, totals['reconnects'])])
+        metric("csmpe_reconnect_seconds", "counter", "Time spent reconnecting.",
+               [({}, round(totals['reconnect_seconds'], 6))])
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    value = "{}".format(value)
+    if len(value) > MAX_LABEL_LENGTH:
+        value = value[:MAX_LABEL_LENGTH - 3] + "..."
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
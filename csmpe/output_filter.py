@@ -0,0 +1,102 @@
+# =============================================================================
+# Command output filters
+#
+# Copyright (c)  2016, Cisco Systems
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+# =============================================================================
+
+"""Filter the command output lines on the device with the ``| begin``, ``| include`` and ``| exclude`` pipes.
+
+The output which is not transferred does not cost the time on the slow console or jump host sessions.
+The filters the device can not apply are applied to the output locally with the same result:
+
+* the OS does not support the pipes or supports less of them,
+* the pattern has the characters the device and Python regular expressions treat differently
+  (i.e. the spaces or the pipe character ending the device pattern).
+
+The begin filter selects the output from the first line matching, the include and exclude filters select
+the lines matching and not matching. The begin filter is applied first.
+"""
+
+import re
+
+#: The number of the output pipes the OS accepts after the command.
+PIPES = {
+    'XR': 3,
+    'eXR': 3,
+    'XE': 1,
+    'IOS': 1,
+}
+
+# the device and Python regular expressions match the same for the patterns without the special characters
+_PORTABLE = re.compile(r"[\w.:/%-]+$")
+
+
+class OutputFilter(object):
+    """The output line filters.
+
+    :param include: the regular expression of the lines selected or None
+    :param exclude: the regular expression of the lines discarded or None
+    :param begin: the regular expression of the first line selected or None
+    """
+    __slots__ = ('include', 'exclude', 'begin')
+
+    def __init__(self, include=None, exclude=None, begin=None):
+        self.include = include
+        self.exclude = exclude
+        self.begin = begin
+
+    def __nonzero__(self):
+        return bool(self.include or self.exclude or self.begin)
+
+    def push(self, cmd, os_type):
+        """Return the command with the pipes the device applies and the filter of the rest applied locally."""
+        pipes = PIPES.get(os_type, 0)
+        pushed = []
+        local = OutputFilter()
+        # the line filters are pushed only after the begin filter, the begin filter is applied first
+        for name in ('begin', 'include', 'exclude'):
+            pattern = getattr(self, name)
+            if not pattern:
+                continue
+            if len(pushed) < pipes and _PORTABLE.match(pattern) and not (name != 'begin' and local.begin):
+                pushed.append("| {} {}".format(name, pattern))
+            else:
+                setattr(local, name, pattern)
+        return " ".join([cmd] + pushed), local
+
+    def apply(self, output):
+        """Return the output lines selected by the filter."""
+        if not self or not output:
+            return output
+        lines = output.splitlines(True)
+        if self.begin:
+            search = re.compile(self.begin).search
+            lines = next((lines[index:] for index, line in enumerate(lines) if search(line)), [])
+        if self.include:
+            search = re.compile(self.include).search
+            lines = [line for line in lines if search(line)]
+        if self.exclude:
+            search = re.compile(self.exclude).search
+            lines = [line for line in lines if not search(line)]
+        return "".join(lines)
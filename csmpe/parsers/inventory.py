@@ -0,0 +1,189 @@
+# =============================================================================
+# Node inventory
+#
+# Copyright (c)  2016, Cisco Systems
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+# =============================================================================
+
+"""The node inventory parsed from the show platform output of all OS families.
+
+The nodes are the slotted records shared by the install engine, the node status checks and the migration.
+The records are accessible as the dictionaries with the 'type', 'state' and 'config_state' keys too.
+"""
+
+import re
+from collections import Mapping
+
+from table import Column, FixedWidthTable
+
+#: The eXR 'show platform' table.
+EXR_PLATFORM = FixedWidthTable([
+    Column('name', "Node"),
+    Column('type', "Type"),
+    Column('state', "State"),
+    Column('config_state', "Config state"),
+], row=r"\s*\d")
+
+#: The eXR 'admin show platform' table of the System Admin plane. The SW state is kept as the state.
+EXR_ADMIN_PLATFORM = FixedWidthTable([
+    Column('name', "Location"),
+    Column('type', "Card Type"),
+    Column('hw_state', "HW State"),
+    Column('state', "SW State"),
+    Column('config_state', "Config State"),
+], row=r"\s*\d")
+
+#: The XR 'admin show platform' table. The CRS prints the PLIM column.
+XR_PLATFORM = FixedWidthTable([
+    Column('name', "Node"),
+    Column('type', "Type"),
+    Column('plim', "PLIM", optional=True),
+    Column('state', "State"),
+    Column('config_state', "Config State"),
+], row=r"\s*\d")
+
+#: The IOS XE 'show platform' table. The insert time is kept as the config state.
+XE_PLATFORM = FixedWidthTable([
+    Column('name', "Slot"),
+    Column('type', "Type"),
+    Column('state', "State"),
+    Column('config_state', "Insert time (ago)"),
+], row=r"\s*(\d|[A-Z]\d)")
+
+#: The CPU nodes of the XR and eXR platforms.
+CPU_NODE = re.compile(r"CPU\d+$")
+
+# the node types and states repeat on every node and poll
+_strings = {}
+
+
+class Node(object):
+    """The node of the device."""
+    __slots__ = ('name', 'type', 'state', 'config_state')
+
+    _keys = ('type', 'state', 'config_state')
+
+    def __init__(self, name, node_type, state, config_state=""):
+        self.name = name
+        self.type = _strings.setdefault(node_type, node_type)
+        self.state = _strings.setdefault(state, state)
+        self.config_state = _strings.setdefault(config_state, config_state)
+
+    @property
+    def slot(self):
+        """The rack and slot of the node i.e. '0/RSP0' of '0/RSP0/CPU0'."""
+        parts = self.name.split('/')
+        return "/".join(parts[:2]) if len(parts) > 2 else self.name
+
+    def __getitem__(self, key):
+        if key not in self._keys:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def to_dict(self):
+        return {'type': self.type, 'state': self.state, 'config_state': self.config_state}
+
+    def __eq__(self, other):
+        return isinstance(other, Node) and (self.name, self.type, self.state, self.config_state) == \
+            (other.name, other.type, other.state, other.config_state)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return repr(self.to_dict())
+
+
+class NodeInventory(Mapping):
+    """The mapping of the node name -> :class:`Node` in the printed order indexed by the slot, type and state."""
+    def __init__(self, nodes=()):
+        self._names = []
+        self._nodes = {}
+        for node in nodes:
+            if node.name not in self._nodes:
+                self._names.append(node.name)
+            self._nodes[node.name] = node
+        self._indexes = {}
+
+    def __getitem__(self, name):
+        return self._nodes[name]
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __len__(self):
+        return len(self._names)
+
+    def __contains__(self, name):
+        return name in self._nodes
+
+    def _lookup(self, attribute, value):
+        index = self._indexes.get(attribute)
+        if index is None:
+            index = {}
+            for name in self._names:
+                node = self._nodes[name]
+                index.setdefault(getattr(node, attribute), []).append(node)
+            self._indexes[attribute] = index
+        return list(index.get(value, ()))
+
+    def by_slot(self, slot):
+        """Return the list of the nodes in the slot i.e. '0/RSP0'."""
+        return self._lookup('slot', slot)
+
+    def by_type(self, node_type):
+        return self._lookup('type', node_type)
+
+    def by_state(self, state):
+        return self._lookup('state', state)
+
+    def states(self):
+        """Return the dictionary of the node name -> state."""
+        return dict((name, node.state) for name, node in self._nodes.items())
+
+    def to_dict(self):
+        """Return the {node: {'type': type, 'state': state, 'config_state': config_state}} dictionary."""
+        return dict((name, node.to_dict()) for name, node in self._nodes.items())
+
+
+def parse_show_platform(output, table, node=None):
+    """Parse the show platform output.
+
+    :param output: the command output
+    :param table: the :class:`csmpe.parsers.table.FixedWidthTable` of the OS, i.e. :data:`XR_PLATFORM`
+    :param node: the compiled pattern of the node names included or None to include all nodes
+    :return: the :class:`NodeInventory` or None if the table header is not found
+    """
+    rows = table.parse(output or "", select=node)
+    if rows is None:
+        return None
+    name, node_type, state, config_state = [table.keys.index(key)
+                                            for key in ('name', 'type', 'state', 'config_state')]
+    return NodeInventory([Node(row[name], row[node_type], row[state], row[config_state]) for row in rows
+                          if row[name]])
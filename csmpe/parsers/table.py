@@ -0,0 +1,140 @@
+# =============================================================================
+# Fixed width table parser
+#
+# Copyright (c)  2016, Cisco Systems
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+# =============================================================================
+
+"""The parser of the fixed width tables printed by the show commands.
+
+The column offsets are taken from the header line matched with the regular expression compiled once
+per table, so the rows are split by slicing. The header driven offsets follow the column widths of the
+release and platform, i.e. the CRS PLIM column. The row with the value overflowing the column boundary
+is split on the runs of spaces instead.
+"""
+
+import re
+
+_SPACES = re.compile(r"\s{2,}")
+
+
+class Column(object):
+    """The table column.
+
+    :param key: the name of the value
+    :param label: the column header label
+    :param optional: if True the column is not printed in all outputs
+    """
+    __slots__ = ('key', 'label', 'optional')
+
+    def __init__(self, key, label, optional=False):
+        self.key = key
+        self.label = label
+        self.optional = optional
+
+
+class FixedWidthTable(object):
+    """The table parsed by the column offsets of the header.
+
+    :param columns: the list of :class:`Column` in the printed order
+    :param row: the pattern matching the beginning of the table row
+    """
+    def __init__(self, columns, row=r"\s*\S"):
+        self.columns = list(columns)
+        self.keys = tuple(column.key for column in self.columns)
+        pattern = r"^\s*"
+        for index, column in enumerate(self.columns):
+            part = "({})".format(re.escape(column.label).replace(r"\ ", r"\s+"))
+            if index < len(self.columns) - 1:
+                part += r"\s+"
+            if column.optional:
+                part = "(?:{})?".format(part)
+            pattern += part
+        self._header = re.compile(pattern + r"\s*$", re.IGNORECASE)
+        self._row = re.compile(row)
+        self._next_header = self.columns[0].label.lower()
+
+    def _layout(self, match):
+        """Return the (index, start, end) slices of the printed columns and the pattern of the overflowing rows."""
+        starts = [(index, match.start(index + 1)) for index in range(len(self.columns))
+                  if match.start(index + 1) != -1]
+        slices = []
+        for position, (index, start) in enumerate(starts):
+            end = starts[position + 1][1] if position + 1 < len(starts) else None
+            slices.append((index, start, end))
+        # no space on both sides of the column boundary
+        boundaries = [r".{{{}}}\S\S".format(start - 1) for _, start, _ in slices[1:] if start > 0]
+        overflow = re.compile("^(?:{})".format("|".join(boundaries)) if boundaries else "$^")
+        return slices, overflow
+
+    def parse(self, output, select=None):
+        """Return the list of row tuples with the values in the column order or None if the header is not found.
+
+        The values of the optional columns not printed are empty strings. The rows end with the header
+        of the next table.
+
+        :param select: the compiled pattern searched in the first column value to select the rows or None
+        """
+        lines = output.splitlines()
+        for number, line in enumerate(lines):
+            match = self._header.match(line)
+            if match is not None:
+                break
+        else:
+            return None
+
+        slices, overflow = self._layout(match)
+        first, start, end = slices[0]
+        width = len(self.columns)
+        complete = len(slices) == width
+        row_match, overflow_match, next_header = self._row.match, overflow.match, self._next_header
+        rows = []
+        for line in lines[number + 1:]:
+            if row_match(line) is None:
+                if line.strip().lower().startswith(next_header):
+                    break
+                continue
+            if select is not None and select.search(line[start:end].rstrip()) is None:
+                # the first column value overflowing the boundary is selected from the split row
+                boundary = line[end - 1:end + 1] if end else " "
+                if " " in boundary or len(boundary) < 2:
+                    continue
+            if overflow_match(line) is not None:
+                row = self._split_spaces(line, slices, width)
+                if select is None or select.search(row[first]):
+                    rows.append(row)
+                continue
+            if complete:
+                rows.append(tuple([line[begin:stop].strip() for _, begin, stop in slices]))
+            else:
+                values = [""] * width
+                for index, begin, stop in slices:
+                    values[index] = line[begin:stop].strip()
+                rows.append(tuple(values))
+        return rows
+
+    def _split_spaces(self, line, slices, width):
+        values = [""] * width
+        for (index, _, _), value in zip(slices, _SPACES.split(line.strip())):
+            values[index] = value
+        return tuple(values)
@@ -0,0 +1,471 @@
+# =============================================================================
+# CLI output templates
+#
+# Copyright (c)  2016, Cisco Systems
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+# =============================================================================
+
+r"""The declarative templates of the show command outputs in the TextFSM syntax.
+
+The template declares the values and the states with the rules matched against every line::
+
+    Value Filldown,Required INSTANCE (\S+)
+    Value STATE (Up|Init|Failed)
+    Value L1 (\d+)
+
+    Start
+      ^IS-IS ${INSTANCE} neighbor summary:
+      ^${STATE}\s+${L1} -> Record
+
+The supported value options are Filldown, Required, List and Key. The rule actions are the line
+actions Next and Continue, the record actions Record, NoRecord, Clear and Clearall, the transition
+to the other state and Error. The End state stops the parsing. The record is saved at the end
+of the output unless the template declares the EOF state.
+
+The template text is compiled once to the state machine shared by all templates of the same text.
+All rules of the state are joined to the single pattern searched in the whole output, so the lines
+matching no rule are skipped without splitting the output.
+The records are the named tuples of the values converted with the template types, the empty
+values are None and the empty lists.
+"""
+
+import re
+from collections import namedtuple
+
+OPTIONS = frozenset(['Filldown', 'Required', 'List', 'Key'])
+LINE_ACTIONS = frozenset(['Next', 'Continue'])
+RECORD_ACTIONS = frozenset(['Record', 'NoRecord', 'Clear', 'Clearall'])
+
+_VALUE = re.compile(r"^Value\s+(?:([\w,]+)\s+)?([A-Za-z]\w*)\s+(\(.*\))\s*$")
+_STATE = re.compile(r"^(\w+)\s*$")
+_RULE = re.compile(r"^\s+(\^.*?)(?:\s+->\s*(.*?))?\s*$")
+_ERROR = re.compile(r'^Error(?:\s+"(.*)")?$')
+_VARIABLE = re.compile(r"\$\$|\$\{(\w+)\}")
+# the lookbehinds, negative lookaheads and string anchors differ at the line end in the whole output
+_LINE_ONLY = re.compile(r"\(\?<|\(\?!|\\[AZ]")
+# the group references are renumbered in the joined pattern
+_REFERENCE = re.compile(r"\\[1-9]|\(\?P=|\(\?\(")
+
+#: the compiled state machines by the template text
+_machines = {}
+
+
+class TemplateError(ValueError):
+    """The template syntax error or the Error action of the rule matching the output line."""
+
+
+class _Value(object):
+    __slots__ = ('name', 'pattern', 'filldown', 'required', 'list', 'key')
+
+    def __init__(self, name, pattern, options):
+        self.name = name
+        self.pattern = pattern
+        self.filldown = 'Filldown' in options
+        self.required = 'Required' in options
+        self.list = 'List' in options
+        self.key = 'Key' in options
+
+
+class _Rule(object):
+    __slots__ = ('index', 'pattern', 'groups', 'line', 'record', 'state', 'error')
+
+    def __init__(self, index, pattern, groups, line, record, state, error):
+        self.index = index
+        self.pattern = pattern
+        self.groups = groups
+        self.line = line
+        self.record = record
+        self.state = state
+        self.error = error
+
+
+class _Matcher(object):
+    """The rules of the state from the first one tried joined to the single pattern.
+
+    The pattern following the newline finds the first line matching any rule in the output
+    with the newline prepended. The newline prefix is searched before the rules are tried.
+    """
+    __slots__ = ('match', 'scan', 'rules')
+
+    def __init__(self, rules, values):
+        self.scan = None
+        joined = "|".join("(?P<r{}>{})".format(rule.index, rule.pattern) for rule in rules)
+        try:
+            if _REFERENCE.search(joined) is not None:
+                raise re.error("group references")
+            # the first matching alternative is the first matching rule and its group closes last
+            pattern = re.compile(joined)
+        except (re.error, AssertionError):
+            # too many groups or the rule pattern not to be joined, i.e. the group references
+            self.match = None
+            self.rules = []
+            for rule in rules:
+                pattern = re.compile(rule.pattern)
+                self.rules.append((pattern.match,) + self._entry(pattern, rule, values))
+            return
+        self.match = pattern.match
+        if _LINE_ONLY.search(joined) is None:
+            self.scan = re.compile("\n(?:{})".format(joined), re.MULTILINE).search
+        self.rules = dict((pattern.groupindex["r{}".format(rule.index)], self._entry(pattern, rule, values))
+                          for rule in rules)
+
+    @staticmethod
+    def _entry(pattern, rule, values):
+        """Return the rule with the (group number, value index) pairs of its scalar and list values
+        and the group numbers of all values in the record order if the rule sets all values and records them."""
+        scalars = [(pattern.groupindex[group], index) for group, index in rule.groups if not values[index].list]
+        lists = [(pattern.groupindex[group], index) for group, index in rule.groups if values[index].list]
+        direct = None
+        complete = sorted(index for _, index in scalars) == range(len(values))
+        if complete and not lists and rule.line == 'Next' and rule.record == 'Record' and rule.error is None:
+            direct = tuple(number for number, _ in sorted(scalars, key=lambda item: item[1]))
+        return rule, scalars, lists, direct
+
+    def find(self, line):
+        """Return the rule entry and the match of the first rule matching the line."""
+        if self.match is not None:
+            match = self.match(line)
+            if match is None:
+                return None, None
+            return self.rules[match.lastindex], match
+        for entry in self.rules:
+            match = entry[0](line)
+            if match is not None:
+                return entry[1:], match
+        return None, None
+
+
+class _State(object):
+    __slots__ = ('name', 'rules', 'matchers')
+
+    def __init__(self, name):
+        self.name = name
+        self.rules = []
+        self.matchers = {}
+
+
+class _Machine(object):
+    """The state machine compiled from the template text."""
+
+    def __init__(self, text):
+        self.values = []
+        self.states = {}
+        lines = text.splitlines()
+        number = self._parse_values(lines)
+        self._parse_states(lines, number)
+        if 'Start' not in self.states:
+            raise TemplateError("The template has no Start state")
+        for state in self.states.values():
+            for rule in state.rules:
+                if rule.state is not None and rule.state not in self.states and rule.state != 'End':
+                    raise TemplateError("Unknown state '{}' in state '{}'".format(rule.state, state.name))
+            # the rules tried after the Continue action start with the next rule
+            if state.rules:
+                state.matchers[0] = _Matcher(state.rules, self.values)
+            for rule in state.rules[:-1]:
+                if rule.line == 'Continue':
+                    state.matchers[rule.index + 1] = _Matcher(state.rules[rule.index + 1:], self.values)
+        indexes = range(len(self.values))
+        self.required = tuple(index for index in indexes if self.values[index].required)
+        self.lists = tuple(index for index in indexes if self.values[index].list)
+        self.cleared = tuple(index for index in indexes if not self.values[index].filldown)
+        self.filldown = tuple(index for index in indexes if self.values[index].filldown)
+        self.names = tuple(value.name for value in self.values)
+        self.keys = tuple(value.name for value in self.values if value.key)
+        self.record = namedtuple('Record', self.names)
+
+    def _parse_values(self, lines):
+        names = set()
+        for number, line in enumerate(lines):
+            if not line.strip() or line.startswith('#'):
+                if self.values and not line.strip():
+                    return number
+                continue
+            match = _VALUE.match(line)
+            if match is None:
+                if self.values:
+                    raise TemplateError("Invalid value definition: '{}'".format(line))
+                return number
+            options, name, pattern = match.groups()
+            options = options.split(',') if options else []
+            unknown = set(options) - OPTIONS
+            if unknown:
+                raise TemplateError("Unknown options {} of value '{}'".format(", ".join(sorted(unknown)), name))
+            if name in names:
+                raise TemplateError("Duplicate value '{}'".format(name))
+            try:
+                re.compile(pattern)
+            except re.error as error:
+                raise TemplateError("Invalid pattern of value '{}': {}".format(name, error))
+            names.add(name)
+            self.values.append(_Value(name, pattern[1:-1], options))
+        return len(lines)
+
+    def _parse_states(self, lines, number):
+        state = None
+        for line in lines[number:]:
+            if not line.strip() or line.lstrip().startswith('#'):
+                state = None
+                continue
+            if state is None:
+                match = _STATE.match(line)
+                if match is None:
+                    raise TemplateError("Invalid state name: '{}'".format(line))
+                name = match.group(1)
+                if name in self.states or name == 'End':
+                    raise TemplateError("Duplicate state '{}'".format(name))
+                state = self.states[name] = _State(name)
+                continue
+            match = _RULE.match(line)
+            if match is None:
+                raise TemplateError("Invalid rule in state '{}': '{}'".format(state.name, line))
+            state.rules.append(self._rule(len(state.rules), match.group(1), match.group(2) or ""))
+
+    def _rule(self, index, pattern, action):
+        groups = []
+        indexes = dict((value.name, number) for number, value in enumerate(self.values))
+
+        def substitute(match):
+            name = match.group(1)
+            if name is None:
+                return "$"
+            if name not in indexes:
+                raise TemplateError("Unknown value '{}' in rule '{}'".format(name, pattern))
+            group = "v{}_{}".format(index, len(groups))
+            groups.append((group, indexes[name]))
+            return "(?P<{}>{})".format(group, self.values[indexes[name]].pattern)
+
+        regex = _VARIABLE.sub(substitute, pattern)
+        try:
+            re.compile(regex)
+        except re.error as error:
+            raise TemplateError("Invalid rule '{}': {}".format(pattern, error))
+
+        line, record, state, error = 'Next', 'NoRecord', None, None
+        match = _ERROR.match(action)
+        if match is not None:
+            error = match.group(1) or "Error action in rule '{}'".format(pattern)
+        elif action:
+            words = action.split()
+            if len(words) > 2:
+                raise TemplateError("Invalid action '{}' in rule '{}'".format(action, pattern))
+            operation = words[0]
+            if '.' in operation:
+                line, record = operation.split('.', 1)
+            elif operation in LINE_ACTIONS:
+                line = operation
+            elif operation in RECORD_ACTIONS:
+                record = operation
+            elif len(words) == 1:
+                state = operation
+            else:
+                raise TemplateError("Invalid action '{}' in rule '{}'".format(action, pattern))
+            if len(words) == 2:
+                state = words[1]
+            if line not in LINE_ACTIONS or record not in RECORD_ACTIONS:
+                raise TemplateError("Invalid action '{}' in rule '{}'".format(action, pattern))
+            if line == 'Continue' and state is not None:
+                raise TemplateError("The Continue action with the state change in rule '{}'".format(pattern))
+        return _Rule(index, regex, groups, line, record, state, error)
+
+
+def compile_machine(text):
+    """Return the state machine of the template text compiled once."""
+    machine = _machines.get(text)
+    if machine is None:
+        machine = _machines[text] = _Machine(text)
+    return machine
+
+
+class Template(object):
+    """The template of the show command output.
+
+    :param text: the template text
+    :param types: the dictionary of value name -> the callable converting the value string
+    """
+    def __init__(self, text, types=None):
+        self._machine = compile_machine(text)
+        self.record = self._machine.record
+        self.names = self._machine.names
+        self.keys = self._machine.keys
+        types = types or {}
+        unknown = set(types) - set(self.names)
+        if unknown:
+            raise TemplateError("Types of unknown values: {}".format(", ".join(sorted(unknown))))
+        self._types = [(index, types[name]) for index, name in enumerate(self.names) if name in types]
+
+    def parse(self, output):
+        """Return the list of records parsed from the output."""
+        if '\r' in output:
+            output = '\n'.join(output.splitlines())
+        # the position is the newline before the next line
+        output = '\n' + output
+        machine = self._machine
+        current = self._empty()
+        blank = self._empty()
+        records = []
+        state = machine.states['Start']
+        matcher = state.matchers.get(0)
+        find = output.find
+        append = records.append
+        new, record_type, types = tuple.__new__, self.record, self._types
+        filldown, cleared, lists_used = machine.filldown, machine.cleared, machine.lists
+        end = len(output)
+        position = 0
+        while matcher is not None:
+            scan = matcher.scan
+            if scan is not None:
+                match = scan(output, position)
+                if match is None:
+                    break
+                first = match.start() + 1
+                if first == end:
+                    break
+                last = find('\n', first)
+                if last < 0:
+                    last = end
+                if match.end() > last:
+                    # the match continued on the next lines is not the match of the line alone
+                    match = matcher.match(output[first:last])
+                    if match is None:
+                        position = last
+                        continue
+                rule, scalars, lists, direct = matcher.rules[match.lastindex]
+            else:
+                first = position + 1
+                if first >= end:
+                    break
+                last = find('\n', first)
+                if last < 0:
+                    last = end
+                entry, match = matcher.find(output[first:last])
+                if entry is None:
+                    position = last
+                    continue
+                rule, scalars, lists, direct = entry
+            position = last
+
+            while True:
+                group = match.group
+                if direct is not None:
+                    # the rule setting all values is recorded without the current values
+                    values = group(*direct) if len(direct) > 1 else (group(direct[0]),)
+                    if None not in values:
+                        current[:] = blank
+                        for index in filldown:
+                            current[index] = values[index]
+                        if types:
+                            values = list(values)
+                            for index, convert in types:
+                                values[index] = convert(values[index])
+                        append(new(record_type, values))
+                        break
+                for number, index in scalars:
+                    value = group(number)
+                    if value is not None:
+                        current[index] = value
+                for number, index in lists:
+                    value = group(number)
+                    if value is not None:
+                        current[index].append(value)
+                if rule.error is not None:
+                    raise TemplateError("{}: '{}'".format(rule.error, output[first:last]))
+                record = rule.record
+                if record == 'Record':
+                    if lists_used or None in current:
+                        self._append(records, current)
+                    else:
+                        # all values are set, so the record is not empty and has the required values
+                        values = current[:]
+                        for index, convert in types:
+                            values[index] = convert(values[index])
+                        append(new(record_type, values))
+                        for index in cleared:
+                            current[index] = None
+                elif record == 'Clear':
+                    self._clear(current, machine.cleared)
+                elif record == 'Clearall':
+                    self._clear(current, range(len(current)))
+                if rule.line == 'Next':
+                    break
+                # Continue with the next rules of the state matching the same line
+                following = state.matchers.get(rule.index + 1)
+                entry, match = following.find(output[first:last]) if following else (None, None)
+                if entry is None:
+                    break
+                rule, scalars, lists, direct = entry
+
+            if rule.state is not None and rule.line == 'Next':
+                if rule.state == 'End':
+                    return records
+                state = machine.states[rule.state]
+                matcher = state.matchers.get(0)
+                if state.name == 'EOF':
+                    break
+        if 'EOF' not in machine.states:
+            self._append(records, current)
+        return records
+
+    def _empty(self):
+        current = [None] * len(self.names)
+        for index in self._machine.lists:
+            current[index] = []
+        return current
+
+    def _append(self, records, current):
+        """Append the record of the current values and clear them. The empty record is not appended."""
+        machine = self._machine
+        lists = machine.lists
+        if None in current or lists:
+            empty = current.count(None) + current.count([])
+            if empty == len(current):
+                return
+            for index in machine.required:
+                value = current[index]
+                if value is None or value == []:
+                    self._clear(current, machine.cleared)
+                    return
+        values = current[:]
+        for index in lists:
+            values[index] = list(values[index])
+        self._record(records, values)
+        self._clear(current, machine.cleared)
+
+    def _record(self, records, values):
+        if self._types:
+            values = list(values)
+            lists = self._machine.lists
+            for index, convert in self._types:
+                value = values[index]
+                if value is not None:
+                    values[index] = [convert(item) for item in value] if index in lists else convert(value)
+        records.append(tuple.__new__(self.record, values))
+
+    def _clear(self, current, indexes):
+        lists = self._machine.lists
+        if lists:
+            for index in indexes:
+                current[index] = [] if index in lists else None
+        else:
+            for index in indexes:
+                current[index] = None
@@ -57,6 +57,14 @@ class CSMPlugin(object):
     #: Empty set means plugin will be executed regardless of the detected operating system.
     os = set()
 
+    #: True if the plugin only reads the device state (i.e. executes the show commands). The consecutive read-only
+    #: plugins of the phase may be dispatched concurrently, each over its own device session.
+    read_only = False
+
+    #: The set of plugin names which must finish before this plugin is dispatched.
+    #: The names of the plugins not dispatched in the same phase are ignored.
+    requires = set()
+
     def __init__(self, ctx):
         """ This is a constructor of a plugin object. The constructor can be overridden by the plugin code.
         The CSM Plugin Engine passes the :class:`csmpe.InstallContext` object
@@ -0,0 +1,225 @@
+# =============================================================================
+# PluginRegistry
+#
+# Copyright (c)  2016, Cisco Systems
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+# =============================================================================
+
+"""The on-disk index of the installed plugins.
+
+The index keeps the plugin metadata (name, phases, platforms, os, read_only, requires) and the package information
+of every ``csm.plugin`` entry point, so the plugin manager can select the plugins to be dispatched
+without importing and instantiating all of them. The index is rebuilt when any distribution
+providing the plugins is installed, upgraded or removed.
+"""
+
+import json
+import os
+import sys
+from collections import OrderedDict, namedtuple
+
+import pkg_resources
+import pkginfo
+
+REGISTRY_FORMAT = 2
+
+#: The environment variable overriding the default location of the index file.
+REGISTRY_ENV = "CSMPE_REGISTRY"
+
+PackageMetadata = namedtuple("PackageMetadata", ["name", "summary", "version", "author", "author_email"])
+
+_ATTRIBUTES = ('name', 'phases', 'platforms', 'os')
+
+
+def default_index_file():
+    """Return the index filename taken from environment or located in user's home directory."""
+    return os.environ.get(REGISTRY_ENV) or os.path.join(os.path.expanduser("~"), ".csmpe", "plugin_registry.json")
+
+
+def _mtime(path):
+    try:
+        return int(os.path.getmtime(path))
+    except (OSError, TypeError):
+        return 0
+
+
+class PluginRegistry(object):
+    """The persistent plugin metadata index.
+
+    :param namespace: The entry point namespace of the plugins.
+    :param index_file: The index file path. If None the :func:`default_index_file` is used.
+    :param warning: The optional callable reporting the plugin load problems.
+    """
+    def __init__(self, namespace="csm.plugin", index_file=None, warning=None):
+        self.namespace = namespace
+        self.index_file = index_file or default_index_file()
+        self._warning = warning
+        self._index = None
+
+    def _warn(self, message):
+        if self._warning:
+            self._warning(message)
+
+    def _entry_points(self):
+        return list(pkg_resources.iter_entry_points(self.namespace))
+
+    def _signature(self, entry_points):
+        """Return the list identifying the installed distributions providing the plugins."""
+        distributions = {}
+        for ep in entry_points:
+            dist = ep.dist
+            if dist is None:
+                continue
+            metadata_dir = getattr(dist, "egg_info", None) or dist.location
+            distributions[dist.project_name] = [dist.project_name, dist.version, _mtime(metadata_dir)]
+
+        return [REGISTRY_FORMAT, "{}.{}".format(*sys.version_info[:2])] + \
+            [distributions[name] for name in sorted(distributions)]
+
+    def _read(self):
+        try:
+            with open(self.index_file) as f:
+                return json.load(f)
+        except (IOError, OSError, ValueError):
+            return None
+
+    def _write(self, index):
+        directory = os.path.dirname(self.index_file)
+        tmp_file = "{}.{}".format(self.index_file, os.getpid())
+        try:
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+            with open(tmp_file, "w") as f:
+                json.dump(index, f)
+            os.rename(tmp_file, self.index_file)
+        except (IOError, OSError):
+            # The index is only an optimization. Keep it in memory if it can't be stored.
+            pass
+
+    def _build(self, entry_points, signature):
+        plugins = OrderedDict()
+        packages = {}
+        for ep in entry_points:
+            try:
+                plugin = ep.load(require=False)
+            except Exception as e:
+                self._warn("Plugin load error: {}".format(ep))
+                self._warn("Exception: {}".format(e))
+                continue
+
+            missing = [attribute for attribute in _ATTRIBUTES if not hasattr(plugin, attribute)]
+            if missing:
+                self._warn("Attribute '{}' missing in plugin class: {}".format(missing[0], ep.module_name))
+                continue
+
+            package_name = ep.module_name.split(".")[0]
+            plugins[ep.name] = {
+                'package_name': package_name,
+                'module_name': ep.module_name,
+                'name': plugin.name,
+                'description': plugin.__doc__,
+                'phases': sorted(plugin.phases),
+                'platforms': sorted(plugin.platforms),
+                'os': sorted(plugin.os),
+                'read_only': bool(getattr(plugin, 'read_only', False)),
+                'requires': sorted(getattr(plugin, 'requires', ())),
+            }
+            if package_name not in packages:
+                packages[package_name] = self._package_info(package_name)
+
+        return {
+            'signature': signature,
+            'plugins': plugins,
+            'packages': packages,
+        }
+
+    @staticmethod
+    def _package_info(package_name):
+        try:
+            meta = pkginfo.Installed(package_name)
+        except ValueError:
+            return None
+        return {
+            'name': package_name,
+            'summary': meta.summary,
+            'version': meta.version,
+            'author': meta.author,
+            'author_email': meta.author_email,
+        }
+
+    def load(self):
+        """Load the index from disk or rebuild it if the installed distributions changed."""
+        entry_points = self._entry_points()
+        signature = self._signature(entry_points)
+        index = self._read()
+        if index is None or index.get('signature') != signature:
+            index = self._build(entry_points, signature)
+            self._write(index)
+        else:
+            index['plugins'] = OrderedDict(
+                (ep.name, index['plugins'][ep.name]) for ep in entry_points if ep.name in index['plugins']
+            )
+        self._index = index
+        return self
+
+    def invalidate(self):
+        """Remove the index from disk and memory. It will be rebuilt on next :meth:`load`."""
+        self._index = None
+        try:
+            os.remove(self.index_file)
+        except OSError:
+            pass
+
+    @property
+    def plugins(self):
+        """The ordered dictionary of plugin metadata keyed by the entry point name."""
+        if self._index is None:
+            self.load()
+        return self._index['plugins']
+
+    def select(self, phase=None, platform=None, os=None, names=None):
+        """Return the list of entry point names of the plugins matching the criteria.
+
+        The empty plugin platforms or os set means any platform or os.
+        """
+        selected = []
+        for uuid, details in self.plugins.items():
+            if platform and details['platforms'] and platform not in details['platforms']:
+                continue
+            if phase and phase not in details['phases']:
+                continue
+            if names and details['name'] not in names:
+                continue
+            if os and details['os'] and os not in details['os']:
+                continue
+            selected.append(uuid)
+        return selected
+
+    def get_package_metadata(self, package_name):
+        """Return the :class:`PackageMetadata` of the package providing the plugins or None."""
+        if self._index is None:
+            self.load()
+        info = self._index['packages'].get(package_name)
+        if info is None:
+            return None
+        return PackageMetadata(**info)
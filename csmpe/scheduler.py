@@ -0,0 +1,186 @@
+# =============================================================================
+# ConcurrentDispatcher
+#
+# Copyright (c)  2016, Cisco Systems
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+# =============================================================================
+
+import sys
+import threading
+
+import six
+
+
+def order_plugins(names, requires):
+    """Return the entry point names sorted so every plugin follows the plugins it requires.
+
+    The original order is kept as much as possible. The requirements which are not in names are ignored.
+    The circular requirements are broken by the original order.
+
+    :param names: the list of entry point names in dispatch order
+    :param requires: the dictionary of entry point name -> set of required entry point names
+    """
+    remaining = list(names)
+    placed = []
+    while remaining:
+        for name in remaining:
+            if all(required in placed or required not in names for required in requires.get(name, ())):
+                break
+        else:
+            name = remaining[0]
+        remaining.remove(name)
+        placed.append(name)
+    return placed
+
+
+class _Outcome(object):
+    def __init__(self):
+        self.result = None
+        self.exc_info = None
+        self.events = []
+
+
+class ConcurrentDispatcher(object):
+    """Dispatch the read-only plugins over the pool of additional device sessions.
+
+    Every worker thread owns one session created by :meth:`csmpe.context.PluginContext.spawn`.
+    The plugin log records and status messages are buffered and merged into the main context
+    in the dispatch order once all plugins finish. The first plugin failure stops scheduling
+    the remaining plugins, disconnects the main context session and is re-raised after merging.
+
+    :param ctx: the main plugin context
+    :param extensions: the list of stevedore extensions in dispatch order
+    :param func: the plugin method name to be called
+    :param requires: the dictionary of entry point name -> set of entry point names to be finished before
+    :param sessions: the maximum number of concurrent device sessions
+    """
+    def __init__(self, ctx, extensions, func, requires=None, sessions=2):
+        self._ctx = ctx
+        self._extensions = extensions
+        self._func = func
+        self._requires = requires or {}
+        self._sessions = max(1, min(sessions, len(extensions)))
+
+        self._condition = threading.Condition()
+        self._csm_lock = threading.RLock()
+        self._pending = list(range(len(extensions)))
+        self._finished = set()
+        self._running = 0
+        self._failed = False
+        self._outcomes = [_Outcome() for _ in extensions]
+
+    def _names(self):
+        return set(ext.name for ext in self._extensions)
+
+    def _next(self):
+        """Return the index of the next plugin ready to be dispatched or None if nothing left."""
+        names = self._names()
+        with self._condition:
+            while self._pending and not self._failed:
+                for index in self._pending:
+                    requires = self._requires.get(self._extensions[index].name, ())
+                    if all(name in self._finished or name not in names for name in requires):
+                        break
+                else:
+                    if self._running:
+                        self._condition.wait()
+                        continue
+                    # nothing runs, so the pending plugins require each other
+                    # the circular requirements are broken by the dispatch order as in order_plugins
+                    index = self._pending[0]
+                self._pending.remove(index)
+                self._running += 1
+                return index
+            return None
+
+    def _done(self, index, failed):
+        with self._condition:
+            self._finished.add(self._extensions[index].name)
+            self._running -= 1
+            self._failed = self._failed or failed
+            self._condition.notify_all()
+
+    def _worker(self, session_id):
+        ctx = None
+        while True:
+            index = self._next()
+            if index is None:
+                break
+
+            ext = self._extensions[index]
+            outcome = self._outcomes[index]
+            try:
+                if ctx is None:
+                    ctx = self._ctx.spawn(session_id, self._csm_lock)
+                ctx.current_plugin = None
+                ctx.info("Dispatching: '{}' (session {})".format(ext.plugin.name, session_id))
+                ctx.post_status(ext.plugin.name)
+                ctx.current_plugin = ext.plugin.name
+                with ctx.metrics.plugin(ext.plugin.name):
+                    outcome.result = getattr(ext.plugin(ctx), self._func)()
+            except BaseException:
+                outcome.exc_info = sys.exc_info()
+            finally:
+                if ctx is not None:
+                    outcome.events = ctx.flush_events()
+                    if outcome.exc_info is not None:
+                        # the session state is unknown after failure
+                        self._close(ctx)
+                        ctx = None
+                self._done(index, outcome.exc_info is not None)
+
+        if ctx is not None:
+            self._close(ctx)
+
+    @staticmethod
+    def _close(ctx):
+        try:
+            ctx.disconnect()
+        except Exception:
+            pass
+
+    def run(self):
+        """Dispatch the plugins and return the list of results in dispatch order."""
+        threads = [threading.Thread(target=self._worker, args=(session_id,), name="csmpe-session-{}".format(session_id))
+                   for session_id in range(1, self._sessions + 1)]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        results = []
+        failure = None
+        for ext, outcome in zip(self._extensions, self._outcomes):
+            self._ctx.merge(outcome.events)
+            if outcome.exc_info is not None:
+                failure = outcome.exc_info
+                break
+            results.append(outcome.result)
+
+        self._ctx.current_plugin = None
+        if failure is not None:
+            # the same as PluginContext.error for the sequentially dispatched plugins
+            self._close(self._ctx)
+            six.reraise(*failure)
+        return results
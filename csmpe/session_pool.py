@@ -0,0 +1,110 @@
+# =============================================================================
+# SessionPool
+#
+# Copyright (c)  2016, Cisco Systems
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+# =============================================================================
+
+import threading
+
+from condoor_adapter import redirect_logs
+
+
+def session_key(urls):
+    """Return the pool key of the host url chain.
+
+    :param urls: the list of urls or list of url lists as passed to :class:`condoor.Connection`
+    """
+    return tuple(tuple(url) if isinstance(url, (list, tuple)) else (url,) for url in urls)
+
+
+class SessionPool(object):
+    """Keep the connected and discovered device sessions alive between the plugin dispatches.
+
+    The session is taken from the pool with :meth:`acquire` so it is never shared by two plugin contexts
+    and returned with :meth:`release`. The session found disconnected or not responding is dropped and
+    the new one is created, connected and discovered by the plugin context.
+    """
+    #: The timeout of the prompt check done before the pooled session is reused.
+    PROBE_TIMEOUT = 30
+
+    def __init__(self):
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def acquire(self, urls, log_dir=None):
+        """Return the pooled connection to the url chain or None if not available.
+
+        :param urls: the host url chain
+        :param log_dir: the directory where the session and condoor logs will be written from now on
+        """
+        with self._lock:
+            connection = self._sessions.pop(session_key(urls), None)
+        if connection is None:
+            return None
+
+        try:
+            if not connection.is_connected:
+                raise ValueError("Session disconnected")
+            if log_dir is not None and not redirect_logs(connection, log_dir):
+                raise ValueError("Session logs can not be redirected")
+            # the device may reload or drop the session while pooled
+            connection.send("", timeout=self.PROBE_TIMEOUT)
+        except Exception:
+            self._close(connection)
+            return None
+        return connection
+
+    def release(self, urls, connection):
+        """Return the connection to the pool. The connection already pooled for the url chain is closed."""
+        with self._lock:
+            previous = self._sessions.get(session_key(urls))
+            self._sessions[session_key(urls)] = connection
+        if previous is not None and previous is not connection:
+            self._close(previous)
+
+    def invalidate(self, urls=None):
+        """Close and forget the pooled session to the url chain or all sessions if urls is None."""
+        with self._lock:
+            if urls is None:
+                connections = self._sessions.values()
+                self._sessions = {}
+            else:
+                connections = [self._sessions.pop(session_key(urls), None)]
+        for connection in connections:
+            if connection is not None:
+                self._close(connection)
+
+    def close(self):
+        """Disconnect all pooled sessions."""
+        self.invalidate()
+
+    @staticmethod
+    def _close(connection):
+        try:
+            connection.disconnect()
+        except Exception:
+            pass
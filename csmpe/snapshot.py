@@ -0,0 +1,234 @@
+# =============================================================================
+# Plugin data snapshots
+#
+# Copyright (c)  2016, Cisco Systems
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+# =============================================================================
+
+"""Compare the structured plugin data collected in the Pre-Upgrade and Post-Upgrade phases.
+
+The plugin records its data as the named section with :meth:`Snapshot.record`. In the Pre-Upgrade phase
+the section is saved in the CSM storage together with its digest. In the Post-Upgrade phase the digest
+of the current data is compared with the digest saved, so the unchanged section is reported without
+loading and decoding the Pre-Upgrade data. Only the changed sections are loaded and walked. The walk
+descends only into the subtrees which are not equal, so the equal parts are skipped by the comparison
+made in C.
+
+The section data must be JSON serializable. The dictionaries are compared by the keys, the lists of
+the same length by the position and the lists of different length as the multisets of the items.
+"""
+
+import hashlib
+import json
+from datetime import datetime
+from time import time
+
+#: The age in seconds of the Pre-Upgrade data reported as stale.
+MAX_AGE = 2 * 60 * 60
+
+#: The maximum number of changes logged per section.
+MAX_CHANGES = 20
+
+_MISSING = object()
+
+
+def _canonical(data):
+    return json.dumps(data, sort_keys=True, separators=(',', ':'))
+
+
+def digest(data):
+    """Return the digest of the JSON serializable data.
+
+    The keys are not sorted, which would disable the C encoder. The dictionaries built the same way
+    iterate in the same order, and the different order only costs the comparison of the equal data.
+    """
+    return hashlib.sha1(json.dumps(data, separators=(',', ':'))).hexdigest()[:16]
+
+
+class Change(object):
+    """The value added, removed or changed at the path of the section data."""
+    __slots__ = ('path', 'before', 'after')
+
+    def __init__(self, path, before=_MISSING, after=_MISSING):
+        self.path = path
+        self.before = before
+        self.after = after
+
+    @property
+    def added(self):
+        return self.before is _MISSING
+
+    @property
+    def removed(self):
+        return self.after is _MISSING
+
+    def __eq__(self, other):
+        return isinstance(other, Change) and \
+            (self.path, self.before, self.after) == (other.path, other.before, other.after)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __str__(self):
+        path = "".join("[{}]".format(key) if isinstance(key, (int, long)) else "/{}".format(key)
+                       for key in self.path).lstrip("/")
+        if self.added:
+            return "{}: added {}".format(path, _canonical(self.after))
+        if self.removed:
+            return "{}: removed {}".format(path, _canonical(self.before))
+        return "{}: {} -> {}".format(path, _canonical(self.before), _canonical(self.after))
+
+    def __repr__(self):
+        return "Change({})".format(self)
+
+
+def diff(before, after, path=()):
+    """Return the list of changes between the before and after data."""
+    changes = []
+    _diff(before, after, path, changes)
+    return changes
+
+
+def _diff(before, after, path, changes):
+    if before == after:
+        return
+    if isinstance(before, dict) and isinstance(after, dict):
+        for key in sorted(set(before) | set(after)):
+            if key not in after:
+                changes.append(Change(path + (key,), before=before[key]))
+            elif key not in before:
+                changes.append(Change(path + (key,), after=after[key]))
+            else:
+                _diff(before[key], after[key], path + (key,), changes)
+    elif isinstance(before, (list, tuple)) and isinstance(after, (list, tuple)):
+        if len(before) == len(after):
+            for index, (previous, current) in enumerate(zip(before, after)):
+                _diff(previous, current, path + (index,), changes)
+            return
+        # the items matched by their canonical form, so the unhashable items are compared too
+        remaining = {}
+        for item in after:
+            remaining.setdefault(_canonical(item), []).append(item)
+        for item in before:
+            matching = remaining.get(_canonical(item))
+            if matching:
+                matching.pop()
+            else:
+                changes.append(Change(path, before=item))
+        for item in after:
+            matching = remaining.get(_canonical(item))
+            if matching:
+                changes.append(Change(path, after=matching.pop()))
+    else:
+        changes.append(Change(path, before, after))
+
+
+class ChangeReport(object):
+    """The changes of the section data since the Pre-Upgrade phase.
+
+    :param section: the section name
+    :param changes: the list of :class:`Change`
+    :param timestamp: the time the Pre-Upgrade data was saved
+    """
+    def __init__(self, section, changes, timestamp=None):
+        self.section = section
+        self.changes = changes
+        self.timestamp = timestamp
+
+    def __nonzero__(self):
+        return bool(self.changes)
+
+    def __len__(self):
+        return len(self.changes)
+
+    def __iter__(self):
+        return iter(self.changes)
+
+    def summary(self, limit=MAX_CHANGES):
+        """Return the lines describing at most limit changes."""
+        lines = ["{}/{}".format(self.section, change) for change in self.changes[:limit]]
+        if len(self.changes) > limit:
+            lines.append("... and {} more changes of '{}'".format(len(self.changes) - limit, self.section))
+        return lines
+
+
+class Snapshot(object):
+    """Save the plugin data in the Pre-Upgrade phase and report its changes in the Post-Upgrade phase.
+
+    :param ctx: the plugin context
+    :param max_age: the age in seconds of the Pre-Upgrade data reported as stale
+    """
+    def __init__(self, ctx, max_age=MAX_AGE):
+        self.ctx = ctx
+        self.max_age = max_age
+
+    @staticmethod
+    def digest_key(section):
+        return "{}.digest".format(section)
+
+    def record(self, section, data):
+        """Save the section in the Pre-Upgrade phase or compare it in the Post-Upgrade phase.
+
+        :return: the :class:`ChangeReport` in the Post-Upgrade phase if the Pre-Upgrade data is available
+        """
+        phase = self.ctx.phase
+        if phase == "Pre-Upgrade":
+            self.save(section, data)
+        elif phase == "Post-Upgrade":
+            report = self.compare(section, data)
+            if report is not None:
+                self.log(report)
+            return report
+
+    def save(self, section, data):
+        """Save the section data and its digest."""
+        self.ctx.save_data(section, data)
+        self.ctx.save_data(self.digest_key(section), digest(data))
+
+    def compare(self, section, data):
+        """Return the :class:`ChangeReport` of the data since the Pre-Upgrade phase or None if not available."""
+        previous_digest, timestamp = self.ctx.load_data(self.digest_key(section))
+        if previous_digest is not None and previous_digest == digest(data):
+            return ChangeReport(section, [], timestamp)
+
+        # the digest is not available for the data saved before the snapshots were introduced
+        previous_data, timestamp = self.ctx.load_data(section)
+        if previous_data is None:
+            self.ctx.warning("No '{}' data stored from Pre-Upgrade phase. Can't compare.".format(section))
+            return None
+        return ChangeReport(section, diff(previous_data, data), timestamp)
+
+    def log(self, report):
+        if report.timestamp is not None:
+            self.ctx.info("Pre-Upgrade '{}' data collected on {}".format(
+                report.section, datetime.fromtimestamp(int(report.timestamp)).strftime('%Y-%m-%d %H:%M:%S')))
+            if report.timestamp < time() - self.max_age:
+                self.ctx.warning("Pre-Upgrade phase '{}' data older than {} hours".format(
+                    report.section, self.max_age // 3600))
+        if not report:
+            self.ctx.info("The '{}' data is the same as during the Pre-Upgrade phase".format(report.section))
+            return
+        self.ctx.warning("The '{}' data changed since the Pre-Upgrade phase: {} change(s)".format(
+            report.section, len(report)))
+        for line in report.summary():
+            self.ctx.warning(line)
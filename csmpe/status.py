@@ -0,0 +1,247 @@
+# =============================================================================
+# Status event bus
+#
+# Copyright (c)  2016, Cisco Systems
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+# =============================================================================
+
+"""The status event bus.
+
+The status messages posted by the plugins are delivered to the optional local sinks (console,
+JSONL file, HTTP endpoint) by the single background thread, so the slow consumer never blocks
+the device communication. The CSM context receives the status messages from the plugin thread
+directly, see :meth:`csmpe.context.PluginContext.post_status`. The polling loops post the progress messages on every iteration.
+The progress messages of the host are rate limited: only the latest message is delivered if the
+previous one was delivered less than ``interval`` seconds ago. The message repeating the previous
+one is dropped.
+"""
+
+import json
+import logging
+import re
+import sys
+import threading
+import time
+
+from six.moves import queue
+from six.moves.urllib.request import Request, urlopen
+
+PHASE_START = "phase_start"
+PHASE_END = "phase_end"
+PROGRESS = "progress"
+WARNING = "warning"
+MESSAGE = "message"
+
+#: The default minimum number of seconds between the progress messages of the host.
+DEFAULT_INTERVAL = 1.0
+
+_PERCENT_RE = re.compile(r"(\d{1,3})% complete")
+_PROPELLER = ("|", "/", "-", "\\")
+
+_logger = logging.getLogger(__name__)
+
+
+class StatusEvent(object):
+    """The status event.
+
+    :param kind: the event type i.e. :data:`PROGRESS`
+    :param host: the hostname
+    :param message: the status message
+    :param percent: the progress percentage or None
+    """
+    __slots__ = ('kind', 'host', 'message', 'percent', 'timestamp')
+
+    def __init__(self, kind, host, message, percent=None):
+        self.kind = kind
+        self.host = host
+        self.message = message
+        self.percent = percent
+        self.timestamp = time.time()
+
+    def to_dict(self):
+        return {'type': self.kind, 'host': self.host, 'message': self.message, 'percent': self.percent,
+                'timestamp': round(self.timestamp, 3)}
+
+    def __repr__(self):
+        return "StatusEvent({!r}, {!r}, {!r})".format(self.kind, self.host, self.message)
+
+
+def classify(message):
+    """Return the (kind, percent) tuple of the plain status message."""
+    match = _PERCENT_RE.search(message)
+    if match:
+        return PROGRESS, int(match.group(1))
+    if message[:1] in _PROPELLER and message[1:2] == " ":
+        return PROGRESS, None
+    return MESSAGE, None
+
+
+class ConsoleSink(object):
+    """Print the status events."""
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def __call__(self, event):
+        self.stream.write("[{}] {}: {}\n".format(event.kind, event.host, event.message))
+        self.stream.flush()
+
+
+class JSONLSink(object):
+    """Append the status events to the JSON lines file."""
+    def __init__(self, filename):
+        self.filename = filename
+
+    def __call__(self, event):
+        with open(self.filename, "a") as f:
+            f.write(json.dumps(event.to_dict()) + "\n")
+
+
+class HTTPSink(object):
+    """POST the status event as JSON to the URL."""
+    def __init__(self, url, timeout=5):
+        self.url = url
+        self.timeout = timeout
+
+    def __call__(self, event):
+        request = Request(self.url, json.dumps(event.to_dict()).encode("utf-8"),
+                          {'Content-Type': 'application/json'})
+        urlopen(request, timeout=self.timeout).close()
+
+
+class _Flush(object):
+    """The queue item marking the point all events before are delivered."""
+    def __init__(self):
+        self.done = threading.Event()
+
+
+class StatusBus(object):
+    """Deliver the status events to the sinks on the background thread.
+
+    :param sinks: the list of callables receiving the :class:`StatusEvent`
+    :param interval: the minimum number of seconds between the progress events of the host
+    """
+    def __init__(self, sinks=(), interval=DEFAULT_INTERVAL):
+        self.sinks = list(sinks)
+        self.interval = interval
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        # the bus thread state
+        self._pending = {}  # host -> the latest progress event not delivered yet
+        self._delivered = {}  # host -> (message, time) of the last delivered progress event
+        self._last = {}  # host -> the last delivered message
+
+    def add_sink(self, sink):
+        self.sinks.append(sink)
+
+    def post(self, event):
+        """Queue the event. Never blocks."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="csmpe-status")
+                self._thread.daemon = True
+                self._thread.start()
+        self._queue.put(event)
+
+    def flush(self):
+        """Deliver all queued and rate limited events."""
+        if self._thread is None:
+            return
+        flush = _Flush()
+        self._queue.put(flush)
+        while self._thread.is_alive() and not flush.done.wait(1):
+            pass
+
+    def close(self):
+        self.flush()
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def _deliver(self, event):
+        if self._last.get(event.host) == (event.kind, event.message):
+            return
+        self._last[event.host] = (event.kind, event.message)
+        if event.kind == PROGRESS:
+            self._delivered[event.host] = time.time()
+        for sink in self.sinks:
+            try:
+                sink(event)
+            except Exception:
+                _logger.debug("Status sink %r failed", sink, exc_info=True)
+
+    def _handle(self, event):
+        pending = self._pending.pop(event.host, None)
+        if event.kind != PROGRESS:
+            # the progress precedes the event posted after it
+            if pending is not None:
+                self._deliver(pending)
+            self._deliver(event)
+        elif time.time() - self._delivered.get(event.host, 0) >= self.interval:
+            self._deliver(event)
+        else:
+            # superseded by the next progress event of the host unless the interval passes
+            self._pending[event.host] = event
+
+    def _deliver_due(self, force=False):
+        now = time.time()
+        for host, event in list(self._pending.items()):
+            if force or now - self._delivered.get(host, 0) >= self.interval:
+                del self._pending[host]
+                self._deliver(event)
+
+    def _timeout(self):
+        if not self._pending:
+            return None
+        now = time.time()
+        return max(0, min(self._delivered.get(host, 0) + self.interval - now for host in self._pending))
+
+    def _run(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=self._timeout())
+            except queue.Empty:
+                self._deliver_due()
+                continue
+            if item is None:
+                self._deliver_due(force=True)
+                return
+            if isinstance(item, _Flush):
+                self._deliver_due(force=True)
+                item.done.set()
+                continue
+            self._handle(item)
+            self._deliver_due()
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_bus():
+    """Return the status bus shared by all plugin contexts of the process."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = StatusBus()
+        return _default
@@ -0,0 +1,183 @@
+# =============================================================================
+# Storage
+#
+# Copyright (c)  2016, Cisco Systems
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+# =============================================================================
+
+"""The storage of the plugin data saved with :meth:`csmpe.context.PluginContext.save_data`.
+
+The CSM server keeps the plugin data in its database. The local runners use the storage backend
+from this module. The data is namespaced by the host and job, so the concurrent runs for different
+hosts do not collide. The value is loaded from the most recent job of the host, so the data saved
+in the Pre-Upgrade phase is available in the Post-Upgrade phase run later.
+
+The :class:`SQLiteStorage` keeps the data across processes. The values must be JSON serializable.
+"""
+
+import atexit
+import itertools
+import json
+import os
+import sqlite3
+import threading
+import time
+
+#: The environment variable with the SQLite database file used by default.
+STORAGE_ENV = "CSMPE_STORAGE"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS data (
+    host TEXT NOT NULL,
+    job TEXT NOT NULL,
+    key TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    value TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS data_host_key ON data (host, key, timestamp);
+"""
+
+
+class Storage(object):
+    """The storage backend interface."""
+
+    def save(self, host, job, key, value):
+        """Save the value under the key for the host and job."""
+        raise NotImplementedError
+
+    def load(self, host, key, job=None):
+        """Return the most recently saved value of the key for the host or None.
+
+        If job is None the value saved by any job is returned.
+        """
+        raise NotImplementedError
+
+    def flush(self):
+        """Write the pending values."""
+
+    def close(self):
+        self.flush()
+
+
+class MemoryStorage(Storage):
+    """The process local storage."""
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+        self._sequence = itertools.count()
+
+    def save(self, host, job, key, value):
+        with self._lock:
+            self._data.setdefault((host, key), {})[job] = (next(self._sequence), value)
+
+    def load(self, host, key, job=None):
+        with self._lock:
+            jobs = self._data.get((host, key), {})
+            if job is not None:
+                return jobs.get(job, (None, None))[1]
+            if not jobs:
+                return None
+            return max(jobs.values(), key=lambda item: item[0])[1]
+
+
+class SQLiteStorage(Storage):
+    """The SQLite database storage safe for the concurrent writers.
+
+    The values are written in the batched transactions when batch_size values are pending,
+    the value is loaded or the storage is flushed or closed. The database uses the WAL journal,
+    so the readers do not block the writers of the other processes.
+
+    :param filename: the database file name
+    :param batch_size: the maximum number of pending values
+    :param timeout: the number of seconds to wait for the database lock held by the other process
+    """
+    def __init__(self, filename, batch_size=100, timeout=60):
+        self.filename = filename
+        self.batch_size = batch_size
+        self._pending = []
+        self._lock = threading.RLock()
+        directory = os.path.dirname(os.path.abspath(filename))
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        self._db = sqlite3.connect(filename, timeout=timeout, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        atexit.register(self.close)
+
+    def save(self, host, job, key, value):
+        row = (host, "" if job is None else "{}".format(job), key, time.time(), json.dumps(value))
+        with self._lock:
+            self._pending.append(row)
+            if len(self._pending) >= self.batch_size:
+                self.flush()
+
+    def flush(self):
+        with self._lock:
+            if not self._pending or self._db is None:
+                return
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.executemany("INSERT INTO data (host, job, key, timestamp, value) VALUES (?, ?, ?, ?, ?)",
+                                     self._pending)
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+            del self._pending[:]
+
+    def load(self, host, key, job=None):
+        with self._lock:
+            self.flush()
+            if job is None:
+                cursor = self._db.execute(
+                    "SELECT value FROM data WHERE host = ? AND key = ? ORDER BY timestamp DESC, rowid DESC LIMIT 1",
+                    (host, key))
+            else:
+                cursor = self._db.execute(
+                    "SELECT value FROM data WHERE host = ? AND key = ? AND job = ? "
+                    "ORDER BY timestamp DESC, rowid DESC LIMIT 1", (host, key, "{}".format(job)))
+            row = cursor.fetchone()
+        return json.loads(row[0]) if row else None
+
+    def close(self):
+        with self._lock:
+            if self._db is None:
+                return
+            self.flush()
+            self._db.close()
+            self._db = None
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_storage():
+    """Return the process wide storage. The SQLite database is used if the CSMPE_STORAGE variable is set."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            filename = os.environ.get(STORAGE_ENV)
+            _default = SQLiteStorage(filename) if filename else MemoryStorage()
+        return _default
@@ -136,6 +136,7 @@ setup(
     ],
     zip_safe=False,
     install_requires=install_requires,
+    extras_require={'zstd': ['zstandard']},
     tests_require=['flake8'],
     package_data={'': ['LICENSE', ], },
 )
@@ -0,0 +1,129 @@
+# =============================================================================
+#
+# Copyright (c) 2016, Cisco Systems
+# All rights reserved.
+#
+# # Author: Klaudiusz Staniek
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+
+import threading
+from unittest import TestCase
+
+from csmpe.core_plugins.csm_install_operations.exr import package_lib as plib
+
+
+class TestSoftwarePackage(TestCase):
+    def test_init(self):
+        packages = {
+            "ncs6k-mgbl.pkg-5.2.4": ("ncs6k", "mgbl", "5.2.4", None, None),
+            "ncs6k-5.2.5.CSCuy47880.smu": ("ncs6k", "ncs6k", "5.2.5", "CSCuy47880", None),
+            "ncs6k-5.2.5.47I.CSCuy47880-0.0.4.i": ("ncs6k", "ncs6k", "5.2.5.47I", "CSCuy47880", "0.0.4"),
+            "ncs5500-mini-x.iso-6.0.1": ("ncs5500", "mini-x", "6.0.1", None, None),
+            "ncs5500-mpls-te-rsvp-2.0.0.0-r601.x86_64.rpm-6.0.1": ("ncs5500", "mpls-te-rsvp", "601", None, "2.0.0.0"),
+            "asr9k-mgbl-x64-3.0.0.0-r611": ("asr9k", "mgbl-x64", "611", None, "3.0.0.0"),
+            "ncs5k-goldenk9-x.iso-6.3.1.11I.0": ("ncs5k", "goldenk9-x", "6.3.1.11", None, None),
+        }
+        for package, fields in packages.items():
+            sp = plib.SoftwarePackage(package)
+            self.assertEqual((sp.platform, sp.package_type, sp.version, sp.smu, sp.subversion), fields, package)
+            self.assertTrue(sp.is_valid(), package)
+
+    def test_invalid(self):
+        for package in ["Active", "version=6.1.1", "ncs5500-xr-6.1.1", "ncs5500-mgbl"]:
+            self.assertFalse(plib.SoftwarePackage(package).is_valid(), package)
+
+    def test_external_internal_name(self):
+        external = plib.SoftwarePackage("ncs6k-mgbl.pkg-5.2.4")
+        internal = plib.SoftwarePackage("ncs6k-mgbl-5.2.4")
+        self.assertEqual(external, internal)
+        self.assertEqual(hash(external), hash(internal))
+
+    def test_first_equal_package_kept(self):
+        pkgs = plib.SoftwarePackage.from_package_list(["ncs6k-mgbl.pkg-5.2.4", "ncs6k-mgbl-5.2.4"])
+        self.assertEqual([pkg.package_name for pkg in pkgs], ["ncs6k-mgbl.pkg-5.2.4"])
+
+    def test_platform_order(self):
+        self.assertEqual(plib.SoftwarePackage("ncs5k-foo-asr9k-bar-6.1.1").platform, "asr9k")
+
+    def test_cache(self):
+        plib.cache.clear()
+        first = plib.SoftwarePackage("ncs5500-isis-2.0.0.0-r601")
+        second = plib.SoftwarePackage("ncs5500-isis-2.0.0.0-r601")
+        self.assertEqual(len(plib.cache), 1)
+        # the parsed fields are shared
+        self.assertIs(first.package_type, second.package_type)
+
+    def test_cache_size(self):
+        cache = plib._LRUCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        self.assertEqual((cache.get("a"), cache.get("b"), cache.get("c")), (1, None, 3))
+
+    def test_cache_threads(self):
+        names = ["ncs5500-mpls-{}.0.0.0-r611.x86_64.rpm-6.1.1".format(n) for n in range(50)]
+        errors = []
+
+        def parse():
+            try:
+                for _ in range(20):
+                    for name in names:
+                        plib.parse_package(name)
+            except Exception as e:
+                errors.append(e)
+
+        plib.cache.clear()
+        size, plib.cache.size = plib.cache.size, 16
+        try:
+            threads = [threading.Thread(target=parse) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            plib.cache.size = size
+            plib.cache.clear()
+        self.assertEqual(errors, [])
+
+    def test_import_from_cmd(self):
+        output = """
+Node 0/RP0/CPU0 [RP]
+    Boot Partition: xr_lv0
+    Active Packages: 4
+        ncs5500-xr-6.1.1 version=6.1.1 [Boot image]
+        ncs5500-mgbl-3.0.0.0-r611
+        ncs5500-mpls-2.0.0.0-r611
+        ncs5500-6.1.1.CSCvb12345-1.0.0
+
+Node 0/0/CPU0 [LC]
+    Boot Partition: xr_lv0
+    Active Packages: 4
+        ncs5500-xr-6.1.1 version=6.1.1 [Boot image]
+        ncs5500-mgbl-3.0.0.0-r611
+        ncs5500-mpls-2.0.0.0-r611
+        ncs5500-6.1.1.CSCvb12345-1.0.0
+"""
+        pkgs = plib.SoftwarePackage.from_show_cmd(output)
+        self.assertEqual(sorted(pkg.package_name for pkg in pkgs),
+                         ["ncs5500-6.1.1.CSCvb12345-1.0.0", "ncs5500-mgbl-3.0.0.0-r611", "ncs5500-mpls-2.0.0.0-r611"])
+        self.assertTrue(plib.SoftwarePackage("ncs5500-mgbl-3.0.0.0-r611.x86_64.rpm-6.1.1") in pkgs)
@@ -0,0 +1,85 @@
+# =============================================================================
+#
+# Copyright (c) 2016, Cisco Systems
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+# =============================================================================
+
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from csmpe.artifacts import ArtifactStore, GZIP, INDEX_FILE, BLOBS_DIR
+
+
+class TestArtifactStore(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.store = ArtifactStore(self.root, compression=GZIP)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def _blobs(self):
+        return [name for _, _, names in os.walk(os.path.join(self.root, BLOBS_DIR)) for name in names]
+
+    def test_put_and_read(self):
+        data = "hostname rtr1\n" * 1000
+        entry = self.store.put(data, "rtr1", "Pre-Upgrade", "show running-config", timestamp=1.0)
+        self.assertEqual(entry['name'], "show-running-config.txt")
+        self.assertEqual(entry['size'], len(data))
+        self.assertEqual(self.store.read(entry), data)
+        self.assertLess(os.path.getsize(os.path.join(self.root, entry['blob'])), len(data))
+        self.assertTrue(os.path.exists(os.path.join(self.root, INDEX_FILE)))
+
+    def test_dedup(self):
+        first = self.store.put("output", "rtr1", "Pre-Upgrade", "show version", timestamp=1.0)
+        second = self.store.put("output", "rtr2", "Post-Upgrade", "show version", timestamp=2.0)
+        self.assertEqual(first['blob'], second['blob'])
+        self.assertEqual(len(self._blobs()), 1)
+        self.assertEqual(len(self.store.entries()), 2)
+
+    def test_lookup(self):
+        self.store.put("old", "rtr1", "Pre-Upgrade", "show version", timestamp=1.0)
+        self.store.put("new", "rtr1", "Post-Upgrade", "show version", timestamp=2.0)
+        self.store.put("other", "rtr2", "Pre-Upgrade", "show version", timestamp=3.0)
+        self.assertEqual(len(self.store.entries(host="rtr1")), 2)
+        self.assertEqual(self.store.read(self.store.latest(host="rtr1", command="show version")), "new")
+        entry = self.store.latest(host="rtr1", phase="Pre-Upgrade", name="show-version.txt")
+        self.assertEqual(self.store.read(entry), "old")
+        self.assertIsNone(self.store.latest(host="rtr3"))
+
+    def test_put_chunks(self):
+        entry = self.store.put_chunks(iter(["first ", u"second"]), "rtr1", None, "show tech")
+        self.assertEqual(self.store.read(entry), "first second")
+
+    def test_truncated_index(self):
+        self.store.put("output", "rtr1", "Pre-Upgrade", "show version")
+        with open(os.path.join(self.root, INDEX_FILE), "a") as f:
+            f.write('{"host": "rtr')
+        self.assertEqual(len(self.store.entries()), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
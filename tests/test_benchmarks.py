@@ -0,0 +1,92 @@
+# =============================================================================
+#
+# Copyright (c) 2016, Cisco Systems
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+# =============================================================================
+
+
+import re
+import unittest
+
+from condoor.exceptions import CommandTimeoutError
+
+from benchmarks import plugins
+from benchmarks.plugins import ScriptedDevice, compare, measure
+
+
+class TestScriptedDevice(unittest.TestCase):
+    def test_send(self):
+        device = ScriptedDevice({"show version": "Version 6.1.3\n", "show install request": ["50%\n", "done\n"]})
+        self.assertEqual(device.send("show version"), "Version 6.1.3\n")
+        self.assertEqual(device.send("show install request"), "50%\n")
+        self.assertEqual(device.send("show install request"), "done\n")
+        self.assertEqual(device.send("show install request"), "done\n")
+        self.assertIn("Invalid input", device.send("show bogus"))
+        self.assertEqual(device.unknown, ["show bogus"])
+        self.assertEqual(device.round_trips, 5)
+
+    def test_send_timeout(self):
+        device = ScriptedDevice({"copy": "Destination filename?"})
+        with self.assertRaises(CommandTimeoutError):
+            device.send("")
+        with self.assertRaises(CommandTimeoutError):
+            device.send("copy", wait_for_string=r"\[confirm\]")
+
+    def test_run_fsm(self):
+        device = ScriptedDevice({"install": "started\nReload, continue?\ncontinue in the background\nRP/0#"})
+        prompt, reload_prompt, background = re.compile("#"), re.compile("continue\\?"), re.compile("background")
+        seen = []
+
+        def answer(fsm_ctx):
+            seen.append(fsm_ctx.ctrl.before.strip())
+            fsm_ctx.ctrl.sendline("yes")
+            return True
+
+        transitions = [
+            (reload_prompt, [0], 1, answer, 10),
+            (background, [1], 2, None, 10),
+            (prompt, [2], -1, None, 10),
+        ]
+        self.assertTrue(device.run_fsm("INSTALL", "install", [prompt, reload_prompt, background], transitions, 10))
+        self.assertEqual(seen, ["started\nReload,"])
+        self.assertEqual(device.round_trips, 2)
+
+        transitions = [(prompt, [0], -1, lambda fsm_ctx: False, 10)]
+        self.assertFalse(device.run_fsm("INSTALL", "install", [prompt], transitions, 10))
+
+
+class TestPluginBenchmark(unittest.TestCase):
+    def test_scenarios(self):
+        results = measure(repeat=1)
+        self.assertEqual(set(results), set(scenario.name for scenario in plugins.SCENARIOS))
+        for name, result in results.items():
+            self.assertEqual(result['unknown'], [], name)
+            self.assertGreater(result['round_trips'], 0, name)
+            self.assertGreater(result['bytes'], 0, name)
+
+    def test_compare(self):
+        baseline = {'a': {'round_trips': 4, 'bytes': 100, 'wall_ms': 10.0, 'overhead_ms': 8.0}}
+        results = {'a': {'round_trips': 5, 'bytes': 100, 'wall_ms': 12.0, 'overhead_ms': 20.0},
+                   'b': {'round_trips': 1, 'bytes': 1, 'wall_ms': 1.0, 'overhead_ms': 1.0}}
+        self.assertEqual(sorted(compare(results, baseline)),
+                         [('a', 'overhead_ms', 8.0, 20.0), ('a', 'round_trips', 4, 5)])
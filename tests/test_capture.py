@@ -0,0 +1,140 @@
+# =============================================================================
+#
+# Copyright (c) 2016, Cisco Systems
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+# =============================================================================
+
+
+import os
+import re
+import shutil
+import tempfile
+import unittest
+
+import pexpect
+from condoor.exceptions import CommandSyntaxError, CommandTimeoutError
+
+from csmpe import capture
+from csmpe.capture import OutputStream, PatternMatcher
+from csmpe.command_cache import CommandCache
+from csmpe.context import PluginContext
+
+PROMPT = re.compile(r"RP/0/RSP0/CPU0:rtr1#")
+
+
+class FakeController(object):
+    def __init__(self, reads):
+        self.reads = list(reads)
+
+    def read_nonblocking(self, size, timeout):
+        if not self.reads:
+            raise pexpect.TIMEOUT("timeout")
+        data = self.reads.pop(0)
+        if data is None:
+            raise pexpect.EOF("eof")
+        return data
+
+
+class TestOutputStream(unittest.TestCase):
+    def setUp(self):
+        self.window = capture.PROMPT_WINDOW
+        capture.PROMPT_WINDOW = 10
+
+    def tearDown(self):
+        capture.PROMPT_WINDOW = self.window
+
+    def _stream(self, reads, timeout=10):
+        return OutputStream(FakeController(reads), PROMPT, r"% Invalid input", timeout=timeout)
+
+    def test_chunks(self):
+        reads = ["\r\nline 1\r\nline 2\r\n", "line 3\r\nline 4\r\nline 5 is long enough\r\n", "end\r\nRP/0/RSP0/",
+                 "CPU0:rtr1#"]
+        chunks = list(self._stream(reads))
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(chunk.endswith("\n") for chunk in chunks))
+        self.assertEqual("".join(chunks), "\nline 1\nline 2\nline 3\nline 4\nline 5 is long enough\nend\n")
+
+    def test_syntax_error(self):
+        with self.assertRaises(CommandSyntaxError):
+            list(self._stream(["\r\n% Invalid input detected at '^' marker.\r\nRP/0/RSP0/CPU0:rtr1#"]))
+
+    def test_timeout(self):
+        with self.assertRaises(CommandTimeoutError):
+            list(self._stream(["partial output\r\n"]))
+
+    def test_disconnect(self):
+        with self.assertRaises(Exception):
+            list(self._stream(["partial output\r\n", None]))
+
+
+class TestPatternMatcher(unittest.TestCase):
+    def _match(self, pattern, chunks):
+        matcher = PatternMatcher(pattern)
+        for chunk in chunks:
+            matcher.feed(chunk)
+        return matcher.result()[0]
+
+    def test_pass(self):
+        self.assertTrue(self._match({'pass': ["Active"]}, ["node 0/0 ", "Active\n", "node 0/1 Standby\n"]))
+        self.assertFalse(self._match({'pass': ["Failed"]}, ["node 0/0 Active\n"]))
+
+    def test_fail(self):
+        self.assertFalse(self._match({'pass': ["Active"], 'fail': ["Down"]}, ["0/0 Active\n0/1 Down"]))
+        self.assertTrue(self._match({'fail': ["Down"]}, ["0/0 Active\n"]))
+
+    def test_unspecified(self):
+        self.assertTrue(self._match([], ["output\n"]))
+
+
+class FakeConnection(object):
+    def send(self, cmd, timeout=300):
+        return "output of {}\n".format(cmd)
+
+
+class FakeCSM(object):
+    hostname = "rtr1"
+    requested_action = "Pre-Upgrade"
+
+
+class TestCaptureToFile(unittest.TestCase):
+    def setUp(self):
+        self.ctx = PluginContext()
+        self.ctx._csm = FakeCSM()
+        self.ctx._csm.log_directory = tempfile.mkdtemp()
+        self.ctx._connection = FakeConnection()
+        self.ctx._commands = CommandCache()
+
+    def tearDown(self):
+        shutil.rmtree(self.ctx._csm.log_directory)
+
+    def test_capture_to_file(self):
+        matcher = PatternMatcher({'pass': ["output"]})
+        file_name = self.ctx.capture_to_file("show tech", matcher=matcher)
+        self.assertEqual(file_name, "show-tech.txt")
+        with open(os.path.join(self.ctx._csm.log_directory, file_name)) as f:
+            self.assertEqual(f.read(), "output of show tech\n")
+        self.assertTrue(matcher.result()[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+# =============================================================================
+#
+# Copyright (c) 2016, Cisco Systems
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+# =============================================================================
+
+
+import logging
+from unittest import TestCase
+
+from csmpe.command_cache import CommandCache, ADMIN_PLANE, XR_PLANE
+from csmpe.context import PluginContext
+from csmpe.metrics import Metrics
+
+
+class Connection(object):
+    def __init__(self):
+        self.sent = []
+
+    def send(self, cmd="", timeout=300, wait_for_string=None, password=False):
+        self.sent.append(cmd)
+        return "{} output {}".format(cmd, len(self.sent))
+
+
+def make_context():
+    ctx = PluginContext()
+    ctx._connection = Connection()
+    ctx._commands = CommandCache()
+    ctx._metrics = Metrics(enabled=False)
+    ctx._logger = logging.Logger("test")
+    return ctx
+
+
+class TestCommandCache(TestCase):
+    def test_cacheable(self):
+        cache = CommandCache()
+        self.assertTrue(cache.is_cacheable("show install  active"))
+        self.assertTrue(cache.is_cacheable("admin show install inactive summary"))
+        self.assertFalse(cache.is_cacheable("show install request"))
+        self.assertFalse(cache.is_cacheable("show platform"))
+
+    def test_observe(self):
+        cache = CommandCache()
+        cache.put(XR_PLANE, "show install active", "output")
+        self.assertEqual(cache.observe(XR_PLANE, "admin"), ADMIN_PLANE)
+        self.assertEqual(cache.observe(ADMIN_PLANE, "show platform"), ADMIN_PLANE)
+        self.assertEqual(cache.observe(ADMIN_PLANE, "exit"), XR_PLANE)
+        self.assertEqual(len(cache), 1)
+        cache.observe(XR_PLANE, "install activate id 5")
+        self.assertEqual(len(cache), 0)
+
+    def test_failed_output_not_cached(self):
+        cache = CommandCache()
+        cache.put(XR_PLANE, "show install active", "Node unresponsive\nPlease try command later")
+        self.assertIsNone(cache.get(XR_PLANE, "show install active"))
+
+    def test_context_send(self):
+        ctx = make_context()
+        first = ctx.send("show install active")
+        self.assertEqual(ctx.send("show install active"), first)
+
+        ctx.send("admin")
+        admin = ctx.send("show install active")
+        self.assertNotEqual(admin, first)
+        ctx.send("exit")
+        self.assertEqual(ctx.send("show install active"), first)
+        self.assertEqual(ctx.send("show install active", use_cache=False), "show install active output 5")
+
+        ctx.send("install commit")
+        ctx.send("show install active")
+        self.assertEqual(ctx._connection.sent.count("show install active"), 4)
@@ -0,0 +1,187 @@
+# =============================================================================
+#
+# Copyright (c) 2016, Cisco Systems
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+# =============================================================================
+
+
+import unittest
+
+from condoor import ConnectionError
+from condoor.exceptions import CommandTimeoutError
+
+from csmpe.core_plugins.csm_install_operations.engine import InstallEngine, InstallPolicy, InstallProfile
+from csmpe.core_plugins.csm_install_operations.exr.install import REMOVE_ALL_POLICY
+
+
+def parse(ctx, output):
+    inventory = {}
+    for line in output.splitlines():
+        node, state = line.split(None, 1)
+        inventory[node] = {'state': state}
+    return inventory
+
+
+PROFILE = InstallProfile(
+    "test",
+    parse_platform=parse,
+    valid_states=['IOS XR RUN', 'OK'],
+    node_filter='CPU',
+    required_state='IOS XR RUN',
+    no_install="No install operation in progress",
+    op_progress=r"The install operation {} is (\d+)% complete",
+    success="Install operation {} finished successfully",
+)
+
+POLICY = InstallPolicy(reconnect_attempts=2, ready_timeout=300)
+
+
+class FakeContext(object):
+    CommandTimeoutError = CommandTimeoutError
+
+    def __init__(self, outputs):
+        self.outputs = list(outputs)
+        self.now = 0
+        self.sent = []
+        self.status = []
+        self.warnings = []
+        self.reconnects = 0
+        self.files = {}
+
+    def clock(self):
+        return self.now
+
+    def send(self, cmd, wait_for_string=None, timeout=60):
+        if wait_for_string and not cmd:
+            self.now += timeout
+            raise CommandTimeoutError()
+        self.sent.append(cmd)
+        output = self.outputs.pop(0)
+        if isinstance(output, Exception):
+            raise output
+        return output
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+    def disconnect(self):
+        pass
+
+    def reconnect(self):
+        self.reconnects += 1
+
+    def info(self, message):
+        pass
+
+    def warning(self, message):
+        self.warnings.append(message)
+
+    def error(self, message):
+        raise RuntimeError(message)
+
+    def post_status(self, message):
+        self.status.append(message)
+
+    def save_to_file(self, name, data):
+        self.files[name] = data
+
+
+class TestInstallProfile(unittest.TestCase):
+    def test_validate_node_state(self):
+        self.assertTrue(PROFILE.validate_node_state({'0/0/CPU0': {'state': 'OK'}, '0/FT0': {'state': 'DOWN'}}))
+        self.assertFalse(PROFILE.validate_node_state({'0/0/CPU0': {'state': 'BOOTING'}}))
+
+    def test_required_state(self):
+        self.assertFalse(PROFILE.nodes_ready(None, "0/0/CPU0 OK"))
+        self.assertTrue(PROFILE.nodes_ready(None, "0/RP0/CPU0 IOS XR RUN\n0/0/CPU0 OK"))
+
+    def test_ready_check(self):
+        profile = InstallProfile("test", ready_check=lambda ctx, output: "asr" in output)
+        self.assertTrue(profile.nodes_ready(None, "System image file is bootflash:asr920.bin"))
+
+
+class TestInstallEngine(unittest.TestCase):
+    def test_log_install_errors(self):
+        ctx = FakeContext([])
+        InstallEngine(ctx, PROFILE).log_install_errors("Error:    first\nOK\nError:    second")
+        self.assertEqual(ctx.warnings, ["first", "second"])
+
+    def test_watch_until_no_install(self):
+        ctx = FakeContext(["The install operation 3 is 40% complete",
+                           "The install operation 3 is 80% complete",
+                           "No install operation in progress"])
+        output = InstallEngine(ctx, PROFILE, POLICY, clock=ctx.clock).watch_operation(3)
+        self.assertEqual(output, "No install operation in progress")
+        self.assertIn("80% complete", ctx.status[-1])
+        self.assertIn("ETA", ctx.status[-1])
+
+    def test_watch_reconnects(self):
+        ctx = FakeContext([ConnectionError("lost"), "No install operation in progress"])
+        InstallEngine(ctx, PROFILE, POLICY, clock=ctx.clock).watch_operation(3)
+        self.assertEqual(ctx.reconnects, 1)
+
+    def test_watch_reconnect_attempts(self):
+        ctx = FakeContext([ConnectionError("lost")] * 3)
+        engine = InstallEngine(ctx, PROFILE, POLICY, clock=ctx.clock)
+        self.assertRaises(ConnectionError, engine.watch_operation, 3)
+        self.assertEqual(ctx.reconnects, POLICY.reconnect_attempts)
+
+    def test_remove_all_tolerance(self):
+        ctx = FakeContext([ConnectionError("lost")] * 100 + ["No install operation in progress"])
+        InstallEngine(ctx, PROFILE, REMOVE_ALL_POLICY, clock=ctx.clock).watch_operation(3)
+        self.assertEqual(ctx.reconnects, 100)
+        self.assertGreaterEqual(ctx.now, 100 * 30)
+
+    def test_wait_for_nodes(self):
+        ctx = FakeContext(["0/RP0/CPU0 BOOTING", "0/RP0/CPU0 BOOTING", "0/RP0/CPU0 IOS XR RUN"])
+        self.assertTrue(InstallEngine(ctx, PROFILE, POLICY, clock=ctx.clock).wait_for_nodes(begin=0))
+        self.assertEqual(ctx.sent, ["show platform"] * 3)
+
+    def test_wait_for_nodes_quorum(self):
+        booting = "0/RP0/CPU0 IOS XR RUN\n0/1/CPU0 OK\n0/2/CPU0 OK\n0/3/CPU0 BOOTING"
+        profile = InstallProfile("test", parse_platform=parse, valid_states=['IOS XR RUN', 'OK'],
+                                 required_node=r"RS?P\d")
+        ctx = FakeContext([booting])
+        engine = InstallEngine(ctx, profile, InstallPolicy(node_quorum=0.5), clock=ctx.clock)
+        self.assertTrue(engine.wait_for_nodes())
+        self.assertEqual(engine.timeline.pending(), ["0/3/CPU0"])
+        self.assertIn("node timeline", ctx.files)
+
+        ctx = FakeContext(["0/RP0/CPU0 BOOTING\n0/1/CPU0 OK", "0/RP0/CPU0 IOS XR RUN\n0/1/CPU0 OK"])
+        engine = InstallEngine(ctx, profile, InstallPolicy(node_quorum=0.5), clock=ctx.clock)
+        self.assertTrue(engine.wait_for_nodes())
+        self.assertEqual(len(ctx.sent), 2)
+
+    def test_wait_for_nodes_timeout(self):
+        reports = []
+        profile = InstallProfile("test", parse_platform=parse, valid_states=['OK'],
+                                 report=lambda ctx, status, message: reports.append(status))
+        ctx = FakeContext(["0/RP0/CPU0 BOOTING"] * 100)
+        engine = InstallEngine(ctx, profile, POLICY, clock=ctx.clock)
+        self.assertRaises(RuntimeError, engine.wait_for_nodes)
+        self.assertEqual(reports, [False])
+        self.assertTrue(ctx.now >= POLICY.ready_timeout)
+
+
+if __name__ == '__main__':
+    unittest.main()
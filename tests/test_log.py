@@ -0,0 +1,90 @@
+# =============================================================================
+#
+# Copyright (c) 2016, Cisco Systems
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+# =============================================================================
+
+
+import logging
+import os
+import shutil
+import tempfile
+import unittest
+
+from csmpe import log
+
+
+class TestLog(unittest.TestCase):
+    def setUp(self):
+        self.log_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        log.shutdown()
+        shutil.rmtree(self.log_dir)
+
+    def _lines(self, log_dir=None):
+        log.flush()
+        with open(os.path.join(log_dir or self.log_dir, "plugins.log")) as f:
+            return f.read().splitlines()
+
+    def test_setup_is_idempotent(self):
+        for _ in range(3):
+            logger = log.get_logger("test.log", log_dir=self.log_dir, level=logging.DEBUG)
+        self.assertEqual(len(logger.handlers), 1)
+        logger.info("[%s] %s", "Plugin", "message")
+        lines = self._lines()
+        self.assertEqual(len(lines), 1)
+        self.assertTrue(lines[0].endswith("INFO: [Plugin] message"))
+
+    def test_switch_log_dir(self):
+        logger = log.get_logger("test.log", log_dir=self.log_dir, level=logging.DEBUG)
+        logger.info("first")
+        other_dir = os.path.join(self.log_dir, "other")
+        os.makedirs(other_dir)
+        logger = log.get_logger("test.log", log_dir=other_dir, level=logging.DEBUG)
+        logger.info("second")
+        self.assertEqual(len(logger.handlers), 1)
+        self.assertTrue(self._lines()[0].endswith("first"))
+        self.assertEqual(len(self._lines()), 1)
+        self.assertTrue(self._lines(other_dir)[0].endswith("second"))
+
+    def test_shared_writer(self):
+        first = log.get_logger("test.log", log_dir=self.log_dir, level=logging.DEBUG)
+        second = log.get_logger("test.second", log_dir=self.log_dir, level=logging.DEBUG)
+        first.info("first")
+        second.info("second")
+        self.assertEqual(len(self._lines()), 2)
+        self.assertIs(first.handlers[0].writer, second.handlers[0].writer)
+
+    def test_exception(self):
+        logger = log.get_logger("test.log", log_dir=self.log_dir, level=logging.DEBUG)
+        try:
+            raise ValueError("failed")
+        except ValueError:
+            logger.exception("error")
+        lines = self._lines()
+        self.assertIn("ValueError: failed", lines[-1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+# =============================================================================
+#
+# Copyright (c) 2016, Cisco Systems
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+# =============================================================================
+
+
+import shutil
+import tempfile
+import unittest
+
+from benchmarks.plugins import BenchmarkContext, ScriptedDevice, ScriptedPool
+from csmpe.context import PluginContext
+from csmpe.core_plugins.csm_error_core_check.ios_xr.plugin import Plugin
+from csmpe.log_scanner import LogScanner
+
+LOG = """Syslog logging: enabled (0 messages dropped, 0 flushes, 0 overruns, xml disabled, filtering disabled)
+RP/0/RSP0/CPU0:Dec 30 23:10:01.100 UTC: ifmgr[227]: %PKT_INFRA-LINK-3-UPDOWN : Interface Gi0/0/0/1, Down
+RP/0/RSP0/CPU0:Dec 30 23:10:02.200 UTC: bgp[1052]: %ROUTING-BGP-3-ERROR : BGP session error
+RP/0/RSP0/CPU0:Dec 31 23:59:59.000 UTC: dumper[65]: %OS-DUMPER-7-CORE_FILE : Core for pid = 1234 (pim)
+LC/0/1/CPU0:Jan  1 00:00:01.000 UTC: pfilter_ea[301]: %L2-PFILTER_EA-3-ERR_IM_CAPS : error uninitialized
+LC/0/1/CPU0:Jan  1 00:00:05.000 UTC: pfilter_ea[301]: %L2-PFILTER_EA-3-ERR_IM_CAPS : error uninitialized
+RP/0/RSP0/CPU0:Jan  1 00:00:06.000 UTC: python[77]: Traceback (most recent call last):
+  File "x.py", line 1, in <module>
+RP/0/RSP0/CPU0:Jan  1 00:00:07.000 UTC: cfgmgr-rp[165]: %MGBL-CONFIG-4-VERSION : Version of existing saved configuration
+"""
+
+
+def scan(scanner, text, size=97):
+    for start in range(0, len(text), size):
+        scanner.feed(text[start:start + size])
+    scanner.close()
+    return scanner
+
+
+class TestLogScanner(unittest.TestCase):
+    def test_findings(self):
+        scanner = scan(LogScanner(), LOG)
+        self.assertEqual([finding.name for finding in scanner.findings],
+                         ['error', 'core', 'error', 'traceback', 'config'])
+        self.assertEqual(scanner.lines, 9)
+
+    def test_deduplicated(self):
+        scanner = scan(LogScanner(), LOG)
+        finding = scanner.findings[2]
+        self.assertEqual(finding.count, 2)
+        self.assertEqual((finding.first, finding.last), ("Jan  1 00:00:01.000", "Jan  1 00:00:05.000"))
+        self.assertEqual(str(finding), "LC/0/1/CPU0:Jan  1 00:00:01.000 UTC: pfilter_ea[301]: "
+                                       "%L2-PFILTER_EA-3-ERR_IM_CAPS : error uninitialized "
+                                       "(logged 2 times, last at Jan  1 00:00:05.000)")
+
+    def test_cursor(self):
+        scanner = scan(LogScanner(), LOG)
+        self.assertEqual(scanner.cursor, "Jan  1 00:00:07.000")
+
+    def test_cursor_last_chunk_without_timestamp(self):
+        scanner = LogScanner()
+        scanner.feed(LOG)
+        scanner.feed("  File \"y.py\", line 2, in <module>\n")
+        scanner.close()
+        self.assertEqual(scanner.cursor, "Jan  1 00:00:07.000")
+
+    def test_error_any_case(self):
+        scanner = scan(LogScanner(), "RP/0/RSP0/CPU0:Jan  1 00:00:01.000 UTC: ospf[1]: ERRor in hello\n")
+        self.assertEqual([finding.name for finding in scanner.findings], ['error'])
+
+    def test_since_cursor(self):
+        # the entries of the new year are after the December cursor
+        scanner = scan(LogScanner(cursor="Dec 31 23:59:59.000"), LOG)
+        self.assertEqual([finding.name for finding in scanner.findings], ['error', 'traceback', 'config'])
+
+    def test_nothing_new(self):
+        scanner = scan(LogScanner(cursor="Jan  1 00:00:07.000"), LOG)
+        self.assertEqual(scanner.findings, [])
+        self.assertEqual(scanner.cursor, "Jan  1 00:00:07.000")
+
+    def test_patterns(self):
+        scanner = scan(LogScanner([('link', r"UPDOWN")]), LOG)
+        self.assertEqual([finding.name for finding in scanner.findings], ['link'])
+
+    def test_partial_line(self):
+        scanner = scan(LogScanner(), LOG.rstrip('\n'), size=len(LOG))
+        self.assertEqual(scanner.findings[-1].name, 'config')
+
+
+class TestErrorCoreCheck(unittest.TestCase):
+    def setUp(self):
+        self.log_dir = tempfile.mkdtemp()
+        self.csm = BenchmarkContext(self.log_dir, "Post-Upgrade", {})
+
+    def tearDown(self):
+        shutil.rmtree(self.log_dir)
+
+    def run_plugin(self, log):
+        ctx = PluginContext(self.csm, pool=ScriptedPool(ScriptedDevice({"show logging": log})))
+        warnings = []
+        ctx.warning = warnings.append
+        Plugin(ctx).run()
+        return warnings
+
+    def test_since_previous_run(self):
+        self.assertEqual(len(self.run_plugin(LOG)), 5)
+        self.assertEqual(self.csm.load_data(Plugin.cursor_key)[0], "Jan  1 00:00:07.000")
+        new = "RP/0/RSP0/CPU0:Jan  1 00:10:00.000 UTC: bgp[1052]: %ROUTING-BGP-3-ERROR : BGP session error\n"
+        self.assertEqual(self.run_plugin(LOG + new), [new.strip()])
+
+
+if __name__ == '__main__':
+    unittest.main()
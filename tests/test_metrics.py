@@ -0,0 +1,87 @@
+# =============================================================================
+#
+# Copyright (c) 2016, Cisco Systems
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+# =============================================================================
+
+
+import json
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from csmpe.metrics import Metrics, METRICS_JSON, METRICS_PROM
+
+
+class TestMetrics(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def record(self, metrics):
+        with metrics.plugin("Node Status Check Plugin", "Pre-Upgrade"):
+            with metrics.command("show platform", "Node Status Check Plugin") as event:
+                event['bytes'] = 100
+            try:
+                with metrics.command("show \"redundancy\"", "Node Status Check Plugin"):
+                    raise IOError("timeout")
+            except IOError:
+                pass
+            with metrics.sleep(0, "Node Status Check Plugin"):
+                pass
+
+    def test_summary(self):
+        metrics = Metrics("rtr1")
+        self.record(metrics)
+        summary = metrics.summary()
+        self.assertEqual(summary['plugins']['Node Status Check Plugin']['count'], 1)
+        self.assertEqual(summary['commands']['show platform']['bytes'], 100)
+        self.assertEqual(summary['commands']['show "redundancy"']['errors'], 1)
+        self.assertEqual(summary['totals']['commands'], 2)
+        self.assertEqual(metrics.events[0]['plugin'], "Node Status Check Plugin")
+
+    def test_write(self):
+        metrics = Metrics("rtr1")
+        self.record(metrics)
+        metrics.write(self.directory)
+        self.record(metrics)
+        metrics.write(self.directory)
+
+        with open(os.path.join(self.directory, METRICS_JSON)) as f:
+            data = json.load(f)
+        self.assertEqual(len(data['events']), 8)
+        self.assertEqual(data['summary']['plugins']['Node Status Check Plugin']['count'], 2)
+
+        with open(os.path.join(self.directory, METRICS_PROM)) as f:
+            prom = f.read()
+        self.assertIn('csmpe_commands_total{command="show platform",host="rtr1"} 2', prom)
+        self.assertIn('csmpe_command_errors_total{command="show \\"redundancy\\"",host="rtr1"} 2', prom)
+
+    def test_disabled(self):
+        metrics = Metrics("rtr1", enabled=False)
+        self.record(metrics)
+        self.assertEqual(metrics.events, [])
+        self.assertEqual(metrics.write(self.directory), [])
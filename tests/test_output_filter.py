@@ -0,0 +1,116 @@
+# =============================================================================
+#
+# Copyright (c) 2016, Cisco Systems
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+# =============================================================================
+
+
+import logging
+import unittest
+
+from benchmarks.plugins import ScriptedDevice
+from csmpe.command_cache import CommandCache
+from csmpe.context import PluginContext
+from csmpe.metrics import Metrics
+from csmpe.output_filter import OutputFilter
+
+FPD = """Location     Card type             HWver FPD device       ATR Status   Run    Programd
+------------------------------------------------------------------------------
+0/RP0        NCS-55A1-24H          0.3   Bootloader           CURRENT    1.11    1.11
+0/RP0        NCS-55A1-24H          0.3   CPU-IOFPGA           NEED UPGD  1.07    1.07
+0/PM0        NC55-1200W-ACFW       1.0   DCA-PrimMCU          CURRENT    1.03    1.03
+0/PM1        NC55-1200W-ACFW       1.0   DCA-PrimMCU          CURRENT    1.03    1.03
+"""
+
+
+def make_context(os_type):
+    device = ScriptedDevice({"show hw-module fpd": FPD, "show install active summary": "Active Packages: 1\n"},
+                            os_type=os_type)
+    ctx = PluginContext()
+    ctx._connection = device
+    ctx._commands = CommandCache()
+    ctx._metrics = Metrics()
+    ctx._logger = logging.Logger("test")
+    return ctx, device
+
+
+class TestOutputFilter(unittest.TestCase):
+    def test_push(self):
+        output_filter = OutputFilter(include="NEED", exclude="0/PM", begin="Location")
+        cmd, local = output_filter.push("show hw-module fpd", "XR")
+        self.assertEqual(cmd, "show hw-module fpd | begin Location | include NEED | exclude 0/PM")
+        self.assertFalse(local)
+
+    def test_single_pipe(self):
+        cmd, local = OutputFilter(include="NEED", exclude="0/PM").push("show hw-module fpd", "XE")
+        self.assertEqual(cmd, "show hw-module fpd | include NEED")
+        self.assertEqual((local.include, local.exclude), (None, "0/PM"))
+
+    def test_not_supported(self):
+        cmd, local = OutputFilter(include="NEED").push("show hw-module fpd", None)
+        self.assertEqual(cmd, "show hw-module fpd")
+        self.assertEqual(local.include, "NEED")
+
+    def test_not_portable(self):
+        # the line filters are applied after the begin filter
+        cmd, local = OutputFilter(include="NEED", begin="0/RP0 ").push("show hw-module fpd", "XR")
+        self.assertEqual(cmd, "show hw-module fpd")
+        self.assertEqual((local.begin, local.include), ("0/RP0 ", "NEED"))
+        cmd, local = OutputFilter(include="CURRENT|NEED", exclude="0/PM").push("show hw-module fpd", "XR")
+        self.assertEqual(cmd, "show hw-module fpd | exclude 0/PM")
+        self.assertEqual(local.include, "CURRENT|NEED")
+
+    def test_apply(self):
+        self.assertEqual(OutputFilter(begin="0/PM", include="CURRENT", exclude="PM1").apply(FPD),
+                         "0/PM0        NC55-1200W-ACFW       1.0   DCA-PrimMCU          CURRENT    1.03    1.03\n")
+        self.assertEqual(OutputFilter(begin="0/LC").apply(FPD), "")
+        self.assertEqual(OutputFilter().apply(FPD), FPD)
+
+
+class TestContextSend(unittest.TestCase):
+    def test_device_filter(self):
+        for os_type in ["eXR", "IOS-XRv", "XE"]:
+            ctx, device = make_context(os_type)
+            output = ctx.send("show hw-module fpd", include="NEED", exclude="0/PM")
+            self.assertEqual(output, FPD.splitlines(True)[3], os_type)
+            self.assertEqual(device.unknown, [])
+
+    def test_bytes(self):
+        ctx, device = make_context("eXR")
+        ctx.send("show hw-module fpd", include="NEED")
+        local_ctx, local_device = make_context(None)
+        local_ctx.send("show hw-module fpd", include="NEED")
+        self.assertEqual(device.bytes, len(FPD.splitlines(True)[3]))
+        self.assertEqual(local_device.bytes, len(FPD))
+        self.assertEqual(ctx.metrics.summary()['totals']['locally_filtered_bytes'], 0)
+        self.assertEqual(local_ctx.metrics.summary()['totals']['locally_filtered_bytes'], len(FPD) - device.bytes)
+
+    def test_cached(self):
+        ctx, device = make_context("eXR")
+        ctx.send("show install active summary")
+        self.assertEqual(ctx.send("show install active summary", include="fpd"), "")
+        self.assertEqual(device.round_trips, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
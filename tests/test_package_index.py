@@ -0,0 +1,87 @@
+# =============================================================================
+#
+# Copyright (c) 2016, Cisco Systems
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+# =============================================================================
+
+
+import unittest
+
+from csmpe.core_plugins.csm_install_operations.exr.package_lib import SoftwarePackage
+from csmpe.core_plugins.csm_install_operations.ios_xr.package_lib import SoftwarePackage as XRSoftwarePackage
+from csmpe.core_plugins.csm_install_operations.package_index import PackageIndex
+
+INACTIVE = """
+    ncs6k-k9sec-5.2.5.47I
+    ncs6k-mpls-5.2.5.47I
+    ncs6k-5.2.5.47I.CSCuy47880-0.0.4.i
+    ncs6k-mgbl-5.2.5.47I
+    ncs6k-5.2.5.CSCuz65240-1.0.0
+"""
+
+
+class TestPackageIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = PackageIndex(SoftwarePackage.from_show_cmd(INACTIVE))
+
+    def test_external_name(self):
+        requested = SoftwarePackage.from_package_list(["ncs6k-5.2.5.CSCuz65240.smu", "ncs6k-mgbl.pkg-5.2.5.47I"])
+        matched, unmatched = self.index.match(requested)
+        self.assertEqual(sorted(map(str, matched)), ["ncs6k-5.2.5.CSCuz65240-1.0.0", "ncs6k-mgbl-5.2.5.47I"])
+        self.assertEqual(unmatched, [])
+
+    def test_unmatched(self):
+        requested = [SoftwarePackage("ncs6k-mcast.pkg-5.2.5.47I"), SoftwarePackage("ncs6k-mpls.pkg-5.2.5.47I")]
+        matched, unmatched = self.index.match(requested)
+        self.assertEqual(map(str, matched), ["ncs6k-mpls-5.2.5.47I"])
+        self.assertEqual(map(str, unmatched), ["ncs6k-mcast.pkg-5.2.5.47I"])
+
+    def test_subversion(self):
+        self.assertIn(SoftwarePackage("ncs6k-5.2.5.47I.CSCuy47880-0.0.4.i"), self.index)
+        self.assertNotIn(SoftwarePackage("ncs6k-5.2.5.47I.CSCuy47880-0.0.5.i"), self.index)
+        # the package without the subversion matches any subversion
+        self.assertIn(SoftwarePackage("ncs6k-5.2.5.47I.CSCuy47880.smu"), self.index)
+
+    def test_difference(self):
+        requested = [SoftwarePackage("ncs6k-5.2.5.CSCuz65240.smu"), SoftwarePackage("ncs6k-5.2.5.CSCuz99999.smu")]
+        self.assertEqual(map(str, self.index.difference(requested)), ["ncs6k-5.2.5.CSCuz99999.smu"])
+
+    def test_matched_once(self):
+        requested = [SoftwarePackage("ncs6k-mgbl.pkg-5.2.5.47I"), SoftwarePackage("ncs6k-mgbl-5.2.5.47I")]
+        matched, _ = self.index.match(requested)
+        self.assertEqual(len(matched), 1)
+        self.assertEqual(len(self.index), 5)
+
+    def test_xr(self):
+        index = PackageIndex(XRSoftwarePackage.from_show_cmd("disk0:asr9k-mcast-px-5.3.3 "
+                                                             "disk0:asr9k-px-5.3.3.CSCuy81837-1.0.0"))
+        matched, unmatched = index.match([XRSoftwarePackage("asr9k-px-5.3.3.CSCuy81837.pie"),
+                                          XRSoftwarePackage("asr9k-mcast-px.pie-5.3.3"),
+                                          XRSoftwarePackage("asr9k-mgbl-px.pie-5.3.3")])
+        self.assertEqual(sorted(map(str, matched)), ["disk0:asr9k-mcast-px-5.3.3",
+                                                     "disk0:asr9k-px-5.3.3.CSCuy81837-1.0.0"])
+        self.assertEqual(map(str, unmatched), ["asr9k-mgbl-px.pie-5.3.3"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,181 @@
+# =============================================================================
+#
+# Copyright (c) 2016, Cisco Systems
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+# =============================================================================
+
+
+import unittest
+
+from csmpe.parsers import (Column, FixedWidthTable, Node, NodeInventory, parse_show_platform, CPU_NODE,
+                           EXR_PLATFORM, EXR_ADMIN_PLATFORM, XR_PLATFORM, XE_PLATFORM)
+from csmpe.core_plugins.csm_node_status_check.exr import plugin_lib as exr_lib
+
+EXR = """RP/0/RP0/CPU0:ios#show platform
+Tue Apr 11 23:55:51.866 UTC
+Node              Type                       State             Config state
+--------------------------------------------------------------------------------
+0/1/CPU0          NC55-24X100G-SE            IOS XR RUN        NSHUT
+0/1/NPU0          Slice                      UP
+0/RP0/CPU0        NC55-RP(Active)            IOS XR RUN        NSHUT
+0/RP1/CPU0        NC55-RP(Standby)           BOOTING           NSHUT
+0/FC5             NC55-5508-FC               OPERATIONAL       NSHUT
+"""
+
+EXR_ADMIN = """sysadmin-vm:0_RSP0# show platform
+Location  Card Type               HW State      SW State      Config State
+----------------------------------------------------------------------------
+0/0       A9K-8X100GE-TR          OPERATIONAL   OPERATIONAL   NSHUT
+0/RSP0    A9K-RSP880-SE           OPERATIONAL   OPERATIONAL   NSHUT
+0/FT0     ASR-9904-FAN            OPERATIONAL   N/A           NSHUT
+"""
+
+CRS = """Node          Type              PLIM               State           Config State
+------------- ----------------- ------------------ --------------- ---------------
+0/0/CPU0      MSC-X             40-10GbE           IOS XR RUN      PWR,NSHUT,MON
+0/1/SP        MSC-B(SP)         N/A                IOS XR RUN      PWR,NSHUT,MON
+0/3/CPU0      MSC-140G          N/A                UNPOWERED       NPWR,NSHUT,MON
+0/RP0/CPU0    RP(Active)        N/A                IOS XR RUN      PWR,NSHUT,MON
+"""
+
+ASR9K = """Node            Type                      State            Config State
+-----------------------------------------------------------------------------
+0/RSP0/CPU0     A9K-RSP440-SE(Active)     IOS XR RUN       PWR,NSHUT,MON
+0/FT0/SP        ASR-9006-FAN              READY
+0/1/CPU0        A9K-40GE-E                IOS XR RUN       PWR,NSHUT,MON
+0/12/CPU0       A9K-MOD400-SE-WITH-LONG-PIDIOS XR RUN       PWR,NSHUT,MON
+"""
+
+XE = """Chassis type: ASR-920-12CZ-A
+
+Slot      Type                State                 Insert time (ago)
+--------- ------------------- --------------------- -----------------
+ 0/0      12xGE-2x10GE-FIXED  ok                    03:07:10
+R0        ASR-920-12CZ-A      ok, active            03:09:23
+F0                            ok, active            03:09:23
+P1        ASR920-PSU1         ps, fail              never
+
+Slot      CPLD Version        Firmware Version
+--------- ------------------- ---------------------------------------
+R0        1601191C            15.4(3r)S4
+"""
+
+
+class TestFixedWidthTable(unittest.TestCase):
+    def test_header_offsets(self):
+        table = FixedWidthTable([Column('a', "Name"), Column('b', "Long Label"), Column('c', "Last")])
+        rows = table.parse("junk\n  Name   Long Label   Last\n  x1     two words    3\n\n  y2                  4\n")
+        self.assertEqual(rows, [('x1', 'two words', '3'), ('y2', '', '4')])
+
+    def test_no_header(self):
+        self.assertIsNone(EXR_PLATFORM.parse("% Invalid input detected at '^' marker.\n"))
+
+    def test_optional_column(self):
+        rows = XR_PLATFORM.parse(CRS)
+        self.assertEqual(rows[0], ('0/0/CPU0', 'MSC-X', '40-10GbE', 'IOS XR RUN', 'PWR,NSHUT,MON'))
+        rows = XR_PLATFORM.parse(ASR9K)
+        self.assertEqual(rows[1], ('0/FT0/SP', 'ASR-9006-FAN', '', 'READY', ''))
+
+    def test_overflow(self):
+        rows = XR_PLATFORM.parse(ASR9K)
+        # the value crossing the column boundary is split on the spaces
+        self.assertEqual(rows[3][0], '0/12/CPU0')
+        self.assertEqual(rows[3][3], 'PWR,NSHUT,MON')
+
+    def test_select_overflow(self):
+        output = "\n".join([
+            "Node              Type                       State             Config state",
+            "--------------------------------------------------------------------------------",
+            "0/0/CPU0          NC55-36X100G               IOS XR RUN        NSHUT",
+            "0/0/NPU0          Slice                      UP",
+            "0/RP0/RSP0/ABC/CPU0  NC55-RP(Active)         IOS XR RUN        NSHUT",
+        ])
+        rows = EXR_PLATFORM.parse(output, select=CPU_NODE)
+        # the node name crossing the column boundary is selected from the split row
+        self.assertEqual([row[0] for row in rows], ['0/0/CPU0', '0/RP0/RSP0/ABC/CPU0'])
+
+    def test_next_table(self):
+        rows = XE_PLATFORM.parse(XE)
+        self.assertEqual([row[0] for row in rows], ['0/0', 'R0', 'F0', 'P1'])
+
+
+class TestNodeInventory(unittest.TestCase):
+    def test_exr(self):
+        inventory = parse_show_platform(EXR, EXR_PLATFORM, node=CPU_NODE)
+        self.assertEqual(list(inventory), ['0/1/CPU0', '0/RP0/CPU0', '0/RP1/CPU0'])
+        node = inventory['0/RP1/CPU0']
+        self.assertEqual((node.type, node.state, node.config_state, node.slot),
+                         ('NC55-RP(Standby)', 'BOOTING', 'NSHUT', '0/RP1'))
+        self.assertEqual(node['state'], 'BOOTING')
+        self.assertEqual(node.get('plim', 'none'), 'none')
+        self.assertEqual(inventory.states()['0/1/CPU0'], 'IOS XR RUN')
+
+    def test_indexes(self):
+        inventory = parse_show_platform(EXR, EXR_PLATFORM)
+        self.assertEqual([node.name for node in inventory.by_slot('0/1')], ['0/1/CPU0', '0/1/NPU0'])
+        self.assertEqual([node.name for node in inventory.by_state('IOS XR RUN')], ['0/1/CPU0', '0/RP0/CPU0'])
+        self.assertEqual([node.name for node in inventory.by_type('NC55-5508-FC')], ['0/FC5'])
+        self.assertEqual(inventory.by_state('FAILED'), [])
+
+    def test_shared_strings(self):
+        first = parse_show_platform(EXR, EXR_PLATFORM)
+        second = parse_show_platform(EXR, EXR_PLATFORM)
+        self.assertIs(first['0/1/CPU0'].state, second['0/RP0/CPU0'].state)
+
+    def test_to_dict(self):
+        inventory = parse_show_platform(CRS, XR_PLATFORM, node=CPU_NODE)
+        self.assertEqual(inventory.to_dict()['0/3/CPU0'],
+                         {'type': 'MSC-140G', 'state': 'UNPOWERED', 'config_state': 'NPWR,NSHUT,MON'})
+        self.assertNotIn('0/1/SP', inventory)
+
+    def test_exr_admin(self):
+        inventory = parse_show_platform(EXR_ADMIN, EXR_ADMIN_PLATFORM)
+        self.assertEqual(inventory['0/RSP0'].type, 'A9K-RSP880-SE')
+        self.assertEqual(inventory['0/FT0'].state, 'N/A')
+
+    def test_xe(self):
+        inventory = parse_show_platform(XE, XE_PLATFORM)
+        self.assertEqual(inventory['R0'].state, 'ok, active')
+        self.assertEqual(inventory['F0'].type, '')
+        self.assertEqual(inventory['P1'].config_state, 'never')
+
+    def test_equality(self):
+        self.assertEqual(Node('0/0/CPU0', 'A', 'UP'), Node('0/0/CPU0', 'A', 'UP'))
+        self.assertNotEqual(Node('0/0/CPU0', 'A', 'UP'), Node('0/0/CPU0', 'A', 'DOWN'))
+        self.assertEqual(len(NodeInventory()), 0)
+
+
+class FakeContext(object):
+    def __init__(self):
+        self.warnings = []
+
+    def warning(self, message):
+        self.warnings.append(message)
+
+
+class TestPluginLib(unittest.TestCase):
+    def test_unrecognized_header(self):
+        ctx = FakeContext()
+        self.assertIsNone(exr_lib.parse_show_platform(ctx, "Node    Kind    Status\n0/0/CPU0  X  UP\n"))
+        self.assertEqual(len(ctx.warnings), 1)
+        self.assertEqual(len(exr_lib.parse_show_platform(ctx, "")), 0)
@@ -0,0 +1,109 @@
+# =============================================================================
+#
+# Copyright (c) 2016, Cisco Systems
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+# =============================================================================
+
+
+import unittest
+
+from condoor.exceptions import CommandTimeoutError
+
+from csmpe.core_plugins.csm_install_operations.engine import DEFAULT_POLICY
+from csmpe.core_plugins.csm_install_operations.exr import install
+from csmpe.core_plugins.csm_install_operations.progress import Backoff, ProgressEstimator, format_eta
+
+
+class TestBackoff(unittest.TestCase):
+    def test_intervals(self):
+        backoff = Backoff(5, 20, factor=2)
+        self.assertEqual([next(backoff) for _ in range(4)], [5, 10, 20, 20])
+        backoff.reset()
+        self.assertEqual(next(backoff), 5)
+
+    def test_jitter(self):
+        backoff = Backoff(10, 10, jitter=0.2)
+        for _ in range(20):
+            self.assertTrue(8 <= next(backoff) <= 12)
+
+
+class TestProgressEstimator(unittest.TestCase):
+    def test_eta(self):
+        estimator = ProgressEstimator()
+        self.assertIsNone(estimator.eta(0))
+        for second, percent in [(0, 0), (10, 10), (20, 20), (30, 30)]:
+            estimator.add(percent, second)
+        self.assertAlmostEqual(estimator.eta(30), 70)
+        self.assertAlmostEqual(estimator.eta(40), 60)
+
+    def test_no_progress(self):
+        estimator = ProgressEstimator()
+        estimator.add(10, 0)
+        estimator.add(10, 60)
+        self.assertIsNone(estimator.eta(60))
+
+    def test_format(self):
+        self.assertEqual(format_eta(3725), "1:02:05")
+
+
+class FakeContext(object):
+    CommandTimeoutError = CommandTimeoutError
+
+    def __init__(self, progress, banner_at):
+        self.progress = list(progress)
+        self.banner_at = banner_at
+        self.waits = []
+        self.polls = 0
+        self.status = []
+
+    def send(self, cmd, wait_for_string=None, timeout=60):
+        if wait_for_string:
+            self.waits.append(timeout)
+            if len(self.waits) >= self.banner_at:
+                return "Install operation 7 finished successfully"
+            raise CommandTimeoutError()
+        self.polls += 1
+        percent = self.progress.pop(0) if self.progress else 90
+        return "The install add operation 7 is {}% complete".format(percent)
+
+    def info(self, message):
+        pass
+
+    def post_status(self, message):
+        self.status.append(message)
+
+
+class TestWatchOperation(unittest.TestCase):
+    def test_backoff_until_banner(self):
+        ctx = FakeContext([10, 20, 30, 40, 50], banner_at=6)
+        install.watch_operation(ctx, "7")
+        self.assertEqual(len(ctx.waits), 6)
+        self.assertEqual(ctx.polls, 5)
+        self.assertEqual(ctx.waits[0], DEFAULT_POLICY.watch_min_interval)
+        self.assertTrue(all(DEFAULT_POLICY.watch_min_interval <= wait <= DEFAULT_POLICY.watch_max_interval
+                            for wait in ctx.waits))
+        self.assertIn("50% complete", ctx.status[-1])
+
+
+if __name__ == '__main__':
+    unittest.main()
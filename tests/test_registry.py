@@ -0,0 +1,130 @@
+# =============================================================================
+#
+# Copyright (c) 2016, Cisco Systems
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+# =============================================================================
+
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from csmpe.registry import PluginRegistry
+
+
+class XRPlugin(object):
+    """XR plugin"""
+    name = "XR Plugin"
+    phases = {'Pre-Upgrade', 'Post-Upgrade'}
+    platforms = {'ASR9K', 'CRS'}
+    os = {'XR'}
+
+
+class AnyPlugin(object):
+    """Any platform plugin"""
+    name = "Any Plugin"
+    phases = {'Pre-Upgrade'}
+    platforms = set()
+    os = set()
+
+
+class BrokenPlugin(object):
+    name = "Broken Plugin"
+
+
+class Distribution(object):
+    def __init__(self, version):
+        self.project_name = "csmpe"
+        self.version = version
+        self.location = "/nonexistent"
+
+
+class EntryPoint(object):
+    def __init__(self, name, plugin, dist):
+        self.name = name
+        self.module_name = "csmpe.plugins.{}".format(name)
+        self.plugin = plugin
+        self.dist = dist
+        self.loaded = 0
+
+    def load(self, require=True):
+        self.loaded += 1
+        return self.plugin
+
+
+class Registry(PluginRegistry):
+    def __init__(self, index_file, entry_points):
+        super(Registry, self).__init__(index_file=index_file, warning=self.warnings_append)
+        self.entry_points = entry_points
+        self.warnings = []
+
+    def warnings_append(self, message):
+        self.warnings.append(message)
+
+    def _entry_points(self):
+        return self.entry_points
+
+    @staticmethod
+    def _package_info(package_name):
+        return {'name': package_name, 'summary': "Summary", 'version': "1.0",
+                'author': "Author", 'author_email': "author@example.com"}
+
+
+class TestPluginRegistry(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.index_file = os.path.join(self.directory, "registry.json")
+        dist = Distribution("0.1.5")
+        self.entry_points = [
+            EntryPoint("xr", XRPlugin, dist),
+            EntryPoint("any", AnyPlugin, dist),
+            EntryPoint("broken", BrokenPlugin, dist),
+        ]
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_select(self):
+        registry = Registry(self.index_file, self.entry_points).load()
+        self.assertEqual(registry.select(), ["xr", "any"])
+        self.assertEqual(registry.select(phase="Pre-Upgrade", platform="ASR9K", os="XR"), ["xr", "any"])
+        self.assertEqual(registry.select(phase="Post-Upgrade"), ["xr"])
+        self.assertEqual(registry.select(platform="NCS6K"), ["any"])
+        self.assertEqual(registry.select(os="eXR"), ["any"])
+        self.assertEqual(registry.select(names={"XR Plugin"}), ["xr"])
+        self.assertEqual(registry.get_package_metadata("csmpe").version, "1.0")
+        self.assertEqual(len(registry.warnings), 1)
+
+    def test_index_reused(self):
+        Registry(self.index_file, self.entry_points).load()
+        registry = Registry(self.index_file, self.entry_points).load()
+        self.assertEqual(registry.select(phase="Post-Upgrade"), ["xr"])
+        self.assertEqual([ep.loaded for ep in self.entry_points], [1, 1, 1])
+
+    def test_index_invalidated(self):
+        Registry(self.index_file, self.entry_points).load()
+        dist = Distribution("0.1.6")
+        for ep in self.entry_points:
+            ep.dist = dist
+        Registry(self.index_file, self.entry_points).load()
+        self.assertEqual([ep.loaded for ep in self.entry_points], [2, 2, 2])
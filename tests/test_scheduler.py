@@ -0,0 +1,132 @@
+# =============================================================================
+#
+# Copyright (c) 2016, Cisco Systems
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+# =============================================================================
+
+
+import threading
+import time
+from unittest import TestCase
+
+from csmpe.metrics import Metrics
+from csmpe.scheduler import ConcurrentDispatcher, order_plugins
+
+
+class Context(object):
+    def __init__(self):
+        self.current_plugin = None
+        self.events = []
+        self.log = []
+        self.sessions = []
+        self.connected = True
+        self.metrics = Metrics(enabled=False)
+
+    def spawn(self, session_id, lock):
+        self.sessions.append(session_id)
+        return Context()
+
+    def info(self, message):
+        self.events.append(("log", message))
+
+    def post_status(self, message):
+        self.events.append(("status", message))
+
+    def flush_events(self):
+        events, self.events = self.events, []
+        return events
+
+    def merge(self, events):
+        self.log.extend(events)
+
+    def disconnect(self):
+        self.connected = False
+
+
+def make_plugin(name, delay=0.0, finished=None, fail=False, exception=ValueError):
+    class Plugin(object):
+        def __init__(self, ctx):
+            self.ctx = ctx
+
+        def run(self):
+            time.sleep(delay)
+            self.ctx.info("{} done".format(name))
+            if fail:
+                raise exception(name)
+            if finished is not None:
+                finished.append(name)
+            return name
+
+    Plugin.name = name
+    return Plugin
+
+
+class Extension(object):
+    def __init__(self, plugin):
+        self.name = plugin.name
+        self.plugin = plugin
+
+
+class TestScheduler(TestCase):
+    def test_order_plugins(self):
+        requires = {"A": {"C"}, "B": {"X"}, "D": {"E"}, "E": {"D"}}
+        self.assertEqual(order_plugins(["A", "B", "C"], requires), ["B", "C", "A"])
+        self.assertEqual(order_plugins(["D", "E"], requires), ["D", "E"])
+
+    def test_results_and_logs_in_order(self):
+        ctx = Context()
+        extensions = [Extension(make_plugin("A", 0.2)), Extension(make_plugin("B")), Extension(make_plugin("C"))]
+        results = ConcurrentDispatcher(ctx, extensions, "run", sessions=2).run()
+        self.assertEqual(results, ["A", "B", "C"])
+        self.assertEqual(sorted(ctx.sessions), [1, 2])
+        done = [message for kind, message in ctx.log if kind == "log" and message.endswith("done")]
+        self.assertEqual(done, ["A done", "B done", "C done"])
+
+    def test_requires(self):
+        finished = []
+        extensions = [Extension(make_plugin("A", 0.2, finished)), Extension(make_plugin("B", 0.0, finished))]
+        ConcurrentDispatcher(Context(), extensions, "run", requires={"B": {"A"}}, sessions=2).run()
+        self.assertEqual(finished, ["A", "B"])
+
+    def test_circular_requires(self):
+        finished = []
+        extensions = [Extension(make_plugin("D", 0.0, finished)), Extension(make_plugin("E", 0.0, finished))]
+        requires = {"D": {"E"}, "E": {"D"}}
+        results = ConcurrentDispatcher(Context(), extensions, "run", requires=requires, sessions=2).run()
+        self.assertEqual(results, ["D", "E"])
+        self.assertEqual(finished, ["D", "E"])
+
+    def test_base_exception_reraised(self):
+        extensions = [Extension(make_plugin("A", fail=True, exception=SystemExit)), Extension(make_plugin("B"))]
+        dispatcher = ConcurrentDispatcher(Context(), extensions, "run", sessions=1)
+        self.assertRaises(SystemExit, dispatcher.run)
+
+    def test_failure_reraised(self):
+        ctx = Context()
+        extensions = [Extension(make_plugin("A", fail=True)), Extension(make_plugin("B", 0.1))]
+        dispatcher = ConcurrentDispatcher(ctx, extensions, "run", sessions=1)
+        self.assertRaises(ValueError, dispatcher.run)
+        self.assertIn(("log", "A done"), ctx.log)
+        self.assertNotIn(("log", "B done"), ctx.log)
+        self.assertFalse(ctx.connected)
+        self.assertEqual(threading.active_count(), 1)
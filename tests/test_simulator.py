@@ -0,0 +1,155 @@
+# =============================================================================
+#
+# Copyright (c) 2016, Cisco Systems
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+# =============================================================================
+
+
+import socket
+import time
+import unittest
+
+from csmpe.simulator import Transcript, DeviceSimulator, INVALID_INPUT
+
+SESSION_LOG = """
+User Access Verification
+
+Username: cisco
+Password:
+
+RP/0/RSP0/CPU0:ios#terminal length 0
+RP/0/RSP0/CPU0:ios#show version
+Cisco IOS XR Software, Version 6.1.2
+RP/0/RSP0/CPU0:ios#show install request
+The install add operation 7 is 20% complete
+RP/0/RSP0/CPU0:ios#show install request
+The install add operation 7 is 80% complete
+RP/0/RSP0/CPU0:ios#May 24 22:25:43 Install operation 7 finished successfully
+RP/0/RSP0/CPU0:ios#admin
+sysadmin-vm:0_RSP0#show platform
+0/RSP0     A9K-RSP880-SE     OPERATIONAL
+sysadmin-vm:0_RSP0#exit
+RP/0/RSP0/CPU0:ios#reload
+Proceed with reload? [confirm]
+Rebooting...
+
+User Access Verification
+
+Username: cisco
+Password:
+
+RP/0/RSP0/CPU0:ios#show version
+Cisco IOS XR Software, Version 6.2.1
+"""
+
+
+class Client(object):
+    def __init__(self, address):
+        self.sock = socket.create_connection(address, 5)
+        self.buffer = b""
+
+    def expect(self, text):
+        while text.encode() not in self.buffer:
+            data = self.sock.recv(4096)
+            if not data:
+                raise EOFError(self.buffer)
+            self.buffer += data
+        before, _, self.buffer = self.buffer.partition(text.encode())
+        return before.decode("latin-1")
+
+    def send(self, line):
+        self.sock.sendall(line.encode() + b"\r\n")
+
+    def login(self):
+        self.expect("Username: ")
+        self.send("cisco")
+        self.expect("Password: ")
+        self.send("cisco")
+
+    def close(self):
+        self.sock.close()
+
+
+class TestTranscript(unittest.TestCase):
+    def test_parse(self):
+        transcript = Transcript.from_session_log(SESSION_LOG)
+        self.assertEqual(transcript.initial_prompt, "RP/0/RSP0/CPU0:ios#")
+        _, requests = transcript.lookup("RP/0/RSP0/CPU0:ios#", "show install request")
+        self.assertEqual([response.output for response in requests],
+                         ["The install add operation 7 is 20% complete", "The install add operation 7 is 80% complete"])
+        self.assertEqual(requests[1].banners, ["May 24 22:25:43 Install operation 7 finished successfully"])
+        self.assertEqual(transcript.lookup("RP/0/RSP0/CPU0:ios#", "admin")[1][0].prompt, "sysadmin-vm:0_RSP0#")
+        reload = transcript.lookup("RP/0/RSP0/CPU0:ios#", "reload")[1][0]
+        self.assertTrue(reload.reload)
+        self.assertEqual(reload.output, "Proceed with reload? [confirm]\nRebooting...\n")
+        self.assertIn("6.1.2", transcript.lookup("RP/0/RSP0/CPU0:ios#", "show version", boot=0)[1][0].output)
+        self.assertIn("6.2.1", transcript.lookup("RP/0/RSP0/CPU0:ios#", "show version", boot=1)[1][0].output)
+
+
+class TestDeviceSimulator(unittest.TestCase):
+    def setUp(self):
+        self.simulator = DeviceSimulator(Transcript.from_session_log(SESSION_LOG), reload_time=0.5).start()
+
+    def tearDown(self):
+        self.simulator.stop()
+
+    def test_replay(self):
+        client = Client(self.simulator.address)
+        client.login()
+        client.expect("RP/0/RSP0/CPU0:ios#")
+        client.send("show version")
+        self.assertIn("Version 6.1.2", client.expect("RP/0/RSP0/CPU0:ios#"))
+        client.send("show install request")
+        self.assertIn("20% complete", client.expect("RP/0/RSP0/CPU0:ios#"))
+        client.send("show install request")
+        self.assertIn("80% complete", client.expect("RP/0/RSP0/CPU0:ios#"))
+        self.assertIn("finished successfully", client.expect("RP/0/RSP0/CPU0:ios#"))
+        client.send("admin")
+        client.expect("sysadmin-vm:0_RSP0#")
+        client.send("show platform")
+        self.assertIn("OPERATIONAL", client.expect("sysadmin-vm:0_RSP0#"))
+        client.send("show foo")
+        self.assertIn(INVALID_INPUT, client.expect("sysadmin-vm:0_RSP0#"))
+        client.close()
+
+    def test_reload(self):
+        client = Client(self.simulator.address)
+        client.login()
+        client.expect("#")
+        client.send("reload")
+        client.expect("Rebooting...")
+        self.assertRaises(EOFError, client.expect, "#")
+        client.close()
+
+        self.assertRaises(socket.error, socket.create_connection, self.simulator.address, 1)
+        time.sleep(1)
+        client = Client(self.simulator.address)
+        client.login()
+        client.expect("#")
+        client.send("show version")
+        self.assertIn("Version 6.2.1", client.expect("#"))
+        client.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,162 @@
+# =============================================================================
+#
+# Copyright (c) 2016, Cisco Systems
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+# =============================================================================
+
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from csmpe.snapshot import Change, Snapshot, diff, digest
+from csmpe.storage import MemoryStorage, SQLiteStorage
+from csmpe.core_plugins.csm_check_isis_neighbors.ios_xr.plugin import Plugin as IsisPlugin
+
+ISIS = """RP/0/RP0/CPU0:#show isis neighbor summary
+Thu May 19 18:06:11.239 UTC
+
+IS-IS isp neighbor summary:
+State         L1       L2     L1L2
+Up             0        0        {}
+Init           0        0        0
+Failed         0        0        0
+"""
+
+
+class FakeContext(object):
+    """The plugin context keeping the data in the storage like the CSM server."""
+    def __init__(self, storage, phase, output=None):
+        self.storage = storage
+        self.phase = phase
+        self.output = output
+        self.loaded = []
+        self.infos = []
+        self.warnings = []
+
+    def save_data(self, key, data):
+        self.storage.save("rtr1", self.phase, key, [data, time.time()])
+
+    def load_data(self, key):
+        self.loaded.append(key)
+        value = self.storage.load("rtr1", key)
+        return (None, None) if value is None else tuple(value)
+
+    def send(self, cmd, **kwargs):
+        return self.output
+
+    def save_to_file(self, name, data):
+        return None
+
+    def info(self, message):
+        self.infos.append(message)
+
+    def warning(self, message):
+        self.warnings.append(message)
+
+
+class TestDiff(unittest.TestCase):
+    def test_digest(self):
+        self.assertEqual(digest({"a": [1, 2], "b": u"x"}), digest({u"a": (1, 2L), u"b": "x"}))
+        self.assertNotEqual(digest({"a": [1, 2]}), digest({"a": [2, 1]}))
+
+    def test_dictionaries(self):
+        before = {"0/0/CPU0": {"state": "IOS XR RUN"}, "0/1/CPU0": {"state": "IOS XR RUN"}}
+        after = {"0/0/CPU0": {"state": "IOS XR RUN"}, "0/2/CPU0": {"state": "UNPOWERED"}}
+        self.assertEqual(diff(before, after), [
+            Change(("0/1/CPU0",), before={"state": "IOS XR RUN"}),
+            Change(("0/2/CPU0",), after={"state": "UNPOWERED"}),
+        ])
+        after["0/1/CPU0"] = {"state": "FAILED"}
+        self.assertEqual(str(diff(before, after)[0]), '0/1/CPU0/state: "IOS XR RUN" -> "FAILED"')
+
+    def test_lists(self):
+        self.assertEqual([str(change) for change in diff({"Up": [0, 0, 1]}, {"Up": [0, 0, 2]})], ["Up[2]: 1 -> 2"])
+        changes = diff({"active": ["a", "b", "b", {"c": 1}]}, {"active": [{"c": 1}, "b", "d"]})
+        self.assertEqual([str(change) for change in changes],
+                         ['active: removed "a"', 'active: removed "b"', 'active: added "d"'])
+
+
+class SnapshotTests(object):
+    def test_unchanged_section_is_not_loaded(self):
+        data = {"isp": {"Up": ["0", "0", "1"]}}
+        Snapshot(FakeContext(self.storage, "Pre-Upgrade")).record("isis", data)
+
+        ctx = FakeContext(self.storage, "Post-Upgrade")
+        report = Snapshot(ctx).record("isis", {"isp": {"Up": [u"0", u"0", u"1"]}})
+        self.assertFalse(report)
+        self.assertEqual(ctx.loaded, ["isis.digest"])
+        self.assertEqual(ctx.warnings, [])
+
+    def test_changed_section(self):
+        Snapshot(FakeContext(self.storage, "Pre-Upgrade")).record("inventory", {"0/0/CPU0": {"state": "IOS XR RUN"}})
+
+        ctx = FakeContext(self.storage, "Post-Upgrade")
+        report = Snapshot(ctx).record("inventory", {"0/0/CPU0": {"state": "FAILED"}})
+        self.assertEqual(len(report), 1)
+        self.assertIn('inventory/0/0/CPU0/state: "IOS XR RUN" -> "FAILED"', ctx.warnings)
+
+    def test_data_saved_without_digest(self):
+        FakeContext(self.storage, "Pre-Upgrade").save_data("isis", {"isp": {"Up": ["0", "0", "1"]}})
+        ctx = FakeContext(self.storage, "Post-Upgrade")
+        self.assertEqual(len(Snapshot(ctx).record("isis", {"isp": {"Up": ["0", "0", "2"]}})), 1)
+        self.assertEqual(ctx.loaded, ["isis.digest", "isis"])
+
+    def test_no_previous_data(self):
+        ctx = FakeContext(self.storage, "Post-Upgrade")
+        self.assertIsNone(Snapshot(ctx).record("isis", {}))
+        self.assertEqual(ctx.warnings, ["No 'isis' data stored from Pre-Upgrade phase. Can't compare."])
+
+    def test_summary_limit(self):
+        Snapshot(FakeContext(self.storage, "Pre-Upgrade")).record("table", dict((str(n), n) for n in range(30)))
+        ctx = FakeContext(self.storage, "Post-Upgrade")
+        report = Snapshot(ctx).record("table", dict((str(n), n + 1) for n in range(30)))
+        self.assertEqual(len(report.summary()), 21)
+        self.assertEqual(report.summary()[-1], "... and 10 more changes of 'table'")
+
+    def test_isis_plugin(self):
+        IsisPlugin(FakeContext(self.storage, "Pre-Upgrade", ISIS.format(1))).run()
+        ctx = FakeContext(self.storage, "Post-Upgrade", ISIS.format(2))
+        IsisPlugin(ctx).run()
+        self.assertIn('isis_neighbors/isp/Up[2]: "1" -> "2"', ctx.warnings)
+
+
+class TestMemorySnapshot(SnapshotTests, unittest.TestCase):
+    def setUp(self):
+        self.storage = MemoryStorage()
+
+
+class TestSQLiteSnapshot(SnapshotTests, unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.storage = SQLiteStorage(os.path.join(self.directory, "storage.db"))
+
+    def tearDown(self):
+        self.storage.close()
+        shutil.rmtree(self.directory)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+# =============================================================================
+#
+# Copyright (c) 2016, Cisco Systems
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+# =============================================================================
+
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from csmpe import log
+from csmpe.context import PluginContext
+from csmpe.status import StatusBus, StatusEvent, JSONLSink, classify, PROGRESS, MESSAGE, PHASE_START, WARNING
+
+
+class TestClassify(unittest.TestCase):
+    def test_classify(self):
+        self.assertEqual(classify("| Install operation 10 is 45% complete"), (PROGRESS, 45))
+        self.assertEqual(classify("/ Install operation 10 is in progress"), (PROGRESS, None))
+        self.assertEqual(classify("Connecting to device"), (MESSAGE, None))
+
+
+class TestStatusBus(unittest.TestCase):
+    def setUp(self):
+        self.events = []
+        self.bus = StatusBus([self.events.append], interval=60)
+
+    def tearDown(self):
+        self.bus.close()
+
+    def _messages(self, host=None):
+        return [event.message for event in self.events if host is None or event.host == host]
+
+    def test_coalesce_progress(self):
+        for percent in range(0, 101, 10):
+            self.bus.post(StatusEvent(PROGRESS, "rtr1", "{}% complete".format(percent), percent=percent))
+        self.bus.flush()
+        # the first one is delivered immediately and the last one when flushed
+        self.assertEqual(self._messages(), ["0% complete", "100% complete"])
+
+    def test_order_and_duplicates(self):
+        self.bus.post(StatusEvent(PHASE_START, "rtr1", "Activate"))
+        self.bus.post(StatusEvent(PROGRESS, "rtr1", "10% complete"))
+        self.bus.post(StatusEvent(PROGRESS, "rtr1", "20% complete"))
+        self.bus.post(StatusEvent(WARNING, "rtr1", "warning"))
+        self.bus.post(StatusEvent(WARNING, "rtr1", "warning"))
+        self.bus.flush()
+        self.assertEqual(self._messages(), ["Activate", "10% complete", "20% complete", "warning"])
+
+    def test_per_host(self):
+        self.bus.post(StatusEvent(PROGRESS, "rtr1", "10% complete"))
+        self.bus.post(StatusEvent(PROGRESS, "rtr2", "10% complete"))
+        self.bus.flush()
+        self.assertEqual(self._messages("rtr1"), ["10% complete"])
+        self.assertEqual(self._messages("rtr2"), ["10% complete"])
+
+    def test_interval(self):
+        self.bus.interval = 0.05
+        self.bus.post(StatusEvent(PROGRESS, "rtr1", "10% complete"))
+        self.bus.post(StatusEvent(PROGRESS, "rtr1", "20% complete"))
+        time.sleep(0.3)
+        self.assertEqual(self._messages(), ["10% complete", "20% complete"])
+
+    def test_failing_sink(self):
+        def fail(event):
+            raise IOError("sink failed")
+
+        self.bus.sinks.insert(0, fail)
+        self.bus.post(StatusEvent(PHASE_START, "rtr1", "Activate"))
+        self.bus.flush()
+        self.assertEqual(self._messages(), ["Activate"])
+
+
+class CSM(object):
+    hostname = "rtr1"
+
+    def __init__(self):
+        self.messages = []
+
+    def post_status(self, message):
+        self.messages.append((message, threading.current_thread()))
+
+
+class TestPostStatus(unittest.TestCase):
+    def tearDown(self):
+        log.shutdown()
+
+    def test_csm_on_plugin_thread(self):
+        events = []
+        ctx = PluginContext()
+        ctx._csm = CSM()
+        ctx._status = StatusBus([events.append], interval=60)
+        try:
+            for message in ["10% complete", "20% complete", "20% complete"]:
+                ctx.post_status(message)
+            # CSM receives every message synchronously on the posting thread
+            self.assertEqual(ctx._csm.messages, [(message, threading.current_thread())
+                                                 for message in ["10% complete", "20% complete", "20% complete"]])
+            ctx.flush_status()
+            self.assertEqual([event.message for event in events], ["10% complete", "20% complete"])
+        finally:
+            ctx._status.close()
+
+
+class TestJSONLSink(unittest.TestCase):
+    def test_write(self):
+        directory = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(directory, "status.jsonl")
+            sink = JSONLSink(filename)
+            sink(StatusEvent(PROGRESS, "rtr1", "10% complete", percent=10))
+            with open(filename) as f:
+                event = json.loads(f.readline())
+            self.assertEqual(event['type'], PROGRESS)
+            self.assertEqual(event['percent'], 10)
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    unittest.main()
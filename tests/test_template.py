@@ -0,0 +1,142 @@
+# =============================================================================
+#
+# Copyright (c) 2016, Cisco Systems
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+# =============================================================================
+
+import unittest
+
+from csmpe.parsers import Template, TemplateError, compile_machine
+from csmpe.core_plugins.csm_check_isis_neighbors.ios_xr.plugin import ISIS_NEIGHBOR_SUMMARY
+from csmpe.core_plugins.csm_install_operations.ios_xr.pre_migrate import FPD_NEED_UPGRADE
+
+ISIS = """RP/0/RP0/CPU0:#show isis neighbor summary
+Thu May 19 18:06:11.239 UTC
+
+IS-IS isp neighbor summary:
+State         L1       L2     L1L2
+Up             0        0        1
+Init           0        0        0
+Failed         0        0        0
+
+IS-IS core neighbor summary:
+State         L1       L2     L1L2
+Up             2        3        4
+"""
+
+FPD = """
+Location     Card Type                Version Type Subtype Inst   Version   Dng?
+============ ======================== ======= ==== ======= ==== =========== ====
+0/RSP0/CPU0  A9K-RSP440-SE            1.0     lc   fpga2   0       3.08     Yes
+                                              lc   cbc     0      34.00     No
+                                              lc   rommon  0       2.01     Yes
+0/PM0        A9K-3KW-AC               1.0     pm   fpga1   0       1.10     Yes
+0/1/CPU0     A9K-MOD80-SE             1.0     lc   fpga2   0       3.08     Yes
+"""
+
+
+class TestTemplate(unittest.TestCase):
+
+    def test_filldown_required_and_eof_record(self):
+        template = Template(r"""
+Value Filldown,Required NAME (\S+)
+Value STATE (\w+)
+
+Start
+  ^name ${NAME}
+  ^state ${STATE} -> Record
+""")
+        records = template.parse("state lost\nname a\nstate up\nstate down\nname b\n")
+        self.assertEqual([(r.NAME, r.STATE) for r in records], [("a", "up"), ("a", "down"), ("b", None)])
+
+    def test_list_types_and_clear(self):
+        template = Template(r"""
+Value Key PORT (\d+)
+Value List VLANS (\d+)
+
+Start
+  ^port ${PORT}
+  ^vlan ${VLANS}
+  ^reset -> Clear
+  ^end -> Record
+""", types={'PORT': int, 'VLANS': int})
+        records = template.parse("port 1\nvlan 10\nvlan 20\nend\nport 2\nvlan 30\nreset\nvlan 40\nend\n")
+        self.assertEqual(records, [template.record(1, [10, 20]), template.record(None, [40])])
+        self.assertEqual(template.keys, ('PORT',))
+
+    def test_continue_and_states(self):
+        template = Template(r"""
+Value Filldown SECTION (\w+)
+Value WORD (\w+)
+
+Start
+  ^\[${SECTION}\] -> Body
+
+Body
+  ^\[${SECTION}\]
+  ^${WORD} -> Continue.Record
+  ^stop -> End
+""" + "\nEOF\n")
+        records = template.parse("skip\n[a]\nx\nstop\ny\n")
+        self.assertEqual([(r.SECTION, r.WORD) for r in records], [("a", "x"), ("a", "stop")])
+
+    def test_error_action(self):
+        template = Template("Value X (\\d+)\n\nStart\n  ^${X}\n  ^fail -> Error \"unexpected\"\n")
+        self.assertRaises(TemplateError, template.parse, "1\nfail\n")
+
+    def test_compiled_once(self):
+        text = "Value X (\\d+)\n\nStart\n  ^${X} -> Record\n"
+        self.assertIs(compile_machine(text), compile_machine(text))
+        self.assertEqual(Template(text, types={'X': int}).parse("1\n2\n"), [(1,), (2,)])
+
+    def test_group_reference(self):
+        # the rules with the group references are matched one by one
+        template = Template("Value A (\\w)\nValue B (\\d)\n\nStart\n  ^${A} \\w\\1 -> Record\n  ^n${B} -> Record\n")
+        self.assertEqual(template.parse("x yx\nx yz\nn5\n"), [("x", None), (None, "5")])
+
+    def test_invalid_templates(self):
+        for text in ["Value Sticky X (\\d+)\n\nStart\n  ^${X}\n",
+                     "Value X (\\d+)\n\nBegin\n  ^${X}\n",
+                     "Value X (\\d+)\n\nStart\n  ^${Y}\n",
+                     "Value X (\\d+)\n\nStart\n  ^${X} -> Continue Other\n\nOther\n  ^x\n",
+                     "Value X (\\d+)\n\nStart\n  ^${X} -> Missing\n"]:
+            self.assertRaises(TemplateError, Template, text)
+        self.assertRaises(TemplateError, Template, "Value X (\\d+)\n\nStart\n  ^${X}\n", types={'Y': int})
+
+
+class TestPluginTemplates(unittest.TestCase):
+
+    def test_isis_neighbor_summary(self):
+        records = ISIS_NEIGHBOR_SUMMARY.parse(ISIS)
+        self.assertEqual([tuple(r) for r in records if r.STATE], [
+            ("isp", "Up", "0", "0", "1"), ("isp", "Init", "0", "0", "0"), ("isp", "Failed", "0", "0", "0"),
+            ("core", "Up", "2", "3", "4")])
+
+    def test_fpd_need_upgrade(self):
+        records = FPD_NEED_UPGRADE.parse(FPD)
+        self.assertEqual([tuple(r) for r in records], [("0/RSP0/CPU0", "fpga2"), ("0/RSP0/CPU0", "rommon"),
+                                                       ("0/PM0", "fpga1"), ("0/1/CPU0", "fpga2")])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+# =============================================================================
+#
+# Copyright (c) 2016, Cisco Systems
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+# =============================================================================
+
+
+import unittest
+
+from csmpe.core_plugins.csm_install_operations.timeline import NodeTimeline
+
+
+def is_rp(node):
+    return "RP" in node
+
+
+class TestNodeTimeline(unittest.TestCase):
+    def test_transitions(self):
+        timeline = NodeTimeline(["RUN"])
+        self.assertEqual(timeline.update({"0/RP0": "BOOTING", "0/1": "BOOTING"}, 100),
+                         [("0/1", None, "BOOTING"), ("0/RP0", None, "BOOTING")])
+        self.assertEqual(timeline.update({"0/RP0": "RUN", "0/1": "BOOTING"}, 130), [("0/RP0", "BOOTING", "RUN")])
+        self.assertEqual(timeline.update({"0/RP0": "RUN", "0/1": "RUN"}, 200), [("0/1", "BOOTING", "RUN")])
+        self.assertEqual(timeline.up_times(), {"0/RP0": 30, "0/1": 100})
+        self.assertEqual(timeline.export()[-1], {'node': "0/1", 'state': "RUN", 'time': 100})
+
+    def test_ready(self):
+        timeline = NodeTimeline(["RUN"], required=is_rp, quorum=0.5)
+        self.assertFalse(timeline.ready())
+        timeline.update({"0/RP0": "BOOTING", "0/1": "RUN", "0/2": "RUN", "0/3": "BOOTING"}, 0)
+        self.assertFalse(timeline.ready())
+        timeline.update({"0/RP0": "RUN", "0/1": "RUN", "0/2": "BOOTING", "0/3": "BOOTING"}, 10)
+        self.assertFalse(timeline.ready())
+        timeline.update({"0/RP0": "RUN", "0/1": "RUN", "0/2": "RUN", "0/3": "BOOTING"}, 20)
+        self.assertTrue(timeline.ready())
+        self.assertEqual(timeline.pending(), ["0/3"])
+
+    def test_all_required(self):
+        timeline = NodeTimeline(["RUN"])
+        timeline.update({"0/RP0": "RUN", "0/1": "BOOTING"}, 0)
+        self.assertFalse(timeline.ready())
+
+    def test_stuck(self):
+        timeline = NodeTimeline(["RUN"])
+        timeline.update({"0/1": "BOOTING", "0/2": "BOOTING"}, 0)
+        timeline.update({"0/1": "BOOTING", "0/2": "INIT"}, 500)
+        self.assertEqual(timeline.stuck(900, 600), [("0/1", "BOOTING", 900)])
+
+    def test_down_again(self):
+        timeline = NodeTimeline(["RUN"])
+        timeline.update({"0/1": "RUN"}, 0)
+        timeline.update({"0/1": "BOOTING"}, 10)
+        timeline.update({"0/1": "RUN"}, 50)
+        self.assertEqual(timeline.up_times(), {"0/1": 50})
+
+
+if __name__ == '__main__':
+    unittest.main()